@@ -0,0 +1,8 @@
+"""
+📊 Analítica de la Medición del Servicio - Coltefinanciera
+
+Paquete de apoyo a los scripts de validación: carga la encuesta una sola vez
+y expone los mismos indicadores que calcula el dashboard (`dataService.ts`).
+"""
+
+__version__ = "0.1.0"
@@ -0,0 +1,270 @@
+# 📌 Map-reduce por fragmentos: conteos por calificación y grupo combinables entre procesos
+import argparse
+import math
+import mmap
+import os
+import time
+
+from .datos import CALIFICACIONES, METRICAS, RUTA_DATOS, RUTA_EJECUTIVOS, normalizar_encuestas
+from .ingesta import COMPATIBLES_ASCII, _leer_rango, cortes_seguros, detectar_formato
+
+DIMENSIONES_AGREGADOS = ('SEGMENTO', 'CIUDAD', 'AGENCIA', 'TIPO_EJECUTIVO', 'EJECUTIVO_FINAL')
+NIVELES_PARTICIPACION = ('EJECUTIVO_FINAL', 'AGENCIA', 'CIUDAD', 'TIPO_EJECUTIVO')
+
+
+class AgregadoParcial:
+    """
+    Agregado combinable de un fragmento de la encuesta.
+
+    Guarda solo enteros: el histograma 0-5 de cada métrica por cada valor de
+    cada dimensión (0 = sin respuesta), los registros por grupo y las
+    combinaciones de niveles de participación. Combinar dos parciales es
+    sumar conteos, una operación asociativa y conmutativa, así que el orden
+    de los fragmentos no cambia el resultado y todo indicador derivado
+    coincide exactamente con el cálculo en un solo proceso.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.conteos = {}  # (métrica, dimensión) -> {valor: [6 enteros]}
+        self.registros = {}  # dimensión -> {valor: registros}
+        self.combinaciones = {}  # tupla de NIVELES_PARTICIPACION -> registros
+
+    @classmethod
+    def desde_dataframe(cls, df):
+        """Map: un `bincount` por métrica y dimensión sobre una llave combinada grupo·6 + calificación."""
+        import numpy as np
+        import pandas as pd
+
+        parcial = cls()
+        parcial.total = len(df)
+        calificaciones = {m: df[m].fillna(0).to_numpy(dtype=np.int64) for m in METRICAS}
+        for dimension in DIMENSIONES_AGREGADOS:
+            codigos, categorias = pd.factorize(df[dimension])
+            grupos = len(categorias)
+            categorias = [str(c) for c in categorias]
+            parcial.registros[dimension] = dict(zip(categorias, np.bincount(codigos, minlength=grupos).tolist()))
+            for metrica, valores in calificaciones.items():
+                planos = np.bincount(codigos * CALIFICACIONES + valores, minlength=grupos * CALIFICACIONES)
+                parcial.conteos[(metrica, dimension)] = dict(zip(categorias, planos.reshape(grupos, CALIFICACIONES).tolist()))
+        combinaciones = df.groupby(list(NIVELES_PARTICIPACION), dropna=False, observed=True).size()
+        parcial.combinaciones = {tuple(llave): int(n) for llave, n in combinaciones.items()}
+        return parcial
+
+    def combinar(self, otro):
+        """Reduce: suma los conteos de `otro` en este parcial."""
+        self.total += otro.total
+        for llave, grupos in otro.conteos.items():
+            destino = self.conteos.setdefault(llave, {})
+            for valor, conteos in grupos.items():
+                actual = destino.get(valor)
+                destino[valor] = list(conteos) if actual is None else [a + b for a, b in zip(actual, conteos)]
+        for dimension, grupos in otro.registros.items():
+            destino = self.registros.setdefault(dimension, {})
+            for valor, n in grupos.items():
+                destino[valor] = destino.get(valor, 0) + n
+        for llave, n in otro.combinaciones.items():
+            self.combinaciones[llave] = self.combinaciones.get(llave, 0) + n
+        return self
+
+    # ------------------------------------------------------------------
+    # Indicadores derivados de los conteos combinados
+    # ------------------------------------------------------------------
+
+    def histograma(self, metrica, dimension='SEGMENTO', valor=None):
+        """Histograma 0-5 de un grupo, o del total si `valor` es None."""
+        import numpy as np
+
+        grupos = self.conteos.get((metrica, dimension), {})
+        if valor is not None:
+            return np.array(grupos.get(valor, [0] * CALIFICACIONES), dtype=np.int64)
+        total = np.zeros(CALIFICACIONES, dtype=np.int64)
+        for conteos in grupos.values():
+            total += conteos
+        return total
+
+    def kpis(self):
+        """Misma estructura que `MotorEncuestas.kpis()`."""
+        from .motor import estadisticas_desde_conteos
+
+        return [
+            {
+                'metric': nombre,
+                'key': metrica,
+                'consolidado': estadisticas_desde_conteos(self.histograma(metrica)),
+                'personas': estadisticas_desde_conteos(self.histograma(metrica, 'SEGMENTO', 'PERSONAS')),
+                'empresarial': estadisticas_desde_conteos(self.histograma(metrica, 'SEGMENTO', 'EMPRESARIAL')),
+            }
+            for metrica, nombre in METRICAS.items()
+        ]
+
+    def distribucion(self, metrica='satisfaccion_general'):
+        """Misma estructura que `MotorEncuestas.distribucion()`."""
+        conteos = self.histograma(metrica)
+        total = int(conteos[1:].sum())
+        return [
+            {
+                'name': f'Rating {calificacion}',
+                'value': int(conteos[calificacion]),
+                'percentage': round(float(conteos[calificacion]) / total * 100, 1) if total else 0,
+            }
+            for calificacion in range(1, CALIFICACIONES)
+        ]
+
+    def nps(self, dimension=None, valor=None):
+        """
+        Replica `calculateNPS()` de dataService.ts: 5 promotor, 4 pasivo y el
+        resto detractor (incluida la respuesta vacía, que allá vale 0), sobre
+        el total de registros del grupo.
+        """
+        conteos = self.histograma('recomendacion', dimension or 'SEGMENTO', valor)
+        total = self.registros.get(dimension, {}).get(valor, 0) if dimension else self.total
+        promotores, pasivos = int(conteos[5]), int(conteos[4])
+        detractores = int(conteos[:4].sum())
+        if total == 0:
+            return {'promoters': 0, 'passives': 0, 'detractors': 0, 'npsScore': 0}
+        puntaje = (promotores / total) * 100 - (detractores / total) * 100
+        return {'promoters': promotores, 'passives': pasivos, 'detractors': detractores,
+                'npsScore': math.floor(puntaje + 0.5)}  # Math.round de JavaScript
+
+    def participacion(self, ejecutivos):
+        """Un `MotorParticipacion` cargado con las combinaciones ya reducidas."""
+        from .participacion import MotorParticipacion
+
+        motor = MotorParticipacion(ejecutivos)
+        for valores, cantidad in self.combinaciones.items():
+            motor.registrar(dict(zip(NIVELES_PARTICIPACION, valores)), cantidad)
+        return motor
+
+
+def _agregar_rango(ruta, formato, inicio, fin):
+    """Tarea map de un proceso: lee su rango de bytes, normaliza y agrega."""
+    return AgregadoParcial.desde_dataframe(normalizar_encuestas(_leer_rango(ruta, formato, inicio, fin)))
+
+
+def _agregar_archivo(ruta):
+    from .datos import cargar_encuestas
+
+    return AgregadoParcial.desde_dataframe(cargar_encuestas(ruta))
+
+
+def fragmentos(rutas, por_archivo):
+    """
+    Tareas map: `por_archivo` rangos de bytes cortados fuera de comillas por
+    cada archivo compatible, o el archivo completo si su codificación no
+    permite cortar por bytes.
+    """
+    tareas = []
+    for ruta in rutas:
+        formato = detectar_formato(ruta)
+        if formato.codificacion not in COMPATIBLES_ASCII or por_archivo < 2:
+            tareas.append((_agregar_archivo, (ruta,)))
+            continue
+        with open(ruta, 'rb') as archivo, mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            rangos = cortes_seguros(mapa, formato.inicio_datos, len(mapa), por_archivo,
+                                    formato.comillas.encode('ascii'))
+        tareas.extend((_agregar_rango, (ruta, formato, inicio, fin)) for inicio, fin in rangos)
+    return tareas
+
+
+def _ejecutar(tarea):
+    funcion, argumentos = tarea
+    return funcion(*argumentos)
+
+
+def agregar(rutas, procesos=None, fragmentos_por_archivo=None):
+    """
+    Map-reduce sobre uno o varios CSV (olas): cada fragmento se agrega en un
+    proceso del pool y los parciales se combinan a medida que llegan.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    tareas = fragmentos(rutas, fragmentos_por_archivo or procesos)
+    total = AgregadoParcial()
+    if procesos < 2 or len(tareas) < 2:
+        for tarea in tareas:
+            total.combinar(_ejecutar(tarea))
+        return total, len(tareas)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(procesos, len(tareas))) as ejecutor:
+        for parcial in ejecutor.map(_ejecutar, tareas):
+            total.combinar(parcial)
+    return total, len(tareas)
+
+
+def verificar(agregado, rutas):
+    """
+    Compara contra el camino de un solo proceso (motor, `calculateNPS` sobre
+    el DataFrame y `MotorParticipacion.cargar`); retorna las diferencias.
+    """
+    import pandas as pd
+
+    from .datos import cargar_ejecutivos, cargar_encuestas
+    from .motor import MotorEncuestas
+    from .participacion import NIVELES, MotorParticipacion
+
+    df = pd.concat([cargar_encuestas(ruta) for ruta in rutas], ignore_index=True)
+    motor = MotorEncuestas(df)
+    diferencias = []
+    if agregado.kpis() != motor.kpis():
+        diferencias.append('kpis')
+    for metrica in METRICAS:
+        if agregado.distribucion(metrica) != motor.distribucion(metrica):
+            diferencias.append(f'distribucion:{metrica}')
+
+    recomendacion = df['recomendacion'].fillna(0)
+    promotores, pasivos = int((recomendacion == 5).sum()), int((recomendacion == 4).sum())
+    detractores = int((recomendacion <= 3).sum())
+    puntaje = math.floor(promotores / len(df) * 100 - detractores / len(df) * 100 + 0.5) if len(df) else 0
+    esperado = {'promoters': promotores, 'passives': pasivos, 'detractors': detractores, 'npsScore': puntaje}
+    if agregado.nps() != esperado:
+        diferencias.append('nps')
+
+    ejecutivos = cargar_ejecutivos(RUTA_EJECUTIVOS)
+    referencia = MotorParticipacion(ejecutivos).cargar(df)
+    reducido = agregado.participacion(ejecutivos)
+    for nivel in NIVELES:
+        orden = lambda filas: sorted(filas, key=lambda f: f['grupo'])
+        if orden(reducido.tabla(nivel)) != orden(referencia.tabla(nivel)):
+            diferencias.append(f'participacion:{nivel}')
+    return diferencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description='KPIs, distribución, NPS y participación por map-reduce')
+    parser.add_argument('rutas', nargs='*', default=[str(RUTA_DATOS)], help='Uno o varios CSV (olas)')
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--fragmentos', type=int, default=None, help='Fragmentos por archivo (por defecto, uno por proceso)')
+    parser.add_argument('--verificar', action='store_true', help='Compara contra el cálculo en un solo proceso')
+    args = parser.parse_args()
+
+    print("🗂️ AGREGACIÓN MAP-REDUCE")
+    print("=" * 60)
+    inicio = time.perf_counter()
+    agregado, tareas = agregar(args.rutas, args.procesos, args.fragmentos)
+    segundos = time.perf_counter() - inicio
+    megas = sum(os.path.getsize(r) for r in args.rutas) / 1024 / 1024
+    print(f"   • Archivos: {len(args.rutas)} | Fragmentos: {tareas} | Procesos: {args.procesos or os.cpu_count()}")
+    print(f"   • Registros: {agregado.total:,} en {segundos * 1000:.0f} ms "
+          f"({agregado.total / segundos:,.0f} registros/s, {megas / segundos:,.1f} MB/s)")
+
+    print("\n📊 KPIs CONSOLIDADOS:")
+    for fila in agregado.kpis():
+        consolidado = fila['consolidado']
+        print(f"   • {fila['metric']}: {consolidado['average']:.2f} "
+              f"(5: {consolidado['rating5']}%, n={consolidado['total']:,})")
+    nps = agregado.nps()
+    print(f"   • NPS: {nps['npsScore']} (P: {nps['promoters']}, N: {nps['passives']}, D: {nps['detractors']})")
+
+    if args.verificar:
+        diferencias = verificar(agregado, args.rutas)
+        if diferencias:
+            print(f"\n❌ Difiere del cálculo en un proceso: {', '.join(diferencias)}")
+            return 1
+        print("\n✅ Idéntico al cálculo en un solo proceso (KPIs, distribuciones, NPS y participación)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,241 @@
+# 📌 Almacén columnar en binario: una columna por archivo .npy, abierta con mmap
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .datos import CALIFICACIONES, METRICAS, RAIZ, RUTA_DATOS, cargar_encuestas, huella_archivo
+from .conteos import estadisticas_desde_conteos, promedios_desde_conteos
+
+RUTA_ALMACEN = RAIZ / 'almacen'
+MANIFIESTO = 'manifiesto.json'
+VERSION_FORMATO = 1
+
+
+def _nombre_archivo(columna):
+    """Nombre de archivo seguro a partir de un encabezado (los largos quedan como su posición)."""
+    limpio = ''.join(c if c.isalnum() or c == '_' else '_' for c in columna)
+    return limpio if len(limpio) <= 40 else None
+
+
+def exportar_almacen(df, destino=RUTA_ALMACEN, origen=None):
+    """
+    Escribe cada columna de `df` (ya normalizado) como un arreglo NumPy crudo.
+
+    - Calificaciones: int8, 0 = sin respuesta.
+    - DATE_MODIFIED: int64 en nanosegundos desde epoch, NaT = mínimo int64.
+    - Otras numéricas enteras: int64 (float64 si tienen faltantes).
+    - Texto: códigos int32 + diccionario JSON con los valores (-1 = faltante).
+
+    El manifiesto se escribe al final, así un almacén a medio exportar nunca
+    se considera válido. `origen` es la ruta del CSV de donde salen los datos.
+    """
+    import pandas as pd
+
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    manifiesto_previo = destino / MANIFIESTO
+    if manifiesto_previo.exists():
+        manifiesto_previo.unlink()
+
+    columnas = {}
+    for posicion, columna in enumerate(df.columns):
+        base = _nombre_archivo(columna) or f'columna_{posicion:02d}'
+        serie = df[columna]
+        entrada = {'archivo': f'{base}.npy'}
+        if columna in METRICAS:
+            entrada['tipo'] = 'calificacion'
+            arreglo = serie.fillna(0).to_numpy(dtype=np.int8)
+        elif pd.api.types.is_datetime64_any_dtype(serie):
+            entrada['tipo'] = 'fecha'
+            arreglo = serie.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        elif pd.api.types.is_numeric_dtype(serie):
+            entrada['tipo'] = 'numero'
+            arreglo = serie.to_numpy()
+        else:
+            entrada['tipo'] = 'categoria'
+            codigos, valores = pd.factorize(serie, sort=True)
+            arreglo = codigos.astype(np.int32)
+            entrada['diccionario'] = f'{base}.diccionario.json'
+            with open(destino / entrada['diccionario'], 'w', encoding='utf-8') as archivo:
+                json.dump([str(v) for v in valores], archivo, ensure_ascii=False)
+        np.save(destino / entrada['archivo'], arreglo, allow_pickle=False)
+        entrada['dtype'] = str(arreglo.dtype)
+        columnas[columna] = entrada
+
+    manifiesto = {
+        'formato': VERSION_FORMATO,
+        'filas': len(df),
+        'columnas': columnas,
+    }
+    if origen is not None:
+        estado = os.stat(origen)
+        manifiesto['origen'] = {
+            'ruta': str(origen),
+            'tamano': estado.st_size,
+            'mtime_ns': estado.st_mtime_ns,
+            'version': huella_archivo(origen),
+        }
+    with open(destino / MANIFIESTO, 'w', encoding='utf-8') as archivo:
+        json.dump(manifiesto, archivo, ensure_ascii=False, indent=2)
+    return manifiesto
+
+
+class AlmacenColumnar:
+    """
+    Lector perezoso de un almacén exportado con `exportar_almacen`.
+
+    Solo se lee el manifiesto al abrir; cada columna se mapea con
+    `np.load(mmap_mode='r')` la primera vez que se pide, de modo que una
+    consulta toca únicamente las páginas de las columnas que usa.
+    """
+
+    def __init__(self, ruta=RUTA_ALMACEN):
+        self.ruta = Path(ruta)
+        with open(self.ruta / MANIFIESTO, encoding='utf-8') as archivo:
+            self.manifiesto = json.load(archivo)
+        if self.manifiesto.get('formato') != VERSION_FORMATO:
+            raise ValueError(f"Formato de almacén no soportado: {self.manifiesto.get('formato')}")
+        self.filas = self.manifiesto['filas']
+        self.version = self.manifiesto.get('origen', {}).get('version', '')
+        self._columnas = {}
+        self._diccionarios = {}
+
+    @property
+    def columnas_abiertas(self):
+        return list(self._columnas)
+
+    def __contains__(self, columna):
+        return columna in self.manifiesto['columnas']
+
+    def columna(self, nombre):
+        """Arreglo de solo lectura mapeado en memoria (códigos para columnas de texto)."""
+        if nombre not in self._columnas:
+            entrada = self.manifiesto['columnas'][nombre]
+            self._columnas[nombre] = np.load(self.ruta / entrada['archivo'], mmap_mode='r', allow_pickle=False)
+        return self._columnas[nombre]
+
+    def categorias(self, nombre):
+        """Diccionario de valores de una columna de texto."""
+        if nombre not in self._diccionarios:
+            entrada = self.manifiesto['columnas'][nombre]
+            with open(self.ruta / entrada['diccionario'], encoding='utf-8') as archivo:
+                self._diccionarios[nombre] = json.load(archivo)
+        return self._diccionarios[nombre]
+
+    def fechas(self, nombre='DATE_MODIFIED'):
+        return self.columna(nombre).view('datetime64[ns]')
+
+    def valores(self, nombre):
+        """Columna decodificada (texto) como arreglo de objetos; los faltantes quedan en None."""
+        codigos = self.columna(nombre)
+        diccionario = np.asarray(self.categorias(nombre) + [None], dtype=object)
+        return diccionario[codigos]
+
+    def conteos(self, metrica, dimension=None):
+        """
+        Histograma 0-5 de una métrica, o matriz (grupos x 6) por `dimension`.
+        Los registros con la dimensión vacía o faltante no se cuentan por grupo.
+        """
+        valores = self.columna(metrica)
+        if dimension is None:
+            return np.bincount(valores, minlength=CALIFICACIONES)
+        codigos = np.asarray(self.columna(dimension))
+        grupos = len(self.categorias(dimension))
+        validos = codigos >= 0
+        llave = codigos[validos].astype(np.int64) * CALIFICACIONES + valores[validos]
+        return np.bincount(llave, minlength=grupos * CALIFICACIONES).reshape(grupos, CALIFICACIONES)
+
+    def distribucion(self, metrica):
+        """Estadísticas 1-5 de una métrica (mismo formato que `calculateStats()`)."""
+        return estadisticas_desde_conteos(self.conteos(metrica))
+
+    def promedios(self, metrica, dimension):
+        """Promedio de la métrica por cada valor de la dimensión."""
+        promedios = promedios_desde_conteos(self.conteos(metrica, dimension))
+        return {g: float(p) for g, p in zip(self.categorias(dimension), promedios) if g}
+
+    def a_dataframe(self, columnas=None):
+        """Reconstruye un DataFrame con las columnas pedidas (todas por defecto)."""
+        import pandas as pd
+
+        datos = {}
+        for nombre in columnas or self.manifiesto['columnas']:
+            tipo = self.manifiesto['columnas'][nombre]['tipo']
+            if tipo == 'categoria':
+                datos[nombre] = self.valores(nombre)
+            elif tipo == 'fecha':
+                datos[nombre] = np.array(self.fechas(nombre))
+            elif tipo == 'calificacion':
+                valores = np.asarray(self.columna(nombre), dtype=float)
+                datos[nombre] = np.where(valores > 0, valores, np.nan)
+            else:
+                datos[nombre] = np.array(self.columna(nombre))
+        return pd.DataFrame(datos)
+
+
+def almacen_vigente(destino=RUTA_ALMACEN, ruta_datos=RUTA_DATOS):
+    """
+    True si el almacén existe y salió de la versión actual del CSV. Compara
+    tamaño y mtime primero; solo si cambiaron recalcula la huella.
+    """
+    manifiesto = Path(destino) / MANIFIESTO
+    if not manifiesto.exists():
+        return False
+    with open(manifiesto, encoding='utf-8') as archivo:
+        origen = json.load(archivo).get('origen')
+    if not origen:
+        return False
+    estado = os.stat(ruta_datos)
+    if (estado.st_size, estado.st_mtime_ns) == (origen['tamano'], origen['mtime_ns']):
+        return True
+    return huella_archivo(ruta_datos) == origen['version']
+
+
+def abrir_almacen(ruta_datos=RUTA_DATOS, destino=RUTA_ALMACEN):
+    """Abre el almacén, exportándolo antes si falta o quedó desactualizado."""
+    if not almacen_vigente(destino, ruta_datos):
+        exportar_almacen(cargar_encuestas(ruta_datos), destino, origen=ruta_datos)
+    return AlmacenColumnar(destino)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Almacén columnar con mmap para arranque inmediato')
+    parser.add_argument('accion', choices=['exportar', 'consultar'])
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--destino', default=str(RUTA_ALMACEN))
+    args = parser.parse_args()
+
+    if args.accion == 'exportar':
+        print("💾 EXPORTANDO ALMACÉN COLUMNAR")
+        print("=" * 60)
+        inicio = time.perf_counter()
+        manifiesto = exportar_almacen(cargar_encuestas(args.datos), args.destino, origen=args.datos)
+        segundos = time.perf_counter() - inicio
+        tamano = sum(f.stat().st_size for f in Path(args.destino).iterdir())
+        print(f"   • Filas: {manifiesto['filas']:,} | Columnas: {len(manifiesto['columnas'])}")
+        print(f"   • Tamaño en disco: {tamano / 1024:,.1f} KB (CSV: {os.path.getsize(args.datos) / 1024:,.1f} KB)")
+        print(f"   • Tiempo: {segundos * 1000:.0f} ms")
+        return
+
+    print("⚡ CONSULTA SOBRE EL ALMACÉN COLUMNAR")
+    print("=" * 60)
+    inicio = time.perf_counter()
+    almacen = abrir_almacen(args.datos, args.destino)
+    claridad = almacen.distribucion('claridad_informacion')
+    segmentos = {m: almacen.promedios(m, 'SEGMENTO') for m in METRICAS}
+    milisegundos = (time.perf_counter() - inicio) * 1000
+    print(f"   • Claridad: promedio {claridad['average']} | 5: {claridad['rating5']}% "
+          f"| 4: {claridad['rating4']}% | 1-3: {claridad['rating123']}% (n={claridad['total']:,})")
+    for metrica, promedios in segmentos.items():
+        detalle = ' | '.join(f'{g}: {p:.2f}' for g, p in promedios.items())
+        print(f"   • {METRICAS[metrica]}: {detalle}")
+    print(f"   • Columnas leídas: {len(almacen.columnas_abiertas)} de {len(almacen.manifiesto['columnas'])} "
+          f"en {milisegundos:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
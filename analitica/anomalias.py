@@ -0,0 +1,231 @@
+# 📌 Detección de anomalías en línea: z-score móvil y CUSUM por día, segmento y agencia
+import argparse
+import math
+import time
+from collections import deque
+from datetime import timedelta
+
+from .datos import METRICAS, RUTA_DATOS, cargar_encuestas
+
+VENTANA = 7  # Días de historia para media y desviación móviles
+UMBRAL_Z = 3.0
+CUSUM_K = 0.5  # Holgura en desviaciones estándar
+CUSUM_H = 4.0  # Umbral de decisión en desviaciones estándar
+MINIMO_HISTORIA = 5  # Días observados antes de emitir alertas
+MINIMO_RESPUESTAS = 3  # Respuestas en el día para que su promedio cuente
+DIMENSIONES_ANOMALIAS = ('SEGMENTO', 'AGENCIA')
+
+# Piso de la desviación por serie, para que una historia casi constante no dispare todo
+DESVIACION_MINIMA = {'respuestas': 0.5, 'promedio': 0.25}
+
+
+class SerieEnLinea:
+    """
+    Estadísticos móviles de una serie diaria con actualización O(1).
+
+    Mantiene la ventana en un deque con su suma y suma de cuadrados, y los
+    acumulados CUSUM bilaterales sobre el residuo estandarizado. Cada valor
+    se compara contra la historia *anterior* a él.
+    """
+
+    def __init__(self, ventana=VENTANA, desviacion_minima=0.0):
+        self.valores = deque(maxlen=ventana)
+        self.suma = 0.0
+        self.suma_cuadrados = 0.0
+        self.desviacion_minima = desviacion_minima
+        self.cusum_alza = 0.0
+        self.cusum_caida = 0.0
+
+    def observar(self, valor):
+        """Retorna `(media, desviacion, z, cusum_alza, cusum_caida)` y agrega `valor` a la ventana."""
+        n = len(self.valores)
+        if n:
+            media = self.suma / n
+            varianza = max(self.suma_cuadrados / n - media * media, 0.0)
+            desviacion = max(math.sqrt(varianza), self.desviacion_minima)
+            z = (valor - media) / desviacion if desviacion > 0 else 0.0
+            self.cusum_alza = max(0.0, self.cusum_alza + z - CUSUM_K)
+            self.cusum_caida = max(0.0, self.cusum_caida - z - CUSUM_K)
+        else:
+            media, desviacion, z = valor, 0.0, 0.0
+
+        if n == self.valores.maxlen:
+            saliente = self.valores[0]
+            self.suma -= saliente
+            self.suma_cuadrados -= saliente * saliente
+        self.valores.append(valor)
+        self.suma += valor
+        self.suma_cuadrados += valor * valor
+        return media, desviacion, z, self.cusum_alza, self.cusum_caida
+
+    def reiniciar_cusum(self):
+        self.cusum_alza = self.cusum_caida = 0.0
+
+    def __len__(self):
+        return len(self.valores)
+
+
+class DetectorAnomalias:
+    """
+    Detector en línea sobre DATE_MODIFIED para TOTAL, cada segmento y cada agencia.
+
+    `registrar` suma una respuesta al día abierto tocando solo sus grupos
+    (TOTAL + un segmento + una agencia), es decir O(1). Cuando llega una
+    respuesta de un día posterior se cierran los días pendientes: por cada
+    grupo conocido se observa el volumen (log(1 + respuestas), así los días
+    sin respuestas también cuentan y un enlace caído se nota) y el promedio
+    de cada métrica si hubo al menos MINIMO_RESPUESTAS. Las respuestas que
+    llegan fuera de orden se suman al día abierto.
+    """
+
+    def __init__(self, ventana=VENTANA, umbral_z=UMBRAL_Z, minimo_historia=MINIMO_HISTORIA,
+                 minimo_respuestas=MINIMO_RESPUESTAS, dimensiones=DIMENSIONES_ANOMALIAS, metricas=tuple(METRICAS)):
+        self.ventana = ventana
+        self.umbral_z = umbral_z
+        self.minimo_historia = minimo_historia
+        self.minimo_respuestas = minimo_respuestas
+        self.dimensiones = tuple(dimensiones)
+        self.metricas = tuple(metricas)
+        self.dia_abierto = None
+        self.acumulado = {}  # grupo -> [respuestas, {métrica: [suma, cantidad]}]
+        self.grupos = set()
+        self.series = {}
+        self.alertas = []
+        self.respuestas = 0
+
+    def _grupos_de(self, fila):
+        grupos = [('TOTAL', 'TOTAL')]
+        for dimension in self.dimensiones:
+            valor = fila.get(dimension)
+            if isinstance(valor, str) and valor.strip():
+                grupos.append((dimension, valor.strip()))
+        return grupos
+
+    def registrar(self, fila):
+        """Agrega una respuesta (dict con DATE_MODIFIED, dimensiones y métricas)."""
+        fecha = fila.get('DATE_MODIFIED')
+        if fecha is None or fecha != fecha:  # None o NaT
+            return
+        dia = fecha.date()
+        if self.dia_abierto is None:
+            self.dia_abierto = dia
+        elif dia > self.dia_abierto:
+            self._cerrar_hasta(dia)
+
+        self.respuestas += 1
+        for grupo in self._grupos_de(fila):
+            self.grupos.add(grupo)
+            estado = self.acumulado.setdefault(grupo, [0, {}])
+            estado[0] += 1
+            for metrica in self.metricas:
+                valor = fila.get(metrica)
+                if valor is not None and valor == valor and 1 <= valor <= 5:
+                    suma = estado[1].setdefault(metrica, [0.0, 0])
+                    suma[0] += valor
+                    suma[1] += 1
+
+    def _cerrar_hasta(self, dia):
+        while self.dia_abierto < dia:
+            self._cerrar_dia(self.dia_abierto)
+            self.dia_abierto += timedelta(days=1)
+
+    def finalizar(self):
+        """Cierra el día abierto (al terminar una carga o al final del día)."""
+        if self.dia_abierto is not None:
+            self._cerrar_dia(self.dia_abierto)
+            self.dia_abierto += timedelta(days=1)
+        return self
+
+    def _serie(self, grupo, nombre, tipo):
+        llave = (grupo, nombre)
+        if llave not in self.series:
+            self.series[llave] = SerieEnLinea(self.ventana, DESVIACION_MINIMA[tipo])
+        return self.series[llave]
+
+    def _cerrar_dia(self, dia):
+        acumulado, self.acumulado = self.acumulado, {}
+        for grupo in self.grupos:
+            respuestas, sumas = acumulado.get(grupo, (0, {}))
+            self._evaluar(dia, grupo, 'respuestas', 'respuestas', math.log1p(respuestas), respuestas)
+            for metrica, (suma, cantidad) in sumas.items():
+                if cantidad >= self.minimo_respuestas:
+                    promedio = suma / cantidad
+                    self._evaluar(dia, grupo, metrica, 'promedio', promedio, round(promedio, 2))
+
+    def _evaluar(self, dia, grupo, nombre, tipo, valor, mostrado):
+        serie = self._serie(grupo, nombre, tipo)
+        historia = len(serie)
+        media, _, z, alza, caida = serie.observar(valor)
+        if historia < self.minimo_historia:
+            serie.reiniciar_cusum()
+            return
+        motivos = []
+        if abs(z) >= self.umbral_z:
+            motivos.append('z')
+        if alza >= CUSUM_H or caida >= CUSUM_H:
+            motivos.append('cusum')
+            serie.reiniciar_cusum()
+        if not motivos:
+            return
+        esperado = max(math.expm1(media), 0.0) if tipo == 'respuestas' else media
+        self.alertas.append({
+            'fecha': dia.isoformat(),
+            'dimension': grupo[0],
+            'grupo': grupo[1],
+            'serie': nombre,
+            'valor': mostrado,
+            'esperado': round(esperado, 2),
+            'z': round(z, 2),
+            'cusum_alza': round(alza, 2),
+            'cusum_caida': round(caida, 2),
+            'direccion': 'alza' if z > 0 or alza > caida else 'caida',
+            'regla': '+'.join(motivos),
+        })
+
+    def tabla_alertas(self):
+        import pandas as pd
+
+        columnas = ['fecha', 'dimension', 'grupo', 'serie', 'valor', 'esperado', 'z',
+                    'cusum_alza', 'cusum_caida', 'direccion', 'regla']
+        tabla = pd.DataFrame(self.alertas, columns=columnas)
+        return tabla.sort_values(['fecha', 'dimension', 'grupo', 'serie'], kind='stable', ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Anomalías en volumen diario y calificaciones')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--ventana', type=int, default=VENTANA)
+    parser.add_argument('--umbral-z', type=float, default=UMBRAL_Z)
+    parser.add_argument('--salida', help='Ruta CSV donde guardar la tabla de alertas')
+    args = parser.parse_args()
+
+    print("🚨 DETECCIÓN DE ANOMALÍAS")
+    print("=" * 60)
+    encuestas = cargar_encuestas(args.datos)
+    detector = DetectorAnomalias(ventana=args.ventana, umbral_z=args.umbral_z)
+    columnas = ['DATE_MODIFIED', *detector.dimensiones, *detector.metricas]
+    filas = encuestas.sort_values('DATE_MODIFIED', kind='stable')[columnas].to_dict('records')
+
+    inicio = time.perf_counter()
+    for fila in filas:
+        detector.registrar(fila)
+    detector.finalizar()
+    microsegundos = (time.perf_counter() - inicio) / max(len(filas), 1) * 1e6
+    alertas = detector.tabla_alertas()
+
+    print(f"   • Respuestas procesadas: {detector.respuestas:,} ({microsegundos:.1f} µs por respuesta)")
+    print(f"   • Series vigiladas: {len(detector.series):,} | Alertas: {len(alertas):,}")
+    print()
+    for fila in alertas.itertuples():
+        emoji = "📈" if fila.direccion == 'alza' else "📉"
+        nombre = 'Respuestas' if fila.serie == 'respuestas' else METRICAS[fila.serie]
+        print(f"   {emoji} {fila.fecha} [{fila.dimension}: {fila.grupo}] {nombre}: {fila.valor} "
+              f"(esperado {fila.esperado}, z={fila.z:+.1f}, regla {fila.regla})")
+
+    if args.salida:
+        alertas.to_csv(args.salida, index=False, sep=';', encoding='utf-8')
+        print(f"\n💾 Alertas guardadas en: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
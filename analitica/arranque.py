@@ -0,0 +1,107 @@
+# 📌 Presupuesto de tiempo de arranque: importa cada módulo ligero en un proceso limpio
+import argparse
+import json
+import subprocess
+import sys
+
+from .datos import RAIZ
+
+# Milisegundos máximos de importación acumulada (`python -X importtime`) por módulo
+PRESUPUESTOS = {
+    'analitica': 25,
+    'analitica.datos': 60,
+    'analitica.ingesta': 60,
+    'analitica.ligero': 80,
+    'analitica.almacen': 200,
+}
+
+# Ninguno de los módulos ligeros puede arrastrar estas dependencias al importarse
+PROHIBIDOS = ('pandas', 'numpy')
+
+# Excepciones por módulo: el almacén mapea columnas con NumPy, pero no debe cargar pandas
+PERMITIDOS = {
+    'analitica.almacen': ('numpy',),
+}
+
+# Referencia (no se exige): el motor completo con pandas y numpy
+REFERENCIA = 'analitica.motor'
+
+REPETICIONES = 5
+
+
+def medir_importacion(modulo, repeticiones=REPETICIONES):
+    """
+    Importa `modulo` en un intérprete nuevo con `-X importtime` y retorna
+    `(milisegundos, prohibidos_cargados)`; lo listado en PERMITIDOS para el
+    módulo no cuenta como prohibido.
+
+    Se toma el mínimo de varias corridas para descontar el ruido del sistema
+    (el primer arranque suele pagar la lectura de disco de los .pyc).
+    """
+    prohibidos = tuple(m for m in PROHIBIDOS if m not in PERMITIDOS.get(modulo, ()))
+    codigo = (
+        f"import {modulo}, sys, json; "
+        f"print(json.dumps([m for m in {prohibidos!r} if m in sys.modules]))"
+    )
+    mejor = None
+    cargados = []
+    for _ in range(repeticiones):
+        proceso = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', codigo],
+            cwd=RAIZ, capture_output=True, text=True, check=True,
+        )
+        cargados = json.loads(proceso.stdout.strip().splitlines()[-1])
+        for linea in proceso.stderr.splitlines():
+            # import time: propio | acumulado | módulo (indentado según profundidad)
+            partes = linea.split('|')
+            if len(partes) == 3 and partes[2].strip() == modulo:
+                microsegundos = int(partes[1])
+                mejor = microsegundos if mejor is None else min(mejor, microsegundos)
+    return (mejor or 0) / 1000, cargados
+
+
+def verificar_presupuestos(presupuestos=PRESUPUESTOS, repeticiones=REPETICIONES):
+    """Mide cada módulo contra su presupuesto; retorna una lista de resultados."""
+    resultados = []
+    for modulo, limite in presupuestos.items():
+        milisegundos, cargados = medir_importacion(modulo, repeticiones)
+        resultados.append({
+            'modulo': modulo,
+            'milisegundos': round(milisegundos, 1),
+            'presupuesto': limite,
+            'prohibidos': cargados,
+            'ok': milisegundos <= limite and not cargados,
+        })
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verifica el presupuesto de tiempo de arranque')
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES)
+    parser.add_argument('--escala', type=float, default=1.0,
+                        help='Multiplica los presupuestos (p. ej. 2 en runners lentos)')
+    args = parser.parse_args()
+
+    print("⏱️  PRESUPUESTO DE ARRANQUE")
+    print("=" * 60)
+    presupuestos = {m: limite * args.escala for m, limite in PRESUPUESTOS.items()}
+    resultados = verificar_presupuestos(presupuestos, args.repeticiones)
+    for r in resultados:
+        emoji = "✅" if r['ok'] else "❌"
+        detalle = f" | carga {', '.join(r['prohibidos'])}" if r['prohibidos'] else ""
+        print(f"   {emoji} {r['modulo']}: {r['milisegundos']:.1f} ms (presupuesto {r['presupuesto']:.0f} ms){detalle}")
+
+    referencia, _ = medir_importacion(REFERENCIA, args.repeticiones)
+    print(f"   • Referencia {REFERENCIA} (pandas + numpy): {referencia:.1f} ms")
+
+    fallidos = [r for r in resultados if not r['ok']]
+    print()
+    if fallidos:
+        print(f"❌ {len(fallidos)} módulo(s) fuera de presupuesto")
+        return 1
+    print("✅ Todos los módulos ligeros dentro del presupuesto")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
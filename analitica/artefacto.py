@@ -0,0 +1,274 @@
+# 📌 Artefacto binario compacto para el dashboard: calificaciones int8, diccionarios y minutos epoch
+import argparse
+import gzip
+import struct
+import time
+import zlib
+from pathlib import Path
+
+from .datos import COLUMNAS, METRICAS, RAIZ, RUTA_DATOS, cargar_encuestas, huella_archivo
+
+RUTA_ARTEFACTO = RAIZ / 'public' / 'datos.bin'
+RUTA_SUGERENCIAS = RAIZ / 'public' / 'datos-sugerencias.bin'
+
+MAGIA = b'CSAT'
+VERSION_FORMATO = 2  # 2: la cabecera lleva la huella del CSV de origen
+BANDERA_SUGERENCIAS = 1  # Existe un blob de sugerencias aparte
+FECHA_FALTANTE = 0xFFFFFFFF
+
+# Cabecera: magia, versión, banderas, filas, columnas, reservado, bytes de carga útil, CRC-32 de la carga
+# y SHA-256 del CSV de origen (`huella_archivo`), para detectar un artefacto desactualizado
+CABECERA = struct.Struct('<4sHHIHHII32s')
+
+TIPO_CALIFICACION = 1  # int8, 0 = sin respuesta
+TIPO_CATEGORIA = 2  # códigos uint8/uint16 + tabla de textos
+TIPO_FECHA = 3  # uint32 minutos desde 1970-01-01 (hora local tal como viene en el CSV)
+TIPO_TEXTO = 4  # tabla de textos, un valor por fila
+
+# Lo que consume el dashboard; los datos personales no viajan en el artefacto
+COLUMNAS_ARTEFACTO = {
+    'ID': TIPO_TEXTO,
+    'DATE_MODIFIED': TIPO_FECHA,
+    'SEGMENTO': TIPO_CATEGORIA,
+    'CIUDAD': TIPO_CATEGORIA,
+    'AGENCIA': TIPO_CATEGORIA,
+    'TIPO_EJECUTIVO': TIPO_CATEGORIA,
+    'EJECUTIVO': TIPO_CATEGORIA,
+    'EJECUTIVO_FINAL': TIPO_CATEGORIA,
+    **{metrica: TIPO_CALIFICACION for metrica in METRICAS},
+}
+
+
+def _alinear(buffer, multiplo=4):
+    """Rellena con ceros para que el siguiente arreglo se pueda leer como vista tipada en el navegador."""
+    buffer.extend(b'\0' * (-len(buffer) % multiplo))
+
+
+def _tabla_textos(buffer, textos):
+    """uint32 cantidad, uint32 desplazamientos (cantidad + 1) y los bytes UTF-8 concatenados."""
+    import numpy as np
+
+    codificados = [t.encode('utf-8') for t in textos]
+    desplazamientos = np.zeros(len(codificados) + 1, dtype='<u4')
+    np.cumsum([len(c) for c in codificados], out=desplazamientos[1:])
+    buffer.extend(struct.pack('<I', len(codificados)))
+    buffer.extend(desplazamientos.tobytes())
+    buffer.extend(b''.join(codificados))
+    _alinear(buffer)
+
+
+def _columna(buffer, nombre, tipo, serie):
+    import numpy as np
+    import pandas as pd
+
+    codificado = nombre.encode('utf-8')
+    buffer.extend(struct.pack('<BB', len(codificado), tipo))
+    buffer.extend(codificado)
+    _alinear(buffer)
+    if tipo == TIPO_CALIFICACION:
+        buffer.extend(serie.fillna(0).to_numpy(dtype=np.int8).tobytes())
+    elif tipo == TIPO_FECHA:
+        minutos = serie.to_numpy(dtype='datetime64[m]').astype(np.int64)
+        minutos = np.where(serie.isna().to_numpy(), FECHA_FALTANTE, minutos).astype('<u4')
+        buffer.extend(minutos.tobytes())
+    elif tipo == TIPO_CATEGORIA:
+        codigos, valores = pd.factorize(serie.fillna('').astype(str), sort=True)
+        ancho = 1 if len(valores) <= 0xFF else 2
+        _tabla_textos(buffer, [str(v) for v in valores])
+        buffer.extend(struct.pack('<I', ancho))
+        buffer.extend(codigos.astype('<u1' if ancho == 1 else '<u2').tobytes())
+    else:
+        _tabla_textos(buffer, serie.fillna('').astype(str).tolist())
+    _alinear(buffer)
+
+
+def _empaquetar(columnas, filas, banderas=0, origen=None):
+    """Cabecera versionada (con la huella hex `origen`, si se da) + carga útil con su CRC-32."""
+    carga = bytearray()
+    for nombre, tipo, serie in columnas:
+        _columna(carga, nombre, tipo, serie)
+    cabecera = CABECERA.pack(MAGIA, VERSION_FORMATO, banderas, filas, len(columnas), 0,
+                             len(carga), zlib.crc32(carga), bytes.fromhex(origen) if origen else b'')
+    return cabecera + bytes(carga)
+
+
+def escribir_artefacto(df, destino=RUTA_ARTEFACTO, sugerencias=RUTA_SUGERENCIAS, origen=None):
+    """
+    Escribe el artefacto principal y, si `sugerencias` no es None, el blob de
+    sugerencias aparte (mismo formato, una columna de texto), para que el
+    dashboard pueda pintar los indicadores antes de bajar los textos libres.
+    `origen` es la huella del CSV del que sale `df`. Retorna los bytes
+    escritos por archivo.
+    """
+    columnas = [(nombre, tipo, df[nombre]) for nombre, tipo in COLUMNAS_ARTEFACTO.items() if nombre in df.columns]
+    banderas = BANDERA_SUGERENCIAS if sugerencias is not None else 0
+    archivos = {destino: _empaquetar(columnas, len(df), banderas, origen)}
+    if sugerencias is not None:
+        archivos[sugerencias] = _empaquetar([('sugerencias', TIPO_TEXTO, df['sugerencias'])], len(df), origen=origen)
+    for ruta, contenido in archivos.items():
+        Path(ruta).write_bytes(contenido)
+    return {str(ruta): len(contenido) for ruta, contenido in archivos.items()}
+
+
+def _leer_tabla(vista, posicion):
+    import numpy as np
+
+    cantidad, = struct.unpack_from('<I', vista, posicion)
+    desplazamientos = np.frombuffer(vista, dtype='<u4', count=cantidad + 1, offset=posicion + 4)
+    inicio = posicion + 4 + 4 * (cantidad + 1)
+    datos = bytes(vista[inicio:inicio + int(desplazamientos[-1])])
+    textos = [datos[a:b].decode('utf-8') for a, b in zip(desplazamientos[:-1].tolist(), desplazamientos[1:].tolist())]
+    fin = inicio + int(desplazamientos[-1])
+    return textos, fin + (-fin % 4)
+
+
+def leer_artefacto(contenido):
+    """
+    Decodifica un artefacto (bytes) a `{columna: arreglo o lista}`. Verifica
+    magia, versión y CRC-32 antes de tocar los datos. Las categorías quedan
+    como `(códigos, textos)` y las fechas como `datetime64[m]`.
+    """
+    import numpy as np
+
+    vista = memoryview(contenido)
+    magia, version, banderas, filas, total_columnas, _, largo, crc, origen = CABECERA.unpack_from(vista, 0)
+    if magia != MAGIA:
+        raise ValueError('No es un artefacto de encuesta')
+    if version != VERSION_FORMATO:
+        raise ValueError(f'Versión de artefacto no soportada: {version}')
+    carga = vista[CABECERA.size:CABECERA.size + largo]
+    if len(carga) != largo or zlib.crc32(carga) != crc:
+        raise ValueError('Artefacto corrupto: la suma de verificación no coincide')
+
+    columnas = {'__banderas__': banderas, '__origen__': origen.hex()}
+    posicion = 0
+    for _ in range(total_columnas):
+        largo_nombre, tipo = struct.unpack_from('<BB', carga, posicion)
+        nombre = bytes(carga[posicion + 2:posicion + 2 + largo_nombre]).decode('utf-8')
+        posicion += 2 + largo_nombre
+        posicion += -posicion % 4
+        if tipo == TIPO_CALIFICACION:
+            columnas[nombre] = np.frombuffer(carga, dtype=np.int8, count=filas, offset=posicion)
+            posicion += filas
+        elif tipo == TIPO_FECHA:
+            minutos = np.frombuffer(carga, dtype='<u4', count=filas, offset=posicion)
+            fechas = minutos.astype(np.int64).astype('datetime64[m]')
+            fechas[minutos == FECHA_FALTANTE] = np.datetime64('NaT')
+            columnas[nombre] = fechas
+            posicion += 4 * filas
+        elif tipo == TIPO_CATEGORIA:
+            textos, posicion = _leer_tabla(carga, posicion)
+            ancho, = struct.unpack_from('<I', carga, posicion)
+            codigos = np.frombuffer(carga, dtype='<u1' if ancho == 1 else '<u2', count=filas, offset=posicion + 4)
+            columnas[nombre] = (codigos, textos)
+            posicion += 4 + ancho * filas
+        elif tipo == TIPO_TEXTO:
+            columnas[nombre], posicion = _leer_tabla(carga, posicion)
+            continue
+        else:
+            raise ValueError(f'Tipo de columna desconocido: {tipo}')
+        posicion += -posicion % 4
+    return columnas
+
+
+def huella_origen(ruta=RUTA_ARTEFACTO):
+    """
+    Huella del CSV con el que se generó el artefacto, leyendo solo la
+    cabecera. None si el archivo no existe o no es un artefacto vigente.
+    """
+    try:
+        with open(ruta, 'rb') as archivo:
+            cabecera = archivo.read(CABECERA.size)
+    except OSError:
+        return None
+    if len(cabecera) < CABECERA.size:
+        return None
+    magia, version, *_, origen = CABECERA.unpack(cabecera)
+    if magia != MAGIA or version != VERSION_FORMATO:
+        return None
+    return origen.hex()
+
+
+def _medir(funcion, repeticiones=5):
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def _decodificar_csv(contenido):
+    """Lo mismo que hace el navegador con Papa.parse: texto -> filas con encabezados mapeados."""
+    import csv
+    import io
+
+    lector = csv.reader(io.StringIO(contenido.decode('utf-8-sig')), delimiter=';')
+    encabezados = [COLUMNAS.get(c.strip(), c.strip()) for c in next(lector)]
+    return [dict(zip(encabezados, fila)) for fila in lector if fila]
+
+
+def verificar(columnas, df):
+    """Diferencias entre el artefacto decodificado y el DataFrame de origen (lista vacía si coinciden)."""
+    import numpy as np
+
+    diferencias = []
+    for nombre, tipo in COLUMNAS_ARTEFACTO.items():
+        valor = columnas.get(nombre)
+        if tipo == TIPO_CALIFICACION:
+            igual = np.array_equal(valor, df[nombre].fillna(0).to_numpy(dtype=np.int8))
+        elif tipo == TIPO_FECHA:
+            igual = np.array_equal(valor, df[nombre].to_numpy(dtype='datetime64[m]'), equal_nan=True)
+        elif tipo == TIPO_CATEGORIA:
+            codigos, textos = valor
+            igual = [textos[c] for c in codigos.tolist()] == df[nombre].fillna('').astype(str).tolist()
+        else:
+            igual = valor == df[nombre].fillna('').astype(str).tolist()
+        if not igual:
+            diferencias.append(nombre)
+    return diferencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Artefacto binario compacto para el dashboard')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--destino', default=str(RUTA_ARTEFACTO))
+    parser.add_argument('--sugerencias', default=str(RUTA_SUGERENCIAS), help='Blob de sugerencias aparte')
+    parser.add_argument('--sin-sugerencias', action='store_true', help='No genera el blob de sugerencias')
+    args = parser.parse_args()
+
+    print("📦 ARTEFACTO BINARIO DEL DASHBOARD")
+    print("=" * 60)
+    df = cargar_encuestas(args.datos)
+    origen = huella_archivo(args.datos)
+    tamanos = escribir_artefacto(df, args.destino, None if args.sin_sugerencias else args.sugerencias, origen)
+
+    contenido_csv = Path(args.datos).read_bytes()
+    contenido_bin = Path(args.destino).read_bytes()
+    columnas = leer_artefacto(contenido_bin)
+    diferencias = verificar(columnas, df)
+    if diferencias:
+        print(f"❌ El artefacto no coincide con el CSV en: {', '.join(diferencias)}")
+        return 1
+    print(f"   • Registros: {len(df):,} | Columnas: {len(COLUMNAS_ARTEFACTO)} | Versión: {VERSION_FORMATO}")
+    print(f"   • Origen: {Path(args.datos).name} ({origen[:12]})")
+
+    print("\n📏 TAMAÑO (crudo / gzip):")
+    csv_gzip = len(gzip.compress(contenido_csv))
+    print(f"   • CSV: {len(contenido_csv) / 1024:,.1f} KB / {csv_gzip / 1024:,.1f} KB")
+    for ruta, tamano in tamanos.items():
+        comprimido = len(gzip.compress(Path(ruta).read_bytes()))
+        print(f"   • {Path(ruta).name}: {tamano / 1024:,.1f} KB ({tamano / len(contenido_csv) * 100:.1f}%) "
+              f"/ {comprimido / 1024:,.1f} KB ({comprimido / csv_gzip * 100:.1f}%)")
+
+    print("\n⏱️ DECODIFICACIÓN:")
+    tiempo_csv = _medir(lambda: _decodificar_csv(contenido_csv))
+    tiempo_bin = _medir(lambda: leer_artefacto(contenido_bin))
+    print(f"   • CSV: {tiempo_csv * 1000:.2f} ms | Binario: {tiempo_bin * 1000:.2f} ms "
+          f"({tiempo_csv / tiempo_bin:.1f}x más rápido)")
+    print(f"\n💾 Artefacto guardado en: {args.destino}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,470 @@
+# 📌 Bocetos probabilísticos combinables: HyperLogLog, KLL y count-min por partición diaria
+import argparse
+import base64
+import hashlib
+import heapq
+import json
+import math
+import random
+import time
+import zlib
+from array import array
+from pathlib import Path
+
+from .datos import METRICAS, RAIZ, RUTA_DATOS, cargar_encuestas, huella_archivo, terminos
+
+RUTA_BOCETOS = RAIZ / 'bocetos'
+VERSION_FORMATO = 1
+
+PRECISION_HLL = 12  # 4.096 registros: error estándar 1,04/√4096 ≈ 1,6 %
+K_KLL = 200  # Error de rango normalizado ≈ 1,65 % (cota empírica publicada para k=200)
+ANCHO_CM = 2048  # ε = e/ancho ≈ 0,13 % del total de términos
+PROFUNDIDAD_CM = 4  # δ = e^-profundidad ≈ 1,8 %
+CANDIDATOS = 64  # Términos frecuentes que se conservan como candidatos por boceto
+
+DIMENSIONES_BOCETOS = ('SEGMENTO', 'CIUDAD', 'AGENCIA')
+CUANTILES = (0.25, 0.5, 0.75, 0.9)
+
+
+def _hash64(valor, semilla=b''):
+    return int.from_bytes(hashlib.blake2b(str(valor).encode('utf-8'), digest_size=8, key=semilla).digest(), 'little')
+
+
+def _empacar(datos):
+    return base64.b64encode(zlib.compress(bytes(datos), 6)).decode('ascii')
+
+
+def _desempacar(texto):
+    return zlib.decompress(base64.b64decode(texto))
+
+
+class HyperLogLog:
+    """
+    Conteo aproximado de elementos distintos en memoria fija (2^precision bytes).
+
+    Error estándar relativo ≈ 1,04/√m (m = 2^precision): con precision=12,
+    ≈ 1,6 %, y el 95 % de las estimaciones cae dentro de ±3,2 %. Para
+    cardinalidades bajas (< 2,5·m) se usa conteo lineal, que es prácticamente
+    exacto. Combinar es tomar el máximo registro a registro, así que el
+    boceto de una unión es idéntico al construido sobre todos los datos.
+    """
+
+    def __init__(self, precision=PRECISION_HLL):
+        self.precision = precision
+        self.registros = bytearray(1 << precision)
+
+    def agregar(self, valor):
+        h = _hash64(valor)
+        indice = h >> (64 - self.precision)
+        resto = (h << self.precision) & ((1 << 64) - 1)
+        rango = min(64 - self.precision, 64 - resto.bit_length()) + 1
+        if rango > self.registros[indice]:
+            self.registros[indice] = rango
+
+    def combinar(self, otro):
+        if otro.precision != self.precision:
+            raise ValueError('Solo se combinan HyperLogLog de la misma precisión')
+        self.registros = bytearray(map(max, self.registros, otro.registros))
+        return self
+
+    def estimar(self):
+        m = len(self.registros)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        cruda = alfa * m * m / sum(2.0 ** -r for r in self.registros)
+        ceros = self.registros.count(0)
+        if cruda <= 2.5 * m and ceros:
+            return m * math.log(m / ceros)
+        return cruda
+
+    def error_estandar(self):
+        return 1.04 / math.sqrt(len(self.registros))
+
+    def a_dict(self):
+        return {'precision': self.precision, 'registros': _empacar(self.registros)}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        boceto = cls(datos['precision'])
+        boceto.registros = bytearray(_desempacar(datos['registros']))
+        return boceto
+
+
+class KLL:
+    """
+    Cuantiles aproximados con el boceto KLL (Karnin, Lang y Liberty).
+
+    Mantiene una pila de compactores de capacidad decreciente (k·c^profundidad);
+    al llenarse uno, se ordena y pasa la mitad de sus elementos (pares o impares
+    al azar) al nivel siguiente con el doble de peso. La memoria es
+    O(k·log(n/k)) y el error de rango normalizado es ≈ 1,65 % para k=200: el
+    valor devuelto para el cuantil q tiene un rango real en [q − ε, q + ε].
+    Mientras n < k el boceto es exacto. Combinar concatena los compactores
+    nivel a nivel y vuelve a comprimir; las garantías se mantienen.
+    """
+
+    def __init__(self, k=K_KLL, c=2 / 3, semilla=0):
+        self.k = k
+        self.c = c
+        self.n = 0
+        self.compactores = [[]]
+        self._azar = random.Random(semilla)
+        self._actualizar_capacidad()
+
+    def _capacidad(self, nivel):
+        profundidad = len(self.compactores) - nivel - 1
+        return int(math.ceil(self.k * self.c ** profundidad)) + 1
+
+    def _actualizar_capacidad(self):
+        self.capacidad_total = sum(self._capacidad(h) for h in range(len(self.compactores)))
+        self.tamano = sum(len(c) for c in self.compactores)
+
+    def agregar(self, valor):
+        self.compactores[0].append(valor)
+        self.n += 1
+        self.tamano += 1
+        if self.tamano >= self.capacidad_total:
+            self._comprimir()
+
+    def _compactar(self, nivel):
+        elementos = sorted(self.compactores[nivel])
+        sobrante = [elementos.pop()] if len(elementos) % 2 else []
+        desde = self._azar.randint(0, 1)
+        self.compactores[nivel] = sobrante
+        return elementos[desde::2]
+
+    def _comprimir(self):
+        for nivel in range(len(self.compactores)):
+            if len(self.compactores[nivel]) >= self._capacidad(nivel):
+                if nivel + 1 >= len(self.compactores):
+                    self.compactores.append([])
+                self.compactores[nivel + 1].extend(self._compactar(nivel))
+                self._actualizar_capacidad()
+                if self.tamano < self.capacidad_total:
+                    break
+
+    def combinar(self, otro):
+        while len(self.compactores) < len(otro.compactores):
+            self.compactores.append([])
+        for nivel, elementos in enumerate(otro.compactores):
+            self.compactores[nivel].extend(elementos)
+        self.n += otro.n
+        self._actualizar_capacidad()
+        while self.tamano >= self.capacidad_total:
+            antes = self.tamano
+            self._comprimir()
+            if self.tamano == antes:
+                break
+        return self
+
+    def _ponderados(self):
+        return sorted((valor, 1 << nivel) for nivel, elementos in enumerate(self.compactores) for valor in elementos)
+
+    def cuantiles(self, probabilidades=CUANTILES):
+        ponderados = self._ponderados()
+        total = sum(peso for _, peso in ponderados)
+        resultado = {}
+        if not total:
+            return {q: None for q in probabilidades}
+        for q in probabilidades:
+            acumulado = 0
+            for valor, peso in ponderados:
+                acumulado += peso
+                if acumulado >= q * total:
+                    resultado[q] = valor
+                    break
+        return resultado
+
+    def error_rango(self):
+        return 0.0 if len(self.compactores) == 1 else 1.65 * K_KLL / self.k / 100
+
+    def a_dict(self):
+        return {'k': self.k, 'n': self.n, 'compactores': self.compactores}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        boceto = cls(datos['k'])
+        boceto.n = datos['n']
+        boceto.compactores = [list(c) for c in datos['compactores']]
+        boceto._actualizar_capacidad()
+        return boceto
+
+
+class CountMin:
+    """
+    Frecuencias aproximadas de términos en una matriz fija de ancho × profundidad.
+
+    La estimación nunca es menor que la real y, con probabilidad ≥ 1 − e^-profundidad,
+    la excede en a lo sumo (e/ancho)·N, donde N es el total de términos
+    agregados: con 2048 × 4 contadores, ≤ 0,13 %·N con 98 % de confianza.
+    Se conserva además un conjunto acotado de candidatos para listar los
+    términos más frecuentes sin guardar el vocabulario. Combinar suma las
+    matrices celda a celda (exacto) y une los candidatos.
+    """
+
+    def __init__(self, ancho=ANCHO_CM, profundidad=PROFUNDIDAD_CM, candidatos=CANDIDATOS):
+        self.ancho = ancho
+        self.profundidad = profundidad
+        self.maximo_candidatos = candidatos
+        self.tabla = array('I', bytes(4 * ancho * profundidad))
+        self.total = 0
+        self.candidatos = set()
+
+    def _celdas(self, termino):
+        digest = hashlib.blake2b(termino.encode('utf-8'), digest_size=4 * self.profundidad).digest()
+        return [fila * self.ancho + int.from_bytes(digest[4 * fila:4 * fila + 4], 'little') % self.ancho
+                for fila in range(self.profundidad)]
+
+    def agregar(self, termino, cantidad=1):
+        for celda in self._celdas(termino):
+            self.tabla[celda] += cantidad
+        self.total += cantidad
+        self.candidatos.add(termino)
+        if len(self.candidatos) > 2 * self.maximo_candidatos:
+            self._podar()
+
+    def estimar(self, termino):
+        return min(self.tabla[celda] for celda in self._celdas(termino))
+
+    def _podar(self):
+        self.candidatos = set(heapq.nlargest(self.maximo_candidatos, self.candidatos,
+                                             key=lambda t: (self.estimar(t), t)))
+
+    def combinar(self, otro):
+        if (otro.ancho, otro.profundidad) != (self.ancho, self.profundidad):
+            raise ValueError('Solo se combinan count-min de la misma forma')
+        for celda, valor in enumerate(otro.tabla):
+            if valor:
+                self.tabla[celda] += valor
+        self.total += otro.total
+        self.candidatos |= otro.candidatos
+        self._podar()
+        return self
+
+    def frecuentes(self, k=10):
+        return heapq.nlargest(k, ((t, self.estimar(t)) for t in self.candidatos), key=lambda par: (par[1], par[0]))
+
+    def error_maximo(self):
+        return math.e / self.ancho * self.total
+
+    def a_dict(self):
+        return {'ancho': self.ancho, 'profundidad': self.profundidad, 'total': self.total,
+                'tabla': _empacar(self.tabla.tobytes()), 'candidatos': sorted(self.candidatos)}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        boceto = cls(datos['ancho'], datos['profundidad'])
+        boceto.tabla = array('I')
+        boceto.tabla.frombytes(_desempacar(datos['tabla']))
+        boceto.total = datos['total']
+        boceto.candidatos = set(datos['candidatos'])
+        return boceto
+
+
+class BocetosGrupo:
+    """Los bocetos de un grupo: encuestados distintos, cuantiles por métrica y términos de sugerencias."""
+
+    def __init__(self):
+        self.respuestas = 0
+        self.encuestados = HyperLogLog()
+        self.calificaciones = {metrica: KLL() for metrica in METRICAS}
+        self.terminos = CountMin()
+
+    def registrar(self, fila):
+        self.respuestas += 1
+        self.encuestados.agregar(llave_encuestado(fila))
+        for metrica, boceto in self.calificaciones.items():
+            valor = fila.get(metrica)
+            if valor is not None and valor == valor:
+                boceto.agregar(int(valor))
+        for termino in terminos(fila.get('sugerencias')):
+            self.terminos.agregar(termino)
+
+    def combinar(self, otro):
+        self.respuestas += otro.respuestas
+        self.encuestados.combinar(otro.encuestados)
+        for metrica, boceto in self.calificaciones.items():
+            boceto.combinar(otro.calificaciones[metrica])
+        self.terminos.combinar(otro.terminos)
+        return self
+
+    def a_dict(self):
+        return {
+            'respuestas': self.respuestas,
+            'encuestados': self.encuestados.a_dict(),
+            'calificaciones': {m: b.a_dict() for m, b in self.calificaciones.items()},
+            'terminos': self.terminos.a_dict(),
+        }
+
+    @classmethod
+    def desde_dict(cls, datos):
+        grupo = cls()
+        grupo.respuestas = datos['respuestas']
+        grupo.encuestados = HyperLogLog.desde_dict(datos['encuestados'])
+        grupo.calificaciones = {m: KLL.desde_dict(b) for m, b in datos['calificaciones'].items()}
+        grupo.terminos = CountMin.desde_dict(datos['terminos'])
+        return grupo
+
+
+def llave_encuestado(fila):
+    """Identifica al encuestado por CEDULA; si falta, por EMAIL en minúscula."""
+    cedula = fila.get('CEDULA')
+    if cedula is not None and cedula == cedula and str(cedula).strip():
+        return f"C:{str(cedula).strip()}"
+    return f"E:{str(fila.get('EMAIL') or '').strip().lower()}"
+
+
+def grupos_de(fila, dimensiones=DIMENSIONES_BOCETOS):
+    grupos = ['TOTAL']
+    for dimension in dimensiones:
+        valor = fila.get(dimension)
+        if isinstance(valor, str) and valor:
+            grupos.append(f"{dimension}={valor}")
+    return grupos
+
+
+def construir_particiones(encuestas):
+    """Un diccionario `{día: {grupo: BocetosGrupo}}` en una sola pasada por las respuestas."""
+    columnas = ['DATE_MODIFIED', 'CEDULA', 'EMAIL', 'sugerencias', *DIMENSIONES_BOCETOS, *METRICAS]
+    particiones = {}
+    for fila in encuestas[[c for c in columnas if c in encuestas.columns]].to_dict('records'):
+        fecha = fila['DATE_MODIFIED']
+        dia = fecha.date().isoformat() if fecha == fecha else 'sin-fecha'
+        grupos = particiones.setdefault(dia, {})
+        for grupo in grupos_de(fila):
+            grupos.setdefault(grupo, BocetosGrupo()).registrar(fila)
+    return particiones
+
+
+def guardar_particiones(particiones, destino=RUTA_BOCETOS, huella=None):
+    """
+    Una partición por archivo (`AAAA-MM-DD.json`) y un manifiesto con la
+    versión del dataset. Los días de una construcción anterior que ya no
+    están en `particiones` se borran.
+    """
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    for ruta in destino.glob('*.json'):
+        if ruta.stem != 'manifiesto' and ruta.stem not in particiones:
+            ruta.unlink()
+    for dia, grupos in particiones.items():
+        contenido = {'version': VERSION_FORMATO, 'dia': dia, 'grupos': {g: b.a_dict() for g, b in grupos.items()}}
+        (destino / f"{dia}.json").write_text(json.dumps(contenido, ensure_ascii=False), encoding='utf-8')
+    manifiesto = {'version': VERSION_FORMATO, 'huella': huella, 'particiones': sorted(particiones)}
+    (destino / 'manifiesto.json').write_text(json.dumps(manifiesto, indent=2), encoding='utf-8')
+
+
+def cargar_particion(ruta):
+    contenido = json.loads(Path(ruta).read_text(encoding='utf-8'))
+    if contenido.get('version') != VERSION_FORMATO:
+        raise ValueError(f"Partición con formato desconocido: {ruta}")
+    return {g: BocetosGrupo.desde_dict(b) for g, b in contenido['grupos'].items()}
+
+
+def combinar_particiones(origen=RUTA_BOCETOS, grupo='TOTAL', desde=None, hasta=None):
+    """
+    Combina los bocetos de `grupo` en las particiones del rango [desde, hasta]
+    (fechas ISO). Solo se leen los días listados en el manifiesto, así un
+    archivo suelto de otra construcción no se mezcla. Solo hay un
+    `BocetosGrupo` en memoria a la vez además del acumulado, así que la
+    memoria no crece con el número de olas.
+    """
+    origen = Path(origen)
+    manifiesto = json.loads((origen / 'manifiesto.json').read_text(encoding='utf-8'))
+    acumulado = BocetosGrupo()
+    for dia in manifiesto['particiones']:
+        if (desde and dia < desde) or (hasta and dia > hasta):
+            continue
+        boceto = cargar_particion(origen / f"{dia}.json").get(grupo)
+        if boceto is not None:
+            acumulado.combinar(boceto)
+    return acumulado
+
+
+def resumen_exacto(encuestas, grupo='TOTAL'):
+    """Los mismos agregados calculados de forma exacta, para medir el error de los bocetos."""
+    if grupo != 'TOTAL':
+        dimension, valor = grupo.split('=', 1)
+        encuestas = encuestas[encuestas[dimension] == valor]
+    filas = encuestas.to_dict('records')
+    conteo_terminos = {}
+    for fila in filas:
+        for termino in terminos(fila.get('sugerencias')):
+            conteo_terminos[termino] = conteo_terminos.get(termino, 0) + 1
+    return {
+        'respuestas': len(filas),
+        'encuestados': len({llave_encuestado(fila) for fila in filas}),
+        'calificaciones': {m: encuestas[m].dropna().astype(int).tolist() for m in METRICAS},
+        'terminos': conteo_terminos,
+    }
+
+
+def error_de_rango(valores, q, estimado):
+    """Distancia entre q y el intervalo de rangos normalizados que ocupa `estimado` en `valores`."""
+    if not valores:
+        return 0.0
+    n = len(valores)
+    menores = sum(1 for v in valores if v < estimado) / n
+    hasta = sum(1 for v in valores if v <= estimado) / n
+    return 0.0 if menores <= q <= hasta else min(abs(q - menores), abs(q - hasta))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bocetos combinables por partición diaria')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--destino', default=str(RUTA_BOCETOS))
+    parser.add_argument('--grupo', default='TOTAL', help="Grupo a consultar: TOTAL o DIMENSION=valor")
+    parser.add_argument('--desde', help='Primera partición (AAAA-MM-DD)')
+    parser.add_argument('--hasta', help='Última partición (AAAA-MM-DD)')
+    args = parser.parse_args()
+
+    print("🧮 BOCETOS PROBABILÍSTICOS")
+    print("=" * 60)
+    encuestas = cargar_encuestas(args.datos)
+
+    inicio = time.perf_counter()
+    particiones = construir_particiones(encuestas)
+    guardar_particiones(particiones, args.destino, huella_archivo(args.datos))
+    print(f"   • Particiones guardadas: {len(particiones)} en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    tamano = sum(r.stat().st_size for r in Path(args.destino).glob('*.json'))
+    print(f"   • Tamaño en disco: {tamano / 1024:.0f} KB")
+
+    inicio = time.perf_counter()
+    boceto = combinar_particiones(args.destino, args.grupo, args.desde, args.hasta)
+    milisegundos = (time.perf_counter() - inicio) * 1000
+    print(f"   • Combinación de '{args.grupo}': {boceto.respuestas:,} respuestas en {milisegundos:.0f} ms")
+
+    if args.desde or args.hasta:
+        import pandas as pd
+
+        fechas = encuestas['DATE_MODIFIED']
+        if args.desde:
+            encuestas = encuestas[fechas >= pd.Timestamp(args.desde)]
+        if args.hasta:
+            encuestas = encuestas[encuestas['DATE_MODIFIED'] < pd.Timestamp(args.hasta) + pd.Timedelta(days=1)]
+    exacto = resumen_exacto(encuestas, args.grupo)
+
+    estimado = boceto.encuestados.estimar()
+    real = exacto['encuestados']
+    relativo = abs(estimado - real) / real * 100 if real else 0.0
+    print("\n👤 ENCUESTADOS DISTINTOS (HyperLogLog):")
+    print(f"   • Estimado: {estimado:,.0f} | Exacto: {real:,} | Error: {relativo:.2f}% "
+          f"(error estándar {boceto.encuestados.error_estandar() * 100:.1f}%)")
+
+    print("\n📊 CUANTILES DE CALIFICACIÓN (KLL):")
+    for metrica, nombre in METRICAS.items():
+        kll = boceto.calificaciones[metrica]
+        valores = exacto['calificaciones'][metrica]
+        cuantiles = kll.cuantiles()
+        peor = max((error_de_rango(valores, q, v) for q, v in cuantiles.items() if v is not None), default=0.0)
+        texto = ', '.join(f"p{int(q * 100)}={v}" for q, v in cuantiles.items())
+        print(f"   • {nombre}: {texto} | error de rango máx {peor * 100:.2f}% (cota {kll.error_rango() * 100:.2f}%)")
+
+    print("\n💬 TÉRMINOS MÁS FRECUENTES (count-min):")
+    cota = boceto.terminos.error_maximo()
+    for termino, estimada in boceto.terminos.frecuentes(10):
+        print(f"   • {termino}: {estimada} (exacto {exacto['terminos'].get(termino, 0)})")
+    print(f"   • Sobreconteo máximo esperado: {cota:.1f} de {boceto.terminos.total:,} términos")
+
+
+if __name__ == "__main__":
+    main()
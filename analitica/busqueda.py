@@ -0,0 +1,336 @@
+# 📌 Búsqueda de texto completo en sugerencias: índice invertido persistente con frases y filtros
+import argparse
+import base64
+import bisect
+import hashlib
+import json
+import re
+import time
+import zlib
+from array import array
+from pathlib import Path
+
+from .datos import RAIZ, RUTA_DATOS, cargar_encuestas, huella_archivo, limpiar_sugerencia, plegar, tokenizar
+
+RUTA_INDICE = RAIZ / 'indice' / 'sugerencias.json'
+VERSION_FORMATO = 2  # 2: la huella incluye las dimensiones
+
+DIMENSIONES_BUSQUEDA = ('SEGMENTO', 'CIUDAD', 'AGENCIA', 'EJECUTIVO_FINAL')
+PATRON_CONSULTA = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def _vista(lista):
+    """Vista NumPy sin copia de una lista de documentos (`array('I')`), para operar en C."""
+    import numpy as np
+
+    return np.frombuffer(lista, dtype=np.uint32) if len(lista) else np.zeros(0, dtype=np.uint32)
+
+
+def _empacar(arreglo):
+    return base64.b64encode(zlib.compress(arreglo.tobytes(), 6)).decode('ascii')
+
+
+def _desempacar(texto, tipo='I'):
+    arreglo = array(tipo)
+    arreglo.frombytes(zlib.decompress(base64.b64decode(texto)))
+    return arreglo
+
+
+class IndiceSugerencias:
+    """
+    Índice invertido de las sugerencias limpias.
+
+    Cada documento (una respuesta con sugerencia) recibe un número
+    consecutivo; `postings[termino]` es la lista ordenada de documentos que
+    lo contienen. Para las frases se guarda además la secuencia de tokens
+    plegados de cada documento: los candidatos salen de intersecar las
+    listas y la frase se confirma con una búsqueda de subcadena en C. Las dimensiones (agencia,
+    ejecutivo, ...) son listas de documentos más, así un filtro se resuelve
+    con la misma intersección que un término. Las consultas operan sobre
+    vistas NumPy de estas listas (sin copia) para intersecar en C. Agregar respuestas nuevas solo
+    extiende las listas; una respuesta cuyo texto cambió deja su documento
+    viejo como eliminado y se indexa de nuevo; lo mismo si cambió de
+    agencia, ejecutivo u otra dimensión.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.plegados = []  # documento -> ' token token ... ' para verificar frases
+        self.dimensiones = {}  # (dimensión, valor plegado) -> documentos
+        self.documentos = []  # documento -> (ID, texto limpio)
+        self.por_id = {}  # ID -> (documento, huella del texto y las dimensiones)
+        self.eliminados = set()
+        self.version = None
+        self._ordenado = None  # Vocabulario ordenado para expandir prefijos con bisect
+
+    def __len__(self):
+        return len(self.documentos) - len(self.eliminados)
+
+    def agregar(self, identificador, texto, dimensiones=None):
+        """
+        Indexa una respuesta; retorna False si ya estaba con el mismo texto y
+        las mismas dimensiones, o si no aporta contenido.
+        """
+        limpio = limpiar_sugerencia(texto)
+        valores = {d: plegar(v.strip()) for d, v in (dimensiones or {}).items() if isinstance(v, str) and v.strip()}
+        firma = '\x1f'.join([limpio, *(f'{d}={v}' for d, v in sorted(valores.items()))])
+        huella = hashlib.blake2b(firma.encode('utf-8'), digest_size=8).hexdigest()
+        previo = self.por_id.get(identificador)
+        if previo is not None:
+            if previo[1] == huella:
+                return False
+            self.eliminados.add(previo[0])
+            del self.por_id[identificador]
+        if not limpio:
+            return previo is not None
+
+        documento = len(self.documentos)
+        self.documentos.append((identificador, limpio))
+        self.por_id[identificador] = (documento, huella)
+        tokens = tokenizar(limpio)
+        self.plegados.append(f" {' '.join(tokens)} ")
+        for token in dict.fromkeys(tokens):
+            self.postings.setdefault(token, array('I')).append(documento)
+        for dimension, valor in valores.items():
+            self.dimensiones.setdefault((dimension, valor), array('I')).append(documento)
+        return True
+
+    def eliminar(self, identificador):
+        """Marca como eliminado el documento de una respuesta; retorna False si no estaba indexada."""
+        previo = self.por_id.pop(identificador, None)
+        if previo is None:
+            return False
+        self.eliminados.add(previo[0])
+        return True
+
+    def actualizar(self, encuestas, version=None, completo=True):
+        """
+        Agrega (o reindexa) las respuestas de un DataFrame; retorna cuántas cambiaron.
+
+        Con `completo` el DataFrame es el dataset entero: las respuestas
+        indexadas cuyo ID ya no aparece se marcan como eliminadas (las que
+        quedaron sin sugerencia las elimina `agregar`).
+        """
+        columnas = ['ID', 'sugerencias', *[d for d in DIMENSIONES_BUSQUEDA if d in encuestas.columns]]
+        cambios = 0
+        vigentes = set()
+        for fila in encuestas[columnas].to_dict('records'):
+            identificador = str(fila['ID'])
+            vigentes.add(identificador)
+            dimensiones = {d: fila[d] for d in DIMENSIONES_BUSQUEDA if d in fila}
+            cambios += self.agregar(identificador, fila['sugerencias'], dimensiones)
+        if completo:
+            for identificador in self.por_id.keys() - vigentes:
+                cambios += self.eliminar(identificador)
+        self.version = version
+        return cambios
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def _vocabulario(self):
+        if self._ordenado is None or len(self._ordenado) != len(self.postings):
+            self._ordenado = sorted(self.postings)
+        return self._ordenado
+
+    def _termino(self, token):
+        if token.endswith('*') and len(token) > 1:
+            prefijo = token[:-1]
+            import numpy as np
+
+            vocabulario = self._vocabulario()
+            listas = []
+            for posicion in range(bisect.bisect_left(vocabulario, prefijo), len(vocabulario)):
+                if not vocabulario[posicion].startswith(prefijo):
+                    break
+                listas.append(_vista(self.postings[vocabulario[posicion]]))
+            return np.unique(np.concatenate(listas)) if listas else _vista(array('I'))
+        return _vista(self.postings.get(token, array('I')))
+
+    def _frase(self, tokens, dentro=None):
+        """Documentos con los tokens consecutivos; `dentro` acota los candidatos antes de verificar la frase."""
+        import numpy as np
+
+        listas = [self.postings.get(t) for t in tokens]
+        if any(lista is None for lista in listas):
+            return _vista(array('I'))
+        candidatos = dentro
+        for lista in sorted(listas, key=len):
+            candidatos = _vista(lista) if candidatos is None else np.intersect1d(candidatos, _vista(lista), assume_unique=True)
+        frase = f" {' '.join(tokens)} "
+        plegados = self.plegados
+        return _vista(array('I', [d for d in candidatos.tolist() if frase in plegados[d]]))
+
+    def _filtro(self, dimension, valores):
+        valores = [valores] if isinstance(valores, str) else valores
+        import numpy as np
+
+        listas = [_vista(self.dimensiones.get((dimension, plegar(v.strip())), array('I'))) for v in valores]
+        return listas[0] if len(listas) == 1 else np.unique(np.concatenate(listas))
+
+    def buscar(self, consulta, filtros=None, limite=None):
+        """
+        Documentos que cumplen `consulta` y los filtros de dimensión.
+
+        Sintaxis: términos separados por espacio se combinan con AND; `OR`
+        separa alternativas; `-termino` o `NOT termino` excluye; `"frase
+        exacta"` exige términos consecutivos; `prefijo*` expande. Todo se
+        pliega igual que el índice (sin tildes, en minúscula). `filtros` es un
+        diccionario dimensión -> valor o lista de valores; se intersecan antes
+        que las frases, para verificar solo los candidatos.
+        """
+        import numpy as np
+
+        restricciones = [self._filtro(d, v) for d, v in (filtros or {}).items()]
+        alternativas = []
+        for grupo in re.split(r'\s+OR\s+', consulta.strip()):
+            simples, frases, negativos = list(restricciones), [], []
+            negar = False
+            for frase, palabra in PATRON_CONSULTA.findall(grupo):
+                if palabra == 'NOT':
+                    negar = True
+                    continue
+                excluir = negar or palabra.startswith('-')
+                negar = False
+                tokens = tokenizar(frase if frase else palabra.lstrip('-'))
+                if palabra.endswith('*') and tokens:
+                    tokens[-1] += '*'
+                if not tokens:
+                    continue
+                if excluir:
+                    negativos.append(self._frase(tokens) if len(tokens) > 1 else self._termino(tokens[0]))
+                elif len(tokens) > 1:
+                    frases.append(tokens)
+                else:
+                    simples.append(self._termino(tokens[0]))
+            if len(simples) == len(restricciones) and not frases:
+                continue  # Solo exclusiones o filtros: no es una consulta
+
+            documentos = None
+            for lista in sorted(simples, key=len):
+                documentos = lista if documentos is None else np.intersect1d(documentos, lista, assume_unique=True)
+            for tokens in frases:
+                documentos = self._frase(tokens, documentos)
+            if negativos and len(documentos):
+                documentos = np.setdiff1d(documentos, np.concatenate(negativos), assume_unique=False)
+            alternativas.append(documentos)
+
+        if not alternativas:
+            return []
+        documentos = alternativas[0] if len(alternativas) == 1 else np.unique(np.concatenate(alternativas))
+        if self.eliminados:
+            documentos = np.setdiff1d(documentos, np.fromiter(self.eliminados, dtype=np.uint32), assume_unique=True)
+        return (documentos[:limite] if limite else documentos).tolist()
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+
+    def guardar(self, ruta=RUTA_INDICE):
+        ruta = Path(ruta)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        contenido = {
+            'version_formato': VERSION_FORMATO,
+            'version': self.version,
+            'documentos': self.documentos,
+            'huellas': {i: h for i, (_, h) in self.por_id.items()},
+            'eliminados': sorted(self.eliminados),
+            'postings': {t: _empacar(lista) for t, lista in self.postings.items()},
+            'dimensiones': [[d, v, _empacar(lista)] for (d, v), lista in self.dimensiones.items()],
+        }
+        temporal = ruta.with_suffix('.tmp')
+        temporal.write_text(json.dumps(contenido, ensure_ascii=False, separators=(',', ':')), encoding='utf-8')
+        temporal.replace(ruta)
+
+    @classmethod
+    def cargar(cls, ruta=RUTA_INDICE):
+        contenido = json.loads(Path(ruta).read_text(encoding='utf-8'))
+        if contenido.get('version_formato') != VERSION_FORMATO:
+            raise ValueError(f"Índice con formato desconocido: {ruta}")
+        indice = cls()
+        indice.version = contenido['version']
+        indice.documentos = [tuple(d) for d in contenido['documentos']]
+        indice.eliminados = set(contenido['eliminados'])
+        vigentes = {}
+        for documento, (identificador, _) in enumerate(indice.documentos):
+            if documento not in indice.eliminados:
+                vigentes[identificador] = documento
+        indice.por_id = {i: (vigentes[i], h) for i, h in contenido['huellas'].items()}
+        indice.postings = {t: _desempacar(p) for t, p in contenido['postings'].items()}
+        indice.plegados = [f" {' '.join(tokenizar(texto))} " for _, texto in indice.documentos]
+        indice.dimensiones = {(d, v): _desempacar(p) for d, v, p in contenido['dimensiones']}
+        return indice
+
+
+def indice_vigente(ruta_datos=RUTA_DATOS, ruta_indice=RUTA_INDICE):
+    """
+    Abre el índice guardado y lo pone al día con `datos.csv`: si la huella
+    cambió, solo se indexan las respuestas nuevas o modificadas y se dan de
+    baja las que desaparecieron o quedaron sin sugerencia. Retorna
+    `(indice, cambios)`.
+    """
+    huella = huella_archivo(ruta_datos)
+    indice = IndiceSugerencias.cargar(ruta_indice) if Path(ruta_indice).exists() else IndiceSugerencias()
+    if indice.version == huella:
+        return indice, 0
+    cambios = indice.actualizar(cargar_encuestas(ruta_datos), huella)
+    indice.guardar(ruta_indice)
+    return indice, cambios
+
+
+def resaltar(texto, consulta):
+    """Marca con ** las palabras del texto que coinciden con un término o prefijo de la consulta."""
+    exactos = {t for t in tokenizar(consulta) if t not in ('or', 'not')}
+    prefijos = tuple(plegar(p) for p in re.findall(r'(\w+)\*', consulta))
+
+    def marcar(coincidencia):
+        palabra = plegar(coincidencia.group(0))
+        destacada = palabra in exactos or (prefijos and palabra.startswith(prefijos))
+        return f"**{coincidencia.group(0)}**" if destacada else coincidencia.group(0)
+
+    return re.sub(r'\w+', marcar, texto)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Búsqueda en sugerencias con índice invertido')
+    parser.add_argument('consulta', help='Ej.: tasa OR "muy demorado" -app, demora*')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--indice', default=str(RUTA_INDICE))
+    for dimension in DIMENSIONES_BUSQUEDA:
+        parser.add_argument(f"--{dimension.lower().replace('_final', '')}", dest=dimension, action='append')
+    parser.add_argument('--limite', type=int, default=20)
+    parser.add_argument('--replicar', type=int, default=0,
+                        help='Mide la latencia sobre un índice en memoria con N copias de los datos')
+    args = parser.parse_args()
+
+    print("🔎 BÚSQUEDA EN SUGERENCIAS")
+    print("=" * 60)
+    inicio = time.perf_counter()
+    indice, cambios = indice_vigente(args.datos, args.indice)
+    print(f"   • Documentos: {len(indice):,} | Términos: {len(indice.postings):,} | "
+          f"Actualizados: {cambios:,} ({(time.perf_counter() - inicio) * 1000:.0f} ms)")
+
+    filtros = {d: getattr(args, d) for d in DIMENSIONES_BUSQUEDA if getattr(args, d)}
+    if args.replicar:
+        encuestas = cargar_encuestas(args.datos)
+        indice = IndiceSugerencias()
+        for copia in range(args.replicar):
+            indice.actualizar(encuestas.assign(ID=encuestas['ID'].astype(str) + f'#{copia}'), completo=False)
+        print(f"   • Índice replicado: {len(indice):,} documentos")
+
+    repeticiones = 200
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        documentos = indice.buscar(args.consulta, filtros)
+    microsegundos = (time.perf_counter() - inicio) / repeticiones * 1e6
+    print(f"   • Consulta: {args.consulta!r} {filtros or ''}")
+    print(f"   • Coincidencias: {len(documentos):,} en {microsegundos:,.0f} µs")
+    print()
+    for documento in documentos[:args.limite]:
+        identificador, texto = indice.documentos[documento]
+        print(f"   • [{identificador}] {resaltar(texto, args.consulta)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# 📌 Memoización de consultas con desalojo LRU e invalidación por versión del dataset
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .datos import RUTA_DATOS
+from .motor import MotorEncuestas, normalizar_filtros
+
+MAXIMO_ENTRADAS = 512
+MAXIMO_BYTES = 64 * 1024 * 1024
+
+
+def tamano_aproximado(valor):
+    """Tamaño en bytes del resultado serializado como JSON (lo que viaja al dashboard)."""
+    return len(json.dumps(valor, ensure_ascii=False, default=str))
+
+
+class CacheLRU:
+    """
+    Cache LRU con presupuesto de entradas y de bytes.
+
+    Un acierto es una búsqueda en diccionario más `move_to_end`; el costo de
+    medir el tamaño solo se paga al guardar. Es seguro entre hilos porque el
+    servidor resuelve consultas en el pool del bucle de eventos.
+    """
+
+    def __init__(self, max_entradas=MAXIMO_ENTRADAS, max_bytes=MAXIMO_BYTES, medir=tamano_aproximado):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.medir = medir
+        self._datos = OrderedDict()
+        self._bytes = 0
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def __len__(self):
+        return len(self._datos)
+
+    def __contains__(self, llave):
+        return llave in self._datos
+
+    def obtener(self, llave):
+        """Retorna `(True, valor)` si la llave está en cache o `(False, None)`."""
+        with self._candado:
+            entrada = self._datos.get(llave)
+            if entrada is None:
+                self.fallos += 1
+                return False, None
+            self._datos.move_to_end(llave)
+            self.aciertos += 1
+            return True, entrada[0]
+
+    def guardar(self, llave, valor):
+        tamano = self.medir(valor)
+        if tamano > self.max_bytes:
+            return  # Nunca cabría: no vale la pena desalojar todo por él
+        with self._candado:
+            anterior = self._datos.pop(llave, None)
+            if anterior is not None:
+                self._bytes -= anterior[1]
+            self._datos[llave] = (valor, tamano)
+            self._bytes += tamano
+            while len(self._datos) > self.max_entradas or self._bytes > self.max_bytes:
+                _, (_, liberado) = self._datos.popitem(last=False)
+                self._bytes -= liberado
+                self.desalojos += 1
+
+    def limpiar(self):
+        with self._candado:
+            self._datos.clear()
+            self._bytes = 0
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            'entradas': len(self._datos),
+            'bytes': self._bytes,
+            'max_entradas': self.max_entradas,
+            'max_bytes': self.max_bytes,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'desalojos': self.desalojos,
+            'tasa_aciertos': round(self.aciertos / consultas * 100, 1) if consultas else 0,
+        }
+
+
+class ConsultasMemoizadas:
+    """
+    Fuente de datos para el servidor y los scripts: motor + cache.
+
+    La llave de cada resultado es `(versión, consulta, filtros normalizados,
+    parámetros)`. Si `datos.csv` cambia en disco (fecha o tamaño distintos y
+    huella distinta) se recarga el motor y se vacía la cache; la revisión del
+    archivo se limita a una vez por `intervalo_verificacion` segundos para que
+    un acierto siga costando solo la búsqueda.
+    """
+
+    def __init__(self, ruta=RUTA_DATOS, cache=None, intervalo_verificacion=1.0, motor=None):
+        self.ruta = ruta
+        self.cache = cache if cache is not None else CacheLRU()
+        self.intervalo_verificacion = intervalo_verificacion
+        self.recargas = 0
+        self._candado = threading.Lock()
+        self._revisado = time.monotonic()
+        self._firma = self._firma_archivo()
+        self._motor = motor if motor is not None else MotorEncuestas.desde_archivo(ruta)
+
+    def _firma_archivo(self):
+        try:
+            estado = os.stat(self.ruta)
+        except OSError:
+            return None
+        return estado.st_mtime_ns, estado.st_size
+
+    def verificar(self):
+        """
+        Revisa la firma del archivo (como mucho una vez por intervalo) y
+        recarga el motor si cambió. Puede parsear el CSV completo: fuera de un
+        hilo de trabajo no se debe llamar desde un bucle de eventos.
+        """
+        ahora = time.monotonic()
+        if ahora - self._revisado >= self.intervalo_verificacion:
+            self._revisado = ahora
+            firma = self._firma_archivo()
+            if firma is not None and firma != self._firma:
+                self._recargar(firma)
+        return self._motor
+
+    @property
+    def motor(self):
+        return self.verificar()
+
+    @property
+    def version(self):
+        """Versión del motor cargado, sin revisar el archivo (no bloquea)."""
+        return self._motor.version
+
+    def _recargar(self, firma):
+        with self._candado:
+            if firma == self._firma:
+                return
+            nuevo = MotorEncuestas.desde_archivo(self.ruta)
+            self._firma = firma
+            if nuevo.version != self._motor.version:
+                self._motor = nuevo
+                self.cache.limpiar()
+                self.recargas += 1
+
+    def consultar(self, consulta, filtros=(), **parametros):
+        """
+        Ejecuta `motor.<consulta>(..., filtros)` o retorna el resultado memoizado.
+
+        `filtros` puede venir ya normalizado (tupla) o como dict de parámetros.
+        """
+        if isinstance(filtros, dict):
+            filtros = normalizar_filtros(filtros)
+        motor = self.motor
+        llave = (motor.version, consulta, filtros, tuple(sorted(parametros.items())))
+        encontrado, valor = self.cache.obtener(llave)
+        if encontrado:
+            return valor
+        valor = getattr(motor, consulta)(filtros=filtros, **parametros)
+        self.cache.guardar(llave, valor)
+        return valor
+
+    def estadisticas(self):
+        resumen = self.cache.estadisticas()
+        resumen['version'] = self._motor.version
+        resumen['recargas'] = self.recargas
+        return resumen
@@ -0,0 +1,244 @@
+# 📌 Conciliación difusa por bloques de nombres de ejecutivos entre archivos
+import argparse
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import pandas as pd
+
+from .datos import RAIZ, RUTA_DATOS, RUTA_EJECUTIVOS, cargar_ejecutivos, cargar_encuestas
+
+# Fuera de `public/`: esa carpeta se publica tal cual con el dashboard
+RUTA_MAPEO = RAIZ / 'mapeo-ejecutivos.csv'
+
+UMBRAL_CONFIANZA = 0.85
+UMBRAL_MINIMO = 0.5  # Por debajo no hay candidato plausible ni para revisión manual
+SIMILITUD_TOKEN = 0.8  # Dos tokens cuentan como el mismo desde aquí ('MUNOS' ~ 'MUNOZ')
+MAXIMO_BLOQUE = 200  # Tokens más frecuentes que esto no sirven para bloquear
+LONGITUD_MINIMA_TOKEN = 3
+
+# Palabras que delatan una entrada del roster que no es una persona
+TOKENS_NO_PERSONA = {
+    'SAS', 'LTDA', 'LIMITADA', 'SA', 'CDT', 'CDTIANDO', 'FREELANCER', 'EJECUTIVOS',
+    'GERENTE', 'CUENTA', 'OFICINA', 'CENTRAL', 'VP', 'CORREDORES', 'CONSULTANTS',
+    'FINANCIAL', 'PLANNING', 'CAPITAL', 'INVER', 'KAPITAL', 'PLANEACION', 'ESTRATEGICA',
+}
+
+COLUMNAS_MAPEO = [
+    'fuente', 'nombre_origen', 'nombre_normalizado', 'agencia', 'ciudad',
+    'nombre_canonico', 'confianza', 'metodo', 'es_persona',
+]
+
+
+def normalizar_nombre(texto):
+    """
+    Mayúsculas sin tildes ni signos, con espacios colapsados:
+    'Cindy Johana Peña  García' -> 'CINDY JOHANA PENA GARCIA'.
+    """
+    if not isinstance(texto, str):
+        return ''
+    sin_tildes = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    limpio = re.sub(r'[^A-Z0-9& ]+', ' ', sin_tildes.upper().replace('.', ''))
+    return ' '.join(limpio.split())
+
+
+def es_persona(nombre_normalizado):
+    """Heurística: al menos dos tokens y ninguno típico de razón social o cargo."""
+    tokens = nombre_normalizado.split()
+    if len(tokens) < 2 or '&' in nombre_normalizado:
+        return False
+    return not any(t in TOKENS_NO_PERSONA or 'CDT' in t for t in tokens)
+
+
+def llaves_bloque(nombre_normalizado, ciudad):
+    """
+    Llaves de bloqueo de un nombre: cada token significativo combinado con
+    la ciudad, y los mismos tokens solos como respaldo.
+    """
+    tokens = {t for t in nombre_normalizado.split() if len(t) >= LONGITUD_MINIMA_TOKEN}
+    llaves = {('ciudad', ciudad, t) for t in tokens}
+    llaves.update(('token', t) for t in tokens)
+    return llaves
+
+
+def _parecido_tokens(tokens_a, tokens_b):
+    """
+    Promedio, en ambos sentidos, del mejor parecido de cada token con los
+    del otro nombre. Un token con errores de digitación aporta casi lo mismo
+    que uno idéntico; uno sin pareja (ratio < SIMILITUD_TOKEN) no aporta.
+    """
+    def sentido(origen, destino):
+        total = 0.0
+        for token in origen:
+            mejor = max(SequenceMatcher(None, token, otro).ratio() for otro in destino)
+            total += mejor if mejor >= SIMILITUD_TOKEN else 0.0
+        return total / len(origen)
+
+    return (sentido(tokens_a, tokens_b) + sentido(tokens_b, tokens_a)) / 2
+
+
+def puntaje(a, b, misma_agencia):
+    """
+    Similitud 0-1 entre dos nombres normalizados: mezcla de similitud de
+    secuencia sobre tokens ordenados, parecido token a token y coincidencia de agencia.
+    """
+    tokens_a, tokens_b = set(a.split()), set(b.split())
+    if not tokens_a or not tokens_b:
+        return 0.0
+    tokens = _parecido_tokens(tokens_a, tokens_b)
+    secuencia = SequenceMatcher(None, ' '.join(sorted(tokens_a)), ' '.join(sorted(tokens_b))).ratio()
+    return round(0.55 * secuencia + 0.35 * tokens + 0.10 * bool(misma_agencia), 4)
+
+
+class IndiceBloques:
+    """
+    Índice invertido de llave de bloqueo -> candidatos canónicos.
+
+    Cada nombre a conciliar solo se compara con los candidatos que comparten
+    alguna llave (token + ciudad o token), nunca con todo el roster.
+    """
+
+    def __init__(self, canonicos):
+        self.canonicos = canonicos
+        self.exactos = {}
+        self.bloques = defaultdict(list)
+        for i, fila in enumerate(canonicos):
+            self.exactos.setdefault((fila['nombre_normalizado'], fila['ciudad']), i)
+            self.exactos.setdefault((fila['nombre_normalizado'], None), i)
+            for llave in llaves_bloque(fila['nombre_normalizado'], fila['ciudad']):
+                self.bloques[llave].append(i)
+
+    def candidatos(self, nombre_normalizado, ciudad):
+        vistos = set()
+        llaves = llaves_bloque(nombre_normalizado, ciudad)
+        # Primero los bloques de la misma ciudad; los tokens solos solo si no hay nada
+        for tipo in ('ciudad', 'token'):
+            for llave in llaves:
+                if llave[0] != tipo:
+                    continue
+                bloque = self.bloques.get(llave, ())
+                if len(bloque) <= MAXIMO_BLOQUE:
+                    vistos.update(bloque)
+            if vistos:
+                break
+        return vistos
+
+    def conciliar(self, nombre_normalizado, agencia, ciudad):
+        """
+        Retorna `(indice_canonico, confianza, metodo)`. Si ningún candidato
+        llega a UMBRAL_MINIMO retorna `(None, mejor_puntaje, 'sin_coincidencia')`.
+        """
+        for llave in ((nombre_normalizado, ciudad), (nombre_normalizado, None)):
+            if llave in self.exactos:
+                return self.exactos[llave], 1.0, 'exacto'
+        mejor, mejor_puntaje = None, 0.0
+        for i in self.candidatos(nombre_normalizado, ciudad):
+            canonico = self.canonicos[i]
+            valor = puntaje(nombre_normalizado, canonico['nombre_normalizado'], canonico['agencia'] == agencia)
+            if valor > mejor_puntaje:
+                mejor, mejor_puntaje = i, valor
+        if mejor is None or mejor_puntaje < UMBRAL_MINIMO:
+            return None, mejor_puntaje, 'sin_coincidencia'
+        return mejor, mejor_puntaje, 'difuso' if mejor_puntaje >= UMBRAL_CONFIANZA else 'revisar'
+
+
+def _canonicos(ejecutivos):
+    filas = []
+    for fila in ejecutivos[['EJECUTIVO_FINAL', 'AGENCIA', 'CIUDAD']].drop_duplicates().itertuples(index=False):
+        normalizado = normalizar_nombre(fila.EJECUTIVO_FINAL)
+        filas.append({
+            'nombre': fila.EJECUTIVO_FINAL.strip(),
+            'nombre_normalizado': normalizado,
+            'agencia': normalizar_nombre(fila.AGENCIA),
+            'ciudad': normalizar_nombre(fila.CIUDAD),
+        })
+    return filas
+
+
+def cargar_mapeo(ruta=RUTA_MAPEO):
+    """Lee el mapeo persistido; si no existe retorna una tabla vacía."""
+    if not Path(ruta).exists():
+        return pd.DataFrame(columns=COLUMNAS_MAPEO)
+    return pd.read_csv(ruta, sep=';', encoding='utf-8-sig', keep_default_na=False)
+
+
+def conciliar_ejecutivos(encuestas, ejecutivos, mapeo_previo=None):
+    """
+    Concilia EJECUTIVO y EJECUTIVO_FINAL de la encuesta contra el roster.
+
+    Las filas con metodo 'manual' del mapeo previo se respetan tal cual,
+    así una corrección hecha a mano sobrevive a las siguientes corridas.
+    Retorna la tabla de mapeo completa (una fila por nombre de origen x agencia).
+    """
+    canonicos = _canonicos(ejecutivos)
+    indice = IndiceBloques(canonicos)
+
+    manuales = {}
+    if mapeo_previo is not None and len(mapeo_previo):
+        previas = mapeo_previo[mapeo_previo['metodo'] == 'manual']
+        manuales = {(f.fuente, f.nombre_origen, f.agencia): f._asdict() for f in previas.itertuples(index=False)}
+
+    filas = []
+    for fuente in ('EJECUTIVO', 'EJECUTIVO_FINAL'):
+        unicos = encuestas[[fuente, 'AGENCIA', 'CIUDAD']].drop_duplicates()
+        for origen, agencia, ciudad in unicos.itertuples(index=False):
+            if not isinstance(origen, str) or not origen.strip():
+                continue
+            agencia_n, ciudad_n = normalizar_nombre(agencia), normalizar_nombre(ciudad)
+            llave = (fuente, origen, agencia_n)
+            if llave in manuales:
+                filas.append(manuales[llave])
+                continue
+            normalizado = normalizar_nombre(origen)
+            i, confianza, metodo = indice.conciliar(normalizado, agencia_n, ciudad_n)
+            canonico = canonicos[i]['nombre'] if i is not None else ''
+            filas.append({
+                'fuente': fuente,
+                'nombre_origen': origen,
+                'nombre_normalizado': normalizado,
+                'agencia': agencia_n,
+                'ciudad': ciudad_n,
+                'nombre_canonico': canonico,
+                'confianza': confianza,
+                'metodo': metodo,
+                'es_persona': es_persona(normalizar_nombre(canonico) if canonico else normalizado),
+            })
+    return pd.DataFrame(filas, columns=COLUMNAS_MAPEO)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Conciliación de nombres de ejecutivos')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--roster', default=str(RUTA_EJECUTIVOS))
+    parser.add_argument('--salida', default=str(RUTA_MAPEO))
+    args = parser.parse_args()
+
+    print("🔗 CONCILIACIÓN DE NOMBRES DE EJECUTIVOS")
+    print("=" * 60)
+    encuestas = cargar_encuestas(args.datos)
+    ejecutivos = cargar_ejecutivos(args.roster)
+    mapeo = conciliar_ejecutivos(encuestas, ejecutivos, cargar_mapeo(args.salida))
+
+    print(f"   • Nombres conciliados: {len(mapeo):,}")
+    for metodo, cantidad in mapeo['metodo'].value_counts().items():
+        print(f"   • {metodo}: {cantidad:,}")
+    no_personas = sorted(set(mapeo.loc[~mapeo['es_persona'].astype(bool), 'nombre_canonico']) - {''})
+    print(f"   • Entradas que no son personas: {len(no_personas)}")
+    for nombre in no_personas:
+        print(f"      - {nombre}")
+
+    pendientes = mapeo[mapeo['metodo'].isin(['revisar', 'sin_coincidencia'])]
+    if len(pendientes):
+        print("\n⚠️  REQUIEREN REVISIÓN:")
+        for fila in pendientes.itertuples():
+            print(f"   • {fila.nombre_origen} ({fila.agencia}) -> {fila.nombre_canonico or '—'} "
+                  f"[{fila.confianza:.2f}]")
+
+    mapeo.to_csv(args.salida, index=False, sep=';', encoding='utf-8')
+    print(f"\n💾 Mapeo guardado en: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
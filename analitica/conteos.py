@@ -0,0 +1,34 @@
+# 📌 Estadísticas desde histogramas 0-5: solo NumPy, para lectores que no deben importar pandas
+import numpy as np
+
+from .datos import CALIFICACIONES
+
+
+def estadisticas_desde_conteos(conteos):
+    """
+    Replica `calculateStats()` de dataService.ts a partir de un histograma 0-5.
+    """
+    validos = conteos[1:]
+    total = int(validos.sum())
+    if total == 0:
+        return {'average': 0, 'rating5': 0, 'rating4': 0, 'rating123': 0, 'total': 0}
+    suma = float(np.dot(validos, np.arange(1, CALIFICACIONES)))
+    return {
+        'average': round(suma / total, 2),
+        'rating5': round(float(validos[4]) / total * 100, 1),
+        'rating4': round(float(validos[3]) / total * 100, 1),
+        'rating123': round(float(validos[:3].sum()) / total * 100, 1),
+        'total': total,
+    }
+
+
+def promedios_desde_conteos(conteos):
+    """
+    Promedio por fila de una matriz (grupos x 6); 0 donde no hay respuestas.
+    """
+    validos = conteos[:, 1:]
+    totales = validos.sum(axis=1)
+    sumas = validos @ np.arange(1, CALIFICACIONES)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        promedios = np.where(totales > 0, sumas / np.maximum(totales, 1), 0.0)
+    return np.round(promedios, 2)
@@ -0,0 +1,167 @@
+# 📌 Carga y normalización de los archivos de la encuesta
+import hashlib
+import re
+import unicodedata
+from pathlib import Path
+
+from .ingesta import leer_csv
+
+# pandas y numpy se importan dentro de las funciones que arman DataFrames:
+# las constantes de este módulo se usan en chequeos que no deben pagar ese costo.
+
+RAIZ = Path(__file__).resolve().parent.parent
+RUTA_DATOS = RAIZ / 'data' / 'datos.csv'  # Crudo, con datos personales: nunca en public/
+RUTA_EJECUTIVOS = RAIZ / 'public' / 'ejecutivos para analizar.csv'
+
+# Datos de la Ficha Técnica oficial
+UNIVERSO_TOTAL = 24067
+FORMATO_FECHA = '%d/%m/%Y %H:%M'
+
+# Mismo mapeo de encabezados que usa `loadData()` en dataService.ts
+COLUMNAS = {
+    'En general   ¿La información suministrada en nuestros canales de atención fue clara y fácil de comprender?': 'claridad_informacion',
+    '¿Qué tan probable es que usted le recomiende Coltefinanciera a sus colegas   familiares o amigos?': 'recomendacion',
+    'En general   ¿Qué tan satisfecho se encuentra con los servicios que le ofrece Coltefinanciera?': 'satisfaccion_general',
+    'Asumiendo que otra entidad financiera le ofreciera al mismo precio los mismos productos y servicios que usted tiene actualmente con Coltefinanciera   ¿Qué tan probable es que usted continúe siendo cliente de Coltefinanciera?': 'lealtad',
+    '¿Tiene alguna recomendación o sugerencia acerca del servicio que le ofrecemos en Coltefinanciera?': 'sugerencias',
+    'TIPO EJECUTIVO': 'TIPO_EJECUTIVO',
+}
+
+METRICAS = {
+    'claridad_informacion': 'Claridad de Información',
+    'recomendacion': 'Recomendación (NPS)',
+    'satisfaccion_general': 'Satisfacción General',
+    'lealtad': 'Lealtad',
+}
+
+DIMENSIONES = ('SEGMENTO', 'CIUDAD', 'AGENCIA', 'TIPO_EJECUTIVO', 'EJECUTIVO_FINAL')
+
+CALIFICACIONES = 6  # índice 0 = sin respuesta, 1-5 = calificación
+
+# Nombres usados por MonthlyTrendData en types/index.ts
+CAMPOS_TENDENCIA = {
+    'satisfaccion_general': 'satisfaction',
+    'lealtad': 'loyalty',
+    'recomendacion': 'recommendation',
+    'claridad_informacion': 'clarity',
+}
+
+# Sugerencias que el dashboard descarta por no aportar contenido
+SUGERENCIAS_VACIAS = {'', 'no', 'ninguna'}
+
+# Una sugerencia hecha solo de estas palabras es un "nada por ahora": 'Ninguna por el momento',
+# 'No gracias', 'N/A', 'No tengo recomendación'. No aporta términos a temas ni bocetos.
+PALABRAS_NO_RESPUESTA = {
+    'no', 'ninguna', 'ninguno', 'ningun', 'nada', 'na', 'n', 'a', 'ni', 'por', 'el', 'la', 'de', 'en', 'mi', 'me',
+    'parte', 'momento', 'ahora', 'ahorita', 'aun', 'todavia', 'ya', 'solo', 'gracias', 'muchas', 'tengo',
+    'ok', 'recomendacion', 'recomendaciones', 'sugerencia', 'sugerencias', 'comentario', 'comentarios',
+}
+
+# Palabras sin contenido para análisis de términos; incluye los "nada por el momento" que
+# aparecen dentro de respuestas con contenido ('Ninguna por ahora, pero la app...')
+PALABRAS_VACIAS = {
+    'que', 'los', 'las', 'del', 'por', 'con', 'para', 'una', 'uno', 'muy', 'mas', 'pero', 'como',
+    'sus', 'les', 'este', 'esta', 'son', 'sea', 'ser', 'hay', 'todo', 'nos', 'mis', 'sin', 'cuando',
+    'han', 'fue', 'era', 'ya', 'the', 'porque', 'tambien', 'asi', 'eso', 'esto', 'sobre', 'entre',
+    'ninguna', 'ninguno', 'ningun', 'nada', 'momento', 'ahora', 'ahorita', 'tengo', 'gracias', 'muchas',
+    'sugerencia', 'sugerencias', 'recomendacion', 'recomendaciones',
+}
+PATRON_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def huella_archivo(ruta, bloque=1 << 20):
+    """
+    Calcula el SHA-256 del contenido de un archivo.
+
+    Se usa como versión del dataset: cambia solo cuando cambian los datos.
+    """
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        for trozo in iter(lambda: archivo.read(bloque), b''):
+            sha.update(trozo)
+    return sha.hexdigest()
+
+
+def normalizar_encuestas(df):
+    """
+    Renombra encabezados, convierte calificaciones y fechas al formato de trabajo.
+
+    Las calificaciones quedan como float (NaN si falta o está fuera de 1-5)
+    y DATE_MODIFIED como datetime.
+    """
+    import pandas as pd
+
+    df = df.rename(columns=lambda col: COLUMNAS.get(col.strip(), col.strip()))
+
+    for metrica in METRICAS:
+        if metrica in df.columns:
+            valores = pd.to_numeric(df[metrica], errors='coerce')
+            df[metrica] = valores.where((valores >= 1) & (valores <= 5))
+
+    if 'DATE_MODIFIED' in df.columns:
+        df['DATE_MODIFIED'] = pd.to_datetime(df['DATE_MODIFIED'], format=FORMATO_FECHA, errors='coerce')
+
+    for dimension in DIMENSIONES:
+        if dimension in df.columns:
+            df[dimension] = df[dimension].fillna('').astype(str).str.strip()
+
+    return df
+
+
+def cargar_encuestas(ruta=RUTA_DATOS):
+    """
+    Lee `datos.csv` y lo normaliza. BOM, codificación y separador se
+    detectan en `ingesta.leer_csv`.
+    """
+    df = leer_csv(ruta)
+    return normalizar_encuestas(df)
+
+
+def cargar_ejecutivos(ruta=RUTA_EJECUTIVOS):
+    """
+    Lee el listado de ejecutivos para analizar con su cantidad esperada de encuestas.
+    """
+    import pandas as pd
+
+    df = leer_csv(ruta)
+    df = df.rename(columns=lambda col: COLUMNAS.get(col.strip(), col.strip()))
+    df['cantidad encuesta'] = pd.to_numeric(df['cantidad encuesta'], errors='coerce').fillna(0).astype('int64')
+    return df
+
+
+def limpiar_sugerencia(texto):
+    """
+    Quita comillas y espacios sobrantes; retorna '' si la sugerencia no aporta contenido.
+    """
+    if not isinstance(texto, str):
+        return ''
+    limpio = texto.strip().strip('"').strip()
+    return '' if limpio.lower() in SUGERENCIAS_VACIAS else limpio
+
+
+def plegar(texto):
+    """Minúsculas sin tildes ni diéresis ('Atención' -> 'atencion', 'ñ' -> 'n')."""
+    descompuesto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def tokenizar(texto):
+    """Todos los tokens alfanuméricos del texto plegado, en orden (para búsqueda y frases)."""
+    return PATRON_TOKEN.findall(plegar(texto))
+
+
+def es_no_respuesta(texto):
+    """True si la sugerencia está vacía o solo dice que no hay nada que sugerir."""
+    tokens = tokenizar(limpiar_sugerencia(texto))
+    return all(t in PALABRAS_NO_RESPUESTA for t in tokens)
+
+
+def terminos(texto):
+    """
+    Términos de una sugerencia para temas y bocetos: tokens plegados de 3+
+    letras sin palabras vacías; ninguno si la sugerencia es una no respuesta.
+    """
+    tokens = tokenizar(limpiar_sugerencia(texto))
+    if all(t in PALABRAS_NO_RESPUESTA for t in tokens):
+        return []
+    return [t for t in tokens if len(t) >= 3 and t.isalpha() and t not in PALABRAS_VACIAS]
@@ -0,0 +1,233 @@
+# 📌 Análisis de impulsores: qué métrica de experiencia mueve la lealtad y la recomendación
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from .cache import CacheLRU
+from .datos import CALIFICACIONES, METRICAS, RUTA_DATOS
+from .motor import MotorEncuestas
+
+OBJETIVOS = ('lealtad', 'recomendacion')
+PREDICTORES = ('claridad_informacion', 'satisfaccion_general')
+DIMENSIONES_IMPULSORES = ('TOTAL', 'SEGMENTO', 'CIUDAD', 'AGENCIA')
+MINIMO_RESPUESTAS = 10  # Por debajo de esto no se estiman coeficientes
+
+_CACHE = CacheLRU(max_entradas=32, medir=lambda tablas: sum(
+    int(t.memory_usage(deep=True).sum()) for t in tablas.values()))
+
+
+def _codigos_dimension(motor, dimension):
+    if dimension == 'TOTAL':
+        return np.zeros(motor.total, dtype=np.int64), ['TOTAL']
+    return motor.codigos[dimension].astype(np.int64), motor.categorias[dimension]
+
+
+def rangos_por_grupo(valores, grupos, cantidad_grupos):
+    """
+    Rango medio (con empates) de cada respuesta dentro de su grupo.
+
+    Con calificaciones 1-5 el rango medio de cada calificación en cada grupo
+    sale del histograma acumulado, sin ordenar registros.
+    """
+    llave = grupos * CALIFICACIONES + valores
+    hist = np.bincount(llave, minlength=cantidad_grupos * CALIFICACIONES).reshape(cantidad_grupos, CALIFICACIONES)
+    anteriores = np.cumsum(hist, axis=1) - hist
+    tabla = anteriores + (hist + 1) / 2
+    return tabla[grupos, valores]
+
+
+def sumas_por_grupo(grupos, cantidad_grupos, columnas):
+    """
+    Matriz de momentos cruzados por grupo: resultado[g, i, j] = Σ x_i·x_j.
+
+    `columnas` es una matriz (k x registros); se calcula con un `bincount`
+    por par de columnas, es decir O(k² x registros) sin importar cuántos
+    grupos haya.
+    """
+    k = columnas.shape[0]
+    momentos = np.empty((cantidad_grupos, k, k))
+    for i in range(k):
+        for j in range(i, k):
+            suma = np.bincount(grupos, weights=columnas[i] * columnas[j], minlength=cantidad_grupos)
+            momentos[:, i, j] = suma
+            momentos[:, j, i] = suma
+    return momentos
+
+
+def correlaciones_spearman(grupos, cantidad_grupos, rangos):
+    """
+    Matriz de Spearman (grupos x k x k) como Pearson sobre los rangos, a
+    partir de los momentos por grupo.
+    """
+    unos = np.ones((1, rangos.shape[1]))
+    momentos = sumas_por_grupo(grupos, cantidad_grupos, np.vstack([unos, rangos]))
+    n = momentos[:, 0, 0]
+    sumas = momentos[:, 0, 1:]
+    cruzados = momentos[:, 1:, 1:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covarianza = cruzados - sumas[:, :, None] * sumas[:, None, :] / n[:, None, None]
+        desviacion = np.sqrt(np.diagonal(covarianza, axis1=1, axis2=2))
+        rho = covarianza / (desviacion[:, :, None] * desviacion[:, None, :])
+    return n, rho
+
+
+def regresiones_por_grupo(grupos, cantidad_grupos, predictores, objetivo, minimo=MINIMO_RESPUESTAS):
+    """
+    Mínimos cuadrados ordinarios `objetivo ~ 1 + predictores` para todos los
+    grupos a la vez: arma X'X y X'y por grupo y resuelve el lote con
+    `np.linalg.solve`. Retorna `(n, coeficientes, estandarizados, r2)`;
+    los grupos con pocos datos o matriz singular quedan en NaN.
+    """
+    unos = np.ones((1, predictores.shape[1]))
+    momentos = sumas_por_grupo(grupos, cantidad_grupos, np.vstack([unos, predictores, objetivo[None, :]]))
+    k = predictores.shape[0] + 1
+    xtx = momentos[:, :k, :k]
+    xty = momentos[:, :k, k]
+    yty = momentos[:, k, k]
+    n = xtx[:, 0, 0]
+
+    # Grupos no estimables: se resuelven contra la identidad y luego se anulan
+    determinante = np.linalg.det(xtx)
+    estimable = (n >= minimo) & (np.abs(determinante) > 1e-9)
+    seguro = np.where(estimable[:, None, None], xtx, np.eye(k))
+    coeficientes = np.linalg.solve(seguro, np.where(estimable[:, None], xty, 0.0)[..., None])[..., 0]
+    coeficientes[~estimable] = np.nan
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media_y = xty[:, 0] / n
+        suma_total = yty - n * media_y ** 2
+        residual = yty - (coeficientes * xty).sum(axis=1)
+        r2 = 1 - residual / suma_total
+
+        medias_x = xtx[:, 0, 1:] / n[:, None]
+        varianzas_x = np.diagonal(xtx, axis1=1, axis2=2)[:, 1:] / n[:, None] - medias_x ** 2
+        varianza_y = suma_total / n
+        estandarizados = coeficientes[:, 1:] * np.sqrt(varianzas_x) / np.sqrt(varianza_y)[:, None]
+    return n, coeficientes, estandarizados, r2
+
+
+def analizar_impulsores(motor, dimensiones=DIMENSIONES_IMPULSORES, minimo=MINIMO_RESPUESTAS):
+    """
+    Retorna {'correlaciones': DataFrame, 'coeficientes': DataFrame} para cada
+    dimensión y grupo, usando solo registros con las cuatro métricas.
+
+    - correlaciones: Spearman entre cada par de métricas.
+    - coeficientes: regresión lineal de lealtad y recomendación sobre
+      claridad_informacion y satisfaccion_general, con coeficiente bruto,
+      beta estandarizado, importancia relativa (% de |beta|) y R².
+
+    El resultado se cachea por versión del dataset.
+    """
+    dimensiones = tuple(dimensiones)
+    llave = (motor.version, dimensiones, minimo)
+    encontrado, resultado = _CACHE.obtener(llave)
+    if encontrado:
+        return resultado
+
+    metricas = list(METRICAS)
+    matriz = np.vstack([motor.calificaciones[m] for m in metricas]).astype(np.int64)
+    completos = (matriz > 0).all(axis=0)
+    matriz = matriz[:, completos]
+
+    correlaciones = []
+    coeficientes = []
+    for dimension in dimensiones:
+        codigos, categorias = _codigos_dimension(motor, dimension)
+        codigos = codigos[completos]
+        cantidad = len(categorias)
+        nombres = np.asarray(categorias, dtype=object)
+
+        rangos = np.vstack([rangos_por_grupo(fila, codigos, cantidad) for fila in matriz])
+        n, rho = correlaciones_spearman(codigos, cantidad, rangos)
+        validos = n >= minimo
+        for i, metrica_a in enumerate(metricas):
+            for j in range(i + 1, len(metricas)):
+                correlaciones.append(pd.DataFrame({
+                    'dimension': dimension,
+                    'grupo': nombres[validos],
+                    'n': n[validos].astype(np.int64),
+                    'metrica_a': metrica_a,
+                    'metrica_b': metricas[j],
+                    'spearman': np.round(rho[validos, i, j], 4),
+                }))
+
+        predictores = np.vstack([matriz[metricas.index(p)] for p in PREDICTORES]).astype(float)
+        for objetivo in OBJETIVOS:
+            y = matriz[metricas.index(objetivo)].astype(float)
+            n, beta, estandarizados, r2 = regresiones_por_grupo(codigos, cantidad, predictores, y, minimo)
+            estimados = ~np.isnan(beta[:, 0])
+            with np.errstate(invalid='ignore', divide='ignore'):
+                importancia = np.abs(estandarizados) / np.abs(estandarizados).sum(axis=1, keepdims=True) * 100
+            for p, predictor in enumerate(PREDICTORES):
+                coeficientes.append(pd.DataFrame({
+                    'dimension': dimension,
+                    'grupo': nombres[estimados],
+                    'n': n[estimados].astype(np.int64),
+                    'objetivo': objetivo,
+                    'predictor': predictor,
+                    'coeficiente': np.round(beta[estimados, p + 1], 4),
+                    'beta_estandarizado': np.round(estandarizados[estimados, p], 4),
+                    'importancia': np.round(importancia[estimados, p], 1),
+                    'intercepto': np.round(beta[estimados, 0], 4),
+                    'r2': np.round(r2[estimados], 4),
+                }))
+
+    resultado = {
+        'correlaciones': pd.concat(correlaciones, ignore_index=True),
+        'coeficientes': pd.concat(coeficientes, ignore_index=True),
+    }
+    _CACHE.guardar(llave, resultado)
+    return resultado
+
+
+def tabla_dashboard(resultado):
+    """Convierte las tablas a listas de registros JSON (NaN -> None)."""
+    return {
+        nombre: json.loads(tabla.to_json(orient='records', force_ascii=False))
+        for nombre, tabla in resultado.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Impulsores de lealtad y recomendación')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--minimo', type=int, default=MINIMO_RESPUESTAS)
+    parser.add_argument('--salida', help='Ruta JSON donde guardar la tabla para el dashboard')
+    args = parser.parse_args()
+
+    print("🎯 ANÁLISIS DE IMPULSORES")
+    print("=" * 60)
+    motor = MotorEncuestas.desde_archivo(args.datos)
+    resultado = analizar_impulsores(motor, minimo=args.minimo)
+
+    total = resultado['correlaciones']
+    total = total[total['dimension'] == 'TOTAL']
+    print("📊 CORRELACIÓN DE SPEARMAN (CONSOLIDADO):")
+    for fila in total.itertuples():
+        print(f"   • {METRICAS[fila.metrica_a]} ↔ {METRICAS[fila.metrica_b]}: {fila.spearman:.3f}")
+    print()
+
+    coeficientes = resultado['coeficientes']
+    print("📈 REGRESIÓN (CONSOLIDADO):")
+    for objetivo in OBJETIVOS:
+        filas = coeficientes[(coeficientes['dimension'] == 'TOTAL') & (coeficientes['objetivo'] == objetivo)]
+        if filas.empty:
+            continue
+        print(f"   • {METRICAS[objetivo]} (R²={filas['r2'].iloc[0]:.3f}):")
+        for fila in filas.itertuples():
+            print(f"      - {METRICAS[fila.predictor]}: β={fila.coeficiente:+.3f} "
+                  f"(estandarizado {fila.beta_estandarizado:+.3f}, {fila.importancia:.0f}% del efecto)")
+
+    grupos = coeficientes[coeficientes['dimension'] != 'TOTAL']['grupo'].nunique()
+    print(f"\n   • Grupos estimados (segmento, ciudad, agencia): {grupos}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(tabla_dashboard(resultado), archivo, ensure_ascii=False, indent=2)
+        print(f"\n💾 Tabla guardada en: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+# 📌 Ingesta masiva de CSV: detección de BOM/codificación/separador, mmap y lectura en paralelo
+import argparse
+import codecs
+import csv
+import io
+import mmap
+import os
+import time
+from collections import namedtuple
+
+MUESTRA_DETECCION = 64 * 1024
+SEPARADORES = ';,\t|'
+UMBRAL_PARALELO = 32 * 1024 * 1024  # Por debajo de esto un solo proceso es más rápido
+TAMANO_MINIMO_PARTE = 8 * 1024 * 1024
+
+# Marcas de orden de bytes, de la más larga a la más corta
+BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Codificaciones donde '\n' y '"' son un solo byte ASCII y se puede cortar por bytes
+COMPATIBLES_ASCII = {'utf-8', 'cp1252', 'latin-1'}
+
+FormatoCSV = namedtuple('FormatoCSV', 'codificacion bom separador comillas columnas inicio_datos')
+
+
+def detectar_formato(ruta):
+    """
+    Detecta BOM, codificación, separador y encabezados leyendo solo el inicio del archivo.
+
+    `inicio_datos` es el byte donde empieza la primera fila de datos (después
+    del BOM y del encabezado), para que los lectores trabajen sobre bytes crudos.
+    """
+    with open(ruta, 'rb') as archivo:
+        muestra = archivo.read(MUESTRA_DETECCION)
+
+    bom = b''
+    codificacion = None
+    for marca, nombre in BOMS:
+        if muestra.startswith(marca):
+            bom, codificacion = marca, nombre
+            break
+    if codificacion is None:
+        try:
+            # Un carácter multibyte cortado al final de la muestra no cuenta como error
+            muestra.decode('utf-8')
+            codificacion = 'utf-8'
+        except UnicodeDecodeError as error:
+            codificacion = 'utf-8' if error.start >= len(muestra) - 3 else 'cp1252'
+
+    texto = muestra[len(bom):].decode(codificacion, errors='ignore')
+    lineas = texto.splitlines()
+    try:
+        dialecto = csv.Sniffer().sniff('\n'.join(lineas[:20]), delimiters=SEPARADORES)
+        separador, comillas = dialecto.delimiter, dialecto.quotechar or '"'
+    except csv.Error:
+        # Archivos de una sola columna o muestras raras: el separador más frecuente del encabezado
+        encabezado = lineas[0] if lineas else ''
+        separador = max(SEPARADORES, key=encabezado.count)
+        comillas = '"'
+
+    columnas = next(csv.reader([lineas[0] if lineas else ''], delimiter=separador, quotechar=comillas), [])
+    columnas = [c.strip() for c in columnas]
+
+    inicio_datos = len(bom)
+    if codificacion in COMPATIBLES_ASCII:
+        fin_encabezado = _fin_de_registro(muestra, len(bom), ord(comillas))
+        inicio_datos = fin_encabezado if fin_encabezado is not None else len(muestra)
+    return FormatoCSV(codificacion, bom, separador, comillas, columnas, inicio_datos)
+
+
+def _contar(buffer, byte, inicio, fin, bloque=16 * 1024 * 1024):
+    """`bytes.count` por bloques; funciona igual sobre bytes y sobre un mmap (que no tiene `count`)."""
+    return sum(buffer[a:min(a + bloque, fin)].count(byte) for a in range(inicio, fin, bloque))
+
+
+def _fin_de_registro(buffer, desde, comilla, paridad=0):
+    """
+    Posición justo después del primer '\\n' fuera de comillas a partir de `desde`.
+
+    `paridad` es el número de comillas vistas antes de `desde` módulo 2; las
+    comillas escapadas ("") suman dos y no cambian el estado.
+    """
+    posicion = desde
+    comilla = bytes([comilla])
+    while True:
+        salto = buffer.find(b'\n', posicion)
+        if salto < 0:
+            return None
+        paridad = (paridad + _contar(buffer, comilla, posicion, salto)) % 2
+        if paridad == 0:
+            return salto + 1
+        posicion = salto + 1
+
+
+def cortes_seguros(buffer, inicio, fin, partes, comilla=b'"'):
+    """
+    Divide `buffer[inicio:fin]` en hasta `partes` rangos que terminan en un
+    salto de línea fuera de comillas, para que ningún registro (ni una
+    sugerencia con saltos o comillas escapadas) quede partido entre dos rangos.
+
+    Una sola pasada de conteo de comillas (en C, vía `bytes.count` por bloques) lleva la
+    paridad desde el inicio hasta cada corte tentativo.
+    """
+    comilla = comilla[0] if isinstance(comilla, bytes) else ord(comilla)
+    objetivo = max((fin - inicio) // max(partes, 1), 1)
+    cortes = [inicio]
+    paridad = 0
+    ultimo = inicio
+    while len(cortes) < partes:
+        tentativo = cortes[-1] + objetivo
+        if tentativo >= fin:
+            break
+        paridad = (paridad + _contar(buffer, bytes([comilla]), ultimo, tentativo)) % 2
+        corte = _fin_de_registro(buffer, tentativo, comilla, paridad)
+        if corte is None or corte >= fin:
+            break
+        # `_fin_de_registro` termina con paridad par en el corte
+        paridad, ultimo = 0, corte
+        cortes.append(corte)
+    cortes.append(fin)
+    return list(zip(cortes[:-1], cortes[1:]))
+
+
+def _leer_rango(ruta, formato, inicio, fin):
+    """Lee un rango de bytes del archivo (vía mmap) como DataFrame de texto."""
+    import pandas as pd
+
+    with open(ruta, 'rb') as archivo, mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        return pd.read_csv(
+            io.BytesIO(mapa[inicio:fin]),
+            sep=formato.separador,
+            quotechar=formato.comillas,
+            encoding=formato.codificacion,
+            header=None,
+            names=formato.columnas,
+            dtype=str,
+        )
+
+
+def _inferir_tipos(df):
+    """
+    Convierte a número las columnas de texto cuyos valores no vacíos son todos
+    numéricos, igual que la inferencia de `pd.read_csv` sobre el archivo completo.
+    """
+    import pandas as pd
+
+    for columna in df.columns:
+        valores = df[columna]
+        convertidos = pd.to_numeric(valores, errors='coerce')
+        if convertidos.notna().sum() == valores.notna().sum():
+            df[columna] = convertidos
+    return df
+
+
+def leer_csv(ruta, procesos=None, formato=None, umbral_paralelo=UMBRAL_PARALELO,
+             tamano_parte=TAMANO_MINIMO_PARTE):
+    """
+    Lee un CSV completo detectando BOM, codificación y separador.
+
+    Archivos pequeños o en codificaciones de varios bytes por carácter se
+    leen en un solo proceso con pandas. Los grandes se mapean en memoria,
+    se parten en rangos de bytes que terminan fuera de comillas y cada rango
+    se parsea en un proceso aparte; los resultados se concatenan en orden.
+    La detección de formato usa solo la biblioteca estándar; pandas se
+    importa aquí, al momento de armar el DataFrame.
+    """
+    import pandas as pd
+
+    formato = formato or detectar_formato(ruta)
+    tamano = os.path.getsize(ruta)
+    procesos = procesos or os.cpu_count() or 1
+    partes = min(procesos, max(1, (tamano - formato.inicio_datos) // tamano_parte))
+
+    if tamano < umbral_paralelo or partes < 2 or formato.codificacion not in COMPATIBLES_ASCII:
+        df = pd.read_csv(ruta, sep=formato.separador, quotechar=formato.comillas,
+                         encoding='utf-8-sig' if formato.codificacion == 'utf-8' else formato.codificacion)
+        return df.rename(columns=str.strip)
+
+    with open(ruta, 'rb') as archivo, mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        rangos = cortes_seguros(mapa, formato.inicio_datos, tamano, partes, formato.comillas.encode('ascii'))
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=len(rangos)) as ejecutor:
+        bloques = list(ejecutor.map(_leer_rango, [ruta] * len(rangos), [formato] * len(rangos),
+                                    *zip(*rangos)))
+    df = pd.concat(bloques, ignore_index=True)
+    return _inferir_tipos(df)
+
+
+def main():
+    # Importación tardía: `datos` usa este módulo para cargar los archivos
+    from .datos import RUTA_DATOS
+
+    parser = argparse.ArgumentParser(description='Ingesta de CSV con detección de formato y lectura en paralelo')
+    parser.add_argument('ruta', nargs='?', default=str(RUTA_DATOS))
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--forzar-paralelo', action='store_true', help='Usa procesos aunque el archivo sea pequeño')
+    args = parser.parse_args()
+
+    print("📥 INGESTA DE CSV")
+    print("=" * 60)
+    formato = detectar_formato(args.ruta)
+    print(f"   • Codificación: {formato.codificacion} | BOM: {'sí' if formato.bom else 'no'} "
+          f"| Separador: {formato.separador!r}")
+    print(f"   • Columnas: {len(formato.columnas)} (primera: {formato.columnas[0]!r})")
+
+    inicio = time.perf_counter()
+    if args.forzar_paralelo:
+        df = leer_csv(args.ruta, args.procesos, formato, umbral_paralelo=0, tamano_parte=1)
+    else:
+        df = leer_csv(args.ruta, args.procesos, formato)
+    segundos = time.perf_counter() - inicio
+    megas = os.path.getsize(args.ruta) / 1024 / 1024
+    print(f"   • Registros: {len(df):,} en {segundos * 1000:.0f} ms ({megas / segundos:,.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# 📌 Ruta rápida solo con la biblioteca estándar: una métrica leída con csv + array
+import argparse
+import csv
+import time
+from array import array
+
+from .datos import CALIFICACIONES, COLUMNAS, METRICAS, RUTA_DATOS
+from .ingesta import detectar_formato
+
+# Encabezado original de cada métrica (inverso de COLUMNAS)
+ENCABEZADOS = {clave: encabezado for encabezado, clave in COLUMNAS.items()}
+
+
+def _calificacion(texto):
+    """'5', '5.0' o ' 5 ' -> 5; vacíos, texto o valores fuera de 1-5 -> 0."""
+    try:
+        valor = float(texto)
+    except (TypeError, ValueError):
+        return 0
+    return int(valor) if 1 <= valor <= 5 and valor == int(valor) else 0
+
+
+def leer_metrica(ruta=RUTA_DATOS, metrica='claridad_informacion', por=None):
+    """
+    Lee una sola métrica (y opcionalmente una dimensión) sin pandas ni numpy.
+
+    Retorna `(calificaciones, codigos, categorias)`: las calificaciones en un
+    `array('b')` con 0 = sin respuesta y, si se pidió `por`, el código de grupo
+    de cada registro en un `array('i')` más la lista de categorías en orden de
+    aparición. Sirve para chequeos pequeños que no justifican importar pandas.
+    """
+    formato = detectar_formato(ruta)
+    encabezado = ENCABEZADOS.get(metrica, metrica)
+    columna_grupo = ENCABEZADOS.get(por, por)
+    codificacion = 'utf-8-sig' if formato.codificacion == 'utf-8' else formato.codificacion
+
+    calificaciones = array('b')
+    codigos = array('i')
+    categorias = []
+    indices = {}
+    with open(ruta, encoding=codificacion, newline='') as archivo:
+        lector = csv.reader(archivo, delimiter=formato.separador, quotechar=formato.comillas)
+        columnas = [c.strip() for c in next(lector)]
+        posicion = columnas.index(encabezado)
+        posicion_grupo = columnas.index(columna_grupo) if por else None
+        for fila in lector:
+            if not fila:
+                continue
+            calificaciones.append(_calificacion(fila[posicion]) if posicion < len(fila) else 0)
+            if posicion_grupo is not None:
+                grupo = fila[posicion_grupo].strip() if posicion_grupo < len(fila) else ''
+                if grupo not in indices:
+                    indices[grupo] = len(categorias)
+                    categorias.append(grupo)
+                codigos.append(indices[grupo])
+    return calificaciones, codigos, categorias
+
+
+def conteos(ruta=RUTA_DATOS, metrica='claridad_informacion', por=None):
+    """
+    Histograma 0-5 de la métrica; con `por`, un dict grupo -> histograma.
+    """
+    calificaciones, codigos, categorias = leer_metrica(ruta, metrica, por)
+    if por is None:
+        total = [0] * CALIFICACIONES
+        for valor in calificaciones:
+            total[valor] += 1
+        return total
+    grupos = [[0] * CALIFICACIONES for _ in categorias]
+    for codigo, valor in zip(codigos, calificaciones):
+        grupos[codigo][valor] += 1
+    return dict(zip(categorias, grupos))
+
+
+def estadisticas(conteos_metrica):
+    """
+    Mismo resultado que `motor.estadisticas_desde_conteos` (y que
+    `calculateStats()` en dataService.ts) sobre una lista 0-5.
+    """
+    validos = conteos_metrica[1:]
+    total = sum(validos)
+    if total == 0:
+        return {'average': 0, 'rating5': 0, 'rating4': 0, 'rating123': 0, 'total': 0}
+    suma = sum(calificacion * cantidad for calificacion, cantidad in enumerate(validos, start=1))
+    return {
+        'average': round(suma / total, 2),
+        'rating5': round(validos[4] / total * 100, 1),
+        'rating4': round(validos[3] / total * 100, 1),
+        'rating123': round(sum(validos[:3]) / total * 100, 1),
+        'total': total,
+    }
+
+
+def main():
+    inicio = time.perf_counter()
+    parser = argparse.ArgumentParser(description='Estadísticas de una métrica sin pandas')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--metrica', default='claridad_informacion', choices=list(METRICAS))
+    parser.add_argument('--por', default='SEGMENTO')
+    args = parser.parse_args()
+
+    print(f"🪶 {METRICAS[args.metrica].upper()} (RUTA LIGERA)")
+    print("=" * 60)
+    por_grupo = conteos(args.datos, args.metrica, args.por)
+    total = [sum(columna) for columna in zip(*por_grupo.values())]
+    consolidado = estadisticas(total)
+    print(f"   • Consolidado: {consolidado['average']:.2f} | 5⭐ {consolidado['rating5']}% "
+          f"| 4⭐ {consolidado['rating4']}% | 1-3⭐ {consolidado['rating123']}% (n={consolidado['total']:,})")
+    for grupo, histograma in sorted(por_grupo.items()):
+        if not grupo:
+            continue
+        resultado = estadisticas(histograma)
+        print(f"   • {grupo}: {resultado['average']:.2f} (n={resultado['total']:,})")
+    print(f"   • Tiempo total: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+# 📌 Motor en memoria: indicadores del dashboard calculados sobre arreglos NumPy
+import numpy as np
+import pandas as pd
+
+from .datos import (
+    CALIFICACIONES,
+    CAMPOS_TENDENCIA,
+    DIMENSIONES,
+    METRICAS,
+    RUTA_DATOS,
+    UNIVERSO_TOTAL,
+    cargar_encuestas,
+    huella_archivo,
+)
+from .conteos import estadisticas_desde_conteos, promedios_desde_conteos
+from .tendencias import codigos_periodo
+
+# Parámetros de consulta aceptados como filtro -> columna del dataset
+FILTROS = {
+    'segmento': 'SEGMENTO',
+    'ciudad': 'CIUDAD',
+    'agencia': 'AGENCIA',
+    'tipo_ejecutivo': 'TIPO_EJECUTIVO',
+    'ejecutivo': 'EJECUTIVO_FINAL',
+}
+
+# Frecuencias de tendencia -> dimensión interna con los códigos de período
+PERIODOS = {
+    'dia': 'DIA',
+    'semana': 'SEMANA',
+    'mes': 'MES',
+}
+
+
+def normalizar_filtros(parametros):
+    """
+    Convierte parámetros de consulta en una tupla ordenada y hashable.
+
+    Acepta valores sueltos, separados por coma o listas; ignora claves
+    desconocidas y valores vacíos. Dos consultas equivalentes producen
+    exactamente la misma tupla.
+    """
+    normalizados = []
+    for clave, valor in (parametros or {}).items():
+        columna = FILTROS.get(clave, clave if clave in DIMENSIONES else None)
+        if columna is None:
+            continue
+        valores = valor if isinstance(valor, (list, tuple, set)) else [valor]
+        partes = set()
+        for item in valores:
+            partes.update(p.strip().upper() for p in str(item).split(',') if p.strip())
+        if partes:
+            normalizados.append((columna, tuple(sorted(partes))))
+    return tuple(sorted(normalizados))
+
+
+class MotorEncuestas:
+    """
+    Mantiene la encuesta codificada en memoria para responder consultas rápido.
+
+    Las calificaciones se guardan como int8 (0 = sin respuesta) y cada
+    dimensión como códigos enteros, de modo que cualquier indicador se reduce
+    a un `np.bincount` sobre los registros que pasan el filtro.
+    """
+
+    def __init__(self, df, version=''):
+        self.df = df
+        self.version = version
+        self.total = len(df)
+
+        self.calificaciones = {
+            metrica: df[metrica].fillna(0).to_numpy(dtype=np.int8)
+            for metrica in METRICAS
+        }
+
+        self.codigos = {}
+        self.categorias = {}
+        self._indices = {}
+        for dimension in DIMENSIONES:
+            codigos, categorias = pd.factorize(df[dimension], sort=True)
+            self.codigos[dimension] = codigos.astype(np.int32)
+            self.categorias[dimension] = [str(c) for c in categorias]
+            self._indices[dimension] = {str(c).upper(): i for i, c in enumerate(categorias)}
+
+        # Fechas parseadas una vez; cada frecuencia queda como una dimensión más
+        fechas = df['DATE_MODIFIED'].to_numpy()
+        for frecuencia, dimension in PERIODOS.items():
+            codigos, etiquetas = codigos_periodo(fechas, frecuencia)
+            # Las fechas faltantes van a una categoría vacía al final
+            codigos[codigos < 0] = len(etiquetas)
+            self.codigos[dimension] = codigos.astype(np.int32)
+            self.categorias[dimension] = etiquetas + ['']
+
+    @classmethod
+    def desde_archivo(cls, ruta=RUTA_DATOS):
+        """Carga `datos.csv` y usa su huella SHA-256 como versión."""
+        return cls(cargar_encuestas(ruta), version=huella_archivo(ruta))
+
+    # ------------------------------------------------------------------
+    # Filtros y conteos
+    # ------------------------------------------------------------------
+
+    def mascara(self, filtros=()):
+        """
+        Retorna la máscara booleana de registros que cumplen los filtros
+        normalizados, o None si no hay filtros (todos los registros).
+        """
+        mascara = None
+        for dimension, valores in filtros:
+            indice = self._indices[dimension]
+            buscados = [indice[v] for v in valores if v in indice]
+            cumple = np.isin(self.codigos[dimension], buscados)
+            mascara = cumple if mascara is None else mascara & cumple
+        return mascara
+
+    def conteos(self, metrica, mascara=None):
+        """Histograma 0-5 de una métrica sobre los registros seleccionados."""
+        valores = self.calificaciones[metrica]
+        if mascara is not None:
+            valores = valores[mascara]
+        return np.bincount(valores, minlength=CALIFICACIONES)
+
+    def conteos_por_grupo(self, metrica, dimension, mascara=None):
+        """
+        Matriz (grupos x 6) con el histograma de la métrica por cada valor
+        de la dimensión, en una sola pasada con una llave combinada.
+        """
+        codigos = self.codigos[dimension]
+        valores = self.calificaciones[metrica]
+        if mascara is not None:
+            codigos = codigos[mascara]
+            valores = valores[mascara]
+        grupos = len(self.categorias[dimension])
+        llave = codigos.astype(np.int64) * CALIFICACIONES + valores
+        planos = np.bincount(llave, minlength=grupos * CALIFICACIONES)
+        return planos.reshape(grupos, CALIFICACIONES)
+
+    def registros_por_grupo(self, dimension, mascara=None):
+        codigos = self.codigos[dimension]
+        if mascara is not None:
+            codigos = codigos[mascara]
+        return np.bincount(codigos, minlength=len(self.categorias[dimension]))
+
+    # ------------------------------------------------------------------
+    # Consultas equivalentes a dataService.ts
+    # ------------------------------------------------------------------
+
+    def kpis(self, filtros=()):
+        """Equivalente a `getKPIData()`: consolidado y por segmento."""
+        mascara = self.mascara(filtros)
+        segmentos = self._indices['SEGMENTO']
+        resultado = []
+        for metrica, nombre in METRICAS.items():
+            por_segmento = self.conteos_por_grupo(metrica, 'SEGMENTO', mascara)
+            vacio = np.zeros(CALIFICACIONES, dtype=np.int64)
+            resultado.append({
+                'metric': nombre,
+                'key': metrica,
+                'consolidado': estadisticas_desde_conteos(por_segmento.sum(axis=0)),
+                'personas': estadisticas_desde_conteos(
+                    por_segmento[segmentos['PERSONAS']] if 'PERSONAS' in segmentos else vacio),
+                'empresarial': estadisticas_desde_conteos(
+                    por_segmento[segmentos['EMPRESARIAL']] if 'EMPRESARIAL' in segmentos else vacio),
+            })
+        return resultado
+
+    def distribucion(self, metrica='satisfaccion_general', filtros=()):
+        """Equivalente a `getRatingDistribution()` para cualquier métrica."""
+        if metrica not in METRICAS:
+            raise KeyError(f"Métrica desconocida: {metrica}")
+        conteos = self.conteos(metrica, self.mascara(filtros))
+        total = int(conteos[1:].sum())
+        return [
+            {
+                'name': f'Rating {calificacion}',
+                'value': int(conteos[calificacion]),
+                'percentage': round(float(conteos[calificacion]) / total * 100, 1) if total else 0,
+            }
+            for calificacion in range(1, CALIFICACIONES)
+        ]
+
+    def ciudades(self, filtros=()):
+        """Equivalente a `getCityData()` usando la columna CIUDAD del dataset."""
+        mascara = self.mascara(filtros)
+        registros = self.registros_por_grupo('CIUDAD', mascara)
+        promedios = {}
+        nacionales = {}
+        for metrica in METRICAS:
+            por_ciudad = self.conteos_por_grupo(metrica, 'CIUDAD', mascara)
+            promedios[metrica] = promedios_desde_conteos(por_ciudad)
+            nacionales[metrica] = estadisticas_desde_conteos(por_ciudad.sum(axis=0))['average']
+
+        resultado = []
+        for i, ciudad in enumerate(self.categorias['CIUDAD']):
+            if registros[i] == 0 or not ciudad:
+                continue
+            metricas = {m: float(promedios[m][i]) for m in METRICAS}
+            resultado.append({
+                'ciudad': ciudad,
+                'total_encuestados': int(registros[i]),
+                'metricas': metricas,
+                'comparison': {m: _comparar(metricas[m], nacionales[m]) for m in METRICAS},
+            })
+        resultado.sort(key=lambda c: c['total_encuestados'], reverse=True)
+        return resultado
+
+    def tendencia(self, filtros=(), frecuencia='mes'):
+        """
+        Promedios reales por período (reemplaza la simulación de `getMonthlyTrend()`).
+
+        `frecuencia` puede ser 'dia', 'semana' o 'mes'.
+        """
+        if frecuencia not in PERIODOS:
+            raise KeyError(f"Frecuencia desconocida: {frecuencia}")
+        dimension = PERIODOS[frecuencia]
+        mascara = self.mascara(filtros)
+        registros = self.registros_por_grupo(dimension, mascara)
+        promedios = {
+            metrica: promedios_desde_conteos(self.conteos_por_grupo(metrica, dimension, mascara))
+            for metrica in CAMPOS_TENDENCIA
+        }
+        resultado = []
+        for i, mes in enumerate(self.categorias[dimension]):
+            if registros[i] == 0 or not mes:
+                continue
+            fila = {'month': mes}
+            fila.update({campo: float(promedios[m][i]) for m, campo in CAMPOS_TENDENCIA.items()})
+            fila['responses'] = int(registros[i])
+            resultado.append(fila)
+        return resultado
+
+    def ejecutivos(self, filtros=()):
+        """Encuestas y promedios por ejecutivo (EJECUTIVO_FINAL)."""
+        mascara = self.mascara(filtros)
+        registros = self.registros_por_grupo('EJECUTIVO_FINAL', mascara)
+        promedios = {
+            metrica: promedios_desde_conteos(self.conteos_por_grupo(metrica, 'EJECUTIVO_FINAL', mascara))
+            for metrica in METRICAS
+        }
+
+        # Atributos descriptivos del ejecutivo: primer registro de cada uno
+        codigos = self.codigos['EJECUTIVO_FINAL']
+        _, primeros = np.unique(codigos, return_index=True)
+        atributos = self.df.iloc[primeros][['EJECUTIVO_FINAL', 'AGENCIA', 'CIUDAD', 'SEGMENTO', 'TIPO_EJECUTIVO']]
+        atributos = atributos.set_index('EJECUTIVO_FINAL').to_dict('index')
+
+        resultado = []
+        for i, ejecutivo in enumerate(self.categorias['EJECUTIVO_FINAL']):
+            if registros[i] == 0 or not ejecutivo:
+                continue
+            info = atributos.get(ejecutivo, {})
+            resultado.append({
+                'ejecutivo': ejecutivo,
+                'agencia': info.get('AGENCIA', ''),
+                'ciudad': info.get('CIUDAD', ''),
+                'segmento': info.get('SEGMENTO', ''),
+                'tipoEjecutivo': info.get('TIPO_EJECUTIVO', ''),
+                'total': int(registros[i]),
+                'metricas': {m: float(promedios[m][i]) for m in METRICAS},
+            })
+        resultado.sort(key=lambda e: (-e['total'], e['ejecutivo']))
+        return resultado
+
+    def ficha_tecnica(self):
+        """Equivalente a `getTechnicalInfo()` con el total real de registros."""
+        return {
+            'universoTotal': UNIVERSO_TOTAL,
+            'totalEncuestados': self.total,
+            'porcentajeRespuesta': round(self.total / UNIVERSO_TOTAL * 100, 2),
+            'nivelConfianza': '95%',
+            'margenError': '2,50%',
+            'periodoCampo': '15 de abril al 01 de junio de 2025',
+            'metodoRecoleccion': 'Web, mediante SurveyMonkey',
+            'metricasEvaluadas': [
+                'Claridad de la Información (Atención)',
+                'Satisfacción General',
+                'Nivel de Recomendación',
+                'Lealtad del Cliente',
+            ],
+            'periodosMediacion': '2024-2 y 2025-1',
+            'version': self.version,
+        }
+
+
+def _comparar(promedio, nacional):
+    """Misma regla que `compareToNational()`: diferencias < 0.1 son 'equal'."""
+    if abs(promedio - nacional) < 0.1:
+        return 'equal'
+    return 'higher' if promedio > nacional else 'lower'
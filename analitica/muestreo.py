@@ -0,0 +1,264 @@
+# 📌 Modo rápido por muestra estratificada: reservorios por segmento/ciudad, KPIs con cotas y escalamiento
+import argparse
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from .datos import COLUMNAS, FORMATO_FECHA, METRICAS, RUTA_DATOS
+from .ingesta import detectar_formato
+from .tareas import FIN_CAMPO, INICIO_CAMPO
+
+POR_ESTRATO = 200
+ESTRATOS = ('SEGMENTO', 'CIUDAD')
+SEMILLA = 2025
+FILAS_POR_BLOQUE = 50_000
+Z_95 = 1.96
+ALFA = 0.05
+
+# Semiamplitud máxima del intervalo al 95% (promedio en puntos de la escala 1-5,
+# el resto en puntos porcentuales) y cota máxima de valores inválidos en %.
+# Si alguna se supera, la muestra no alcanza y se lee el archivo completo.
+UMBRALES = {'promedio': 0.10, 'top_box': 5.0, 'nps': 8.0, 'invalidos': 0.5}
+
+ENCABEZADOS = {clave: encabezado for encabezado, clave in COLUMNAS.items()}
+
+
+def _estratos(bloque, estratos):
+    """
+    Etiqueta 'SEGMENTO | CIUDAD' de cada fila. Se normalizan solo los
+    valores distintos de cada columna y sus combinaciones, no cada fila.
+    """
+    codigos, etiquetas = [], []
+    for columna in estratos:
+        codigo, unicos = pd.factorize(bloque[columna])
+        codigos.append(codigo)
+        etiquetas.append([str(u).strip().upper() for u in unicos])
+    combinado, presentes = pd.factorize(np.ravel_multi_index(codigos, [len(e) for e in etiquetas]))
+    textos = [' | '.join(e[i] for e, i in zip(etiquetas, indices))
+              for indices in zip(*np.unravel_index(presentes, [len(e) for e in etiquetas]))]
+    return pd.Series(np.array(textos, dtype=object)[combinado], index=bloque.index)
+
+
+def muestra_estratificada(ruta=RUTA_DATOS, por_estrato=POR_ESTRATO, estratos=ESTRATOS, semilla=SEMILLA,
+                          filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Muestra aleatoria simple de hasta `por_estrato` filas por estrato, en una pasada.
+
+    El archivo se recorre por bloques y cada fila recibe una prioridad
+    uniforme de un generador con semilla; el reservorio de cada estrato
+    guarda las `por_estrato` prioridades más bajas vistas hasta el momento
+    (muestreo de reservorio por llaves aleatorias). La memoria es
+    O(estratos · por_estrato + bloque) sin importar el tamaño del archivo,
+    y la muestra es la misma para la misma semilla aunque cambie el tamaño
+    de bloque. Retorna `(muestra, poblacion)`: las filas elegidas como
+    texto con la columna `_estrato`, y el total de filas de cada estrato.
+    Solo se parsean las columnas de estrato, métricas y fecha: las
+    sugerencias y los datos personales no se leen.
+    """
+    formato = detectar_formato(ruta)
+    azar = np.random.default_rng(semilla)
+    usadas = {*estratos, 'DATE_MODIFIED', *(ENCABEZADOS[m] for m in METRICAS)}
+    lector = pd.read_csv(ruta, sep=formato.separador, quotechar=formato.comillas,
+                         encoding='utf-8-sig' if formato.codificacion == 'utf-8' else formato.codificacion,
+                         usecols=lambda columna: columna.strip() in usadas,
+                         dtype=str, keep_default_na=False, chunksize=filas_por_bloque)
+    reservorio = None
+    poblacion = Counter()
+    for bloque in lector:
+        bloque = bloque.rename(columns=str.strip)
+        estrato = _estratos(bloque, estratos)
+        poblacion.update(estrato.value_counts().to_dict())
+        bloque = bloque.assign(_estrato=estrato.to_numpy(), _prioridad=azar.random(len(bloque)))
+        candidatos = bloque if reservorio is None else pd.concat([reservorio, bloque], ignore_index=True)
+        reservorio = (candidatos.sort_values('_prioridad', kind='stable')
+                      .groupby('_estrato', sort=False).head(por_estrato))
+    if reservorio is None:
+        return pd.DataFrame(columns=['_estrato']), {}
+    return reservorio.drop(columns='_prioridad').reset_index(drop=True), dict(poblacion)
+
+
+class EstimadorEstratificado:
+    """
+    Estimadores de razón combinados sobre una muestra estratificada.
+
+    Cada indicador se escribe como R = Σy / Σx sobre la población (promedio:
+    y = calificación, x = respondió; top-box: y = 1[5], x = respondió; NPS:
+    y = ±1, x = 1). Se estima con los totales expandidos N_h·ȳ_h de cada
+    estrato, y el error estándar sale de la linealización d = y - R·x con
+    corrección por población finita (1 - n_h/N_h): un estrato leído completo
+    no aporta varianza.
+    """
+
+    def __init__(self, estratos, poblacion):
+        self.codigos, etiquetas = pd.factorize(np.asarray(estratos))
+        self.grupos = len(etiquetas)
+        self.N = np.array([poblacion[e] for e in etiquetas], dtype=float)
+        self.n = np.bincount(self.codigos, minlength=self.grupos).astype(float)
+
+    def _total(self, valores):
+        return np.bincount(self.codigos, weights=valores, minlength=self.grupos) / self.n * self.N
+
+    def razon(self, y, x):
+        """Retorna `(estimacion, error_estandar)`; (0, 0) si no hay población en el denominador."""
+        y, x = np.asarray(y, dtype=float), np.asarray(x, dtype=float)
+        denominador = self._total(x).sum()
+        if denominador == 0:
+            return 0.0, 0.0
+        razon = self._total(y).sum() / denominador
+        d = y - razon * x
+        media = np.bincount(self.codigos, weights=d, minlength=self.grupos) / self.n
+        cuadrados = np.bincount(self.codigos, weights=(d - media[self.codigos]) ** 2, minlength=self.grupos)
+        s2 = np.where(self.n > 1, cuadrados / np.maximum(self.n - 1, 1), 0.0)
+        varianza = (self.N ** 2 * (1 - self.n / self.N) * s2 / self.n).sum() / denominador ** 2
+        return float(razon), float(np.sqrt(max(varianza, 0.0)))
+
+    def cota_superior(self, y, x, z=Z_95, alfa=ALFA):
+        """
+        Cota superior de una proporción de casos raros (valores inválidos).
+
+        Si la muestra tiene casos se usa el intervalo normal. Si no tiene
+        ninguno, el intervalo normal daría cero; se aplica la regla de tres
+        (1 - α^(1/m), con m los casos del denominador muestreados en
+        estratos no censados) a la fracción de la población que no se leyó.
+        """
+        y, x = np.asarray(y, dtype=float), np.asarray(x, dtype=float)
+        if y.sum() > 0:
+            razon, error = self.razon(y, x)
+            return min(razon + z * error, 1.0)
+        parciales = self.n < self.N
+        x_por_estrato = np.bincount(self.codigos, weights=x, minlength=self.grupos)
+        m = x_por_estrato[parciales].sum()
+        denominador = self._total(x).sum()
+        if m == 0 or denominador == 0:
+            return 0.0
+        sin_leer = ((self.N - self.n) * x_por_estrato / self.n)[parciales].sum() / denominador
+        return float(sin_leer * (1 - alfa ** (1 / m)))
+
+
+def kpis_con_cotas(muestra, poblacion, umbrales=None, z=Z_95):
+    """
+    KPIs de cada métrica estimados desde la muestra, con su semiamplitud al
+    95%, el umbral aplicable y si obliga a escalar a la lectura completa.
+    """
+    umbrales = {**UMBRALES, **(umbrales or {})}
+    estimador = EstimadorEstratificado(muestra['_estrato'], poblacion)
+    filas = []
+
+    def agregar(metrica, indicador, valor, semiamplitud, escala=1.0):
+        limite = umbrales[indicador]
+        filas.append({
+            'metrica': metrica,
+            'indicador': indicador,
+            'valor': round(valor * escala, 2),
+            'semiamplitud': round(semiamplitud * escala, 3),
+            'umbral': limite,
+            'escalar': bool(semiamplitud * escala > limite),
+        })
+
+    for metrica in METRICAS:
+        texto = muestra[ENCABEZADOS[metrica]].str.strip()
+        numeros = pd.to_numeric(texto, errors='coerce')
+        validos = numeros.isin(range(1, 6)).to_numpy()
+        calificacion = np.where(validos, numeros.fillna(0).to_numpy(), 0)
+        con_valor = (texto != '').to_numpy()
+
+        promedio, error = estimador.razon(calificacion, validos)
+        agregar(metrica, 'promedio', promedio, z * error)
+        top_box, error = estimador.razon(calificacion == 5, validos)
+        agregar(metrica, 'top_box', top_box, z * error, 100)
+        if metrica == 'recomendacion':
+            # Igual que calculateNPS(): 5 promotor, 4 pasivo, el resto (incluido vacío) detractor
+            puntaje = (calificacion == 5).astype(float) - ((calificacion != 4) & (calificacion != 5))
+            nps, error = estimador.razon(puntaje, np.ones(len(puntaje)))
+            agregar(metrica, 'nps', nps, z * error, 100)
+        cota = estimador.cota_superior(con_valor & ~validos, con_valor)
+        filas.append({'metrica': metrica, 'indicador': 'invalidos', 'valor': round(cota * 100, 3),
+                      'semiamplitud': 0.0, 'umbral': umbrales['invalidos'],
+                      'escalar': bool(cota * 100 > umbrales['invalidos'] or (con_valor & ~validos).any())})
+
+    fechas = pd.to_datetime(muestra['DATE_MODIFIED'], format=FORMATO_FECHA, errors='coerce')
+    fuera = (fechas.isna() | (fechas < pd.Timestamp(INICIO_CAMPO)) | (fechas > pd.Timestamp(FIN_CAMPO))).to_numpy()
+    cota = estimador.cota_superior(fuera, np.ones(len(fuera)))
+    filas.append({'metrica': 'DATE_MODIFIED', 'indicador': 'invalidos', 'valor': round(cota * 100, 3),
+                  'semiamplitud': 0.0, 'umbral': umbrales['invalidos'],
+                  'escalar': bool(cota * 100 > umbrales['invalidos'] or fuera.any())})
+    return pd.DataFrame(filas)
+
+
+def evaluar_muestra(ruta=RUTA_DATOS, por_estrato=POR_ESTRATO, estratos=ESTRATOS, semilla=SEMILLA, umbrales=None):
+    """
+    Chequeo rápido previo a integrar: muestra, KPIs con cotas y decisión.
+
+    Retorna un dict con la tabla de KPIs, los motivos de escalamiento
+    (vacío si la muestra basta) y los tamaños de muestra y población. Un
+    valor inválido visto en la muestra siempre escala: hay que contarlos
+    exactos para reportarlos.
+    """
+    inicio = time.perf_counter()
+    muestra, poblacion = muestra_estratificada(ruta, por_estrato, estratos, semilla)
+    tabla = kpis_con_cotas(muestra, poblacion, umbrales)
+    motivos = [
+        f"{fila.metrica} {fila.indicador}: "
+        + (f"cota {fila.valor}% > {fila.umbral}%" if fila.indicador == 'invalidos'
+           else f"±{fila.semiamplitud} > {fila.umbral}")
+        for fila in tabla[tabla['escalar']].itertuples()
+    ]
+    return {
+        'tabla': tabla,
+        'motivos': motivos,
+        'muestra': len(muestra),
+        'poblacion': sum(poblacion.values()),
+        'estratos': len(poblacion),
+        'segundos': time.perf_counter() - inicio,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='KPIs con cotas de error desde una muestra estratificada')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--muestra', type=int, default=POR_ESTRATO, help='Filas por estrato')
+    parser.add_argument('--estratos', default=','.join(ESTRATOS))
+    parser.add_argument('--semilla', type=int, default=SEMILLA)
+    parser.add_argument('--umbral', action='append', default=[], metavar='INDICADOR=VALOR',
+                        help=f"Repetible; por defecto {', '.join(f'{k}={v}' for k, v in UMBRALES.items())}")
+    parser.add_argument('--salida', help='Ruta CSV donde guardar los KPIs con sus cotas')
+    args = parser.parse_args()
+
+    print("🎯 KPIs POR MUESTRA ESTRATIFICADA")
+    print("=" * 60)
+    umbrales = {clave.strip(): float(valor) for clave, valor in (u.split('=', 1) for u in args.umbral)}
+    estratos = tuple(e.strip() for e in args.estratos.split(',') if e.strip())
+    resultado = evaluar_muestra(args.datos, args.muestra, estratos, args.semilla, umbrales)
+    tabla = resultado['tabla']
+    print(f"   • Muestra: {resultado['muestra']:,} de {resultado['poblacion']:,} registros "
+          f"en {resultado['estratos']} estratos ({' x '.join(estratos)}) | {resultado['segundos'] * 1000:.0f} ms")
+    print()
+
+    for metrica, bloque in tabla.groupby('metrica', sort=False):
+        partes = []
+        for fila in bloque.itertuples():
+            if fila.indicador == 'invalidos':
+                partes.append(f"inválidos ≤ {fila.valor}%")
+            else:
+                unidad = '%' if fila.indicador == 'top_box' else ''
+                partes.append(f"{fila.indicador} {fila.valor}{unidad} ± {fila.semiamplitud}")
+        emoji = "⚠️ " if bloque['escalar'].any() else "✅"
+        print(f"{emoji} {METRICAS.get(metrica, metrica)}: {' | '.join(partes)}")
+
+    print()
+    if resultado['motivos']:
+        print("⚠️ La muestra no alcanza; ejecutar la validación completa (python -m analitica.tareas):")
+        for motivo in resultado['motivos']:
+            print(f"   • {motivo}")
+    else:
+        print("✅ Todas las cotas dentro de los umbrales: no hace falta leer el archivo completo")
+
+    if args.salida:
+        tabla.to_csv(args.salida, index=False, sep=';', encoding='utf-8')
+        print(f"\n💾 Tabla guardada en: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# 📌 Participación de gerentes: encuestas reales vs esperadas con rankings top-k incrementales
+import argparse
+import heapq
+import json
+import time
+
+from .conciliacion import normalizar_nombre
+from .datos import RUTA_DATOS, RUTA_EJECUTIVOS, cargar_ejecutivos, cargar_encuestas
+
+NIVELES = ('EJECUTIVO_FINAL', 'AGENCIA', 'CIUDAD', 'TIPO_EJECUTIVO')
+CRITERIOS = ('tasa', 'faltante')
+UMBRAL_ALERTA = 0.5  # Tasa de respuesta por debajo de la cual se alerta
+TOP_K = 5
+COMPACTAR = 4  # Se reconstruye el heap cuando tiene más de 4 entradas por grupo
+
+
+class RankingIncremental:
+    """
+    Top-k y bottom-k de un puntaje que cambia con cada respuesta, sin reordenar.
+
+    Cada actualización empuja una entrada nueva a dos heaps (mínimo y máximo)
+    en O(log n); las entradas viejas se descartan de forma perezosa al
+    consultar, comparando contra el puntaje vigente del grupo. Consultar k
+    elementos cuesta O(k log n) más las entradas obsoletas que se limpian.
+    """
+
+    def __init__(self):
+        self.puntajes = {}
+        self._minimos = []
+        self._maximos = []
+
+    def actualizar(self, grupo, puntaje):
+        if self.puntajes.get(grupo) == puntaje:
+            return
+        self.puntajes[grupo] = puntaje
+        heapq.heappush(self._minimos, (puntaje, grupo))
+        heapq.heappush(self._maximos, (-puntaje, grupo))
+        if len(self._minimos) > COMPACTAR * max(len(self.puntajes), 16):
+            self._compactar()
+
+    def _compactar(self):
+        self._minimos = [(p, g) for g, p in self.puntajes.items()]
+        self._maximos = [(-p, g) for g, p in self.puntajes.items()]
+        heapq.heapify(self._minimos)
+        heapq.heapify(self._maximos)
+
+    def _extremos(self, heap, k, signo, limite=None):
+        vigentes = []
+        vistos = set()
+        while heap and (k is None or len(vigentes) < k):
+            if limite is not None and heap[0][0] >= limite:
+                break  # El resto del heap (vigente u obsoleto) ya no cumple
+            puntaje, grupo = heapq.heappop(heap)
+            if grupo in vistos or self.puntajes.get(grupo) != puntaje * signo:
+                continue  # Entrada obsoleta o repetida: se descarta
+            vistos.add(grupo)
+            vigentes.append((puntaje, grupo))
+        for entrada in vigentes:
+            heapq.heappush(heap, entrada)
+        return [(grupo, puntaje * signo) for puntaje, grupo in vigentes]
+
+    def mayores(self, k=TOP_K):
+        return self._extremos(self._maximos, k, -1)
+
+    def menores(self, k=TOP_K):
+        return self._extremos(self._minimos, k, 1)
+
+    def menores_que(self, limite):
+        """Todos los grupos con puntaje < `limite`, de menor a mayor, sin recorrer el resto."""
+        return self._extremos(self._minimos, None, 1, limite)
+
+
+class MotorParticipacion:
+    """
+    Encuestas reales vs `cantidad encuesta` esperada por gerente, agencia,
+    ciudad y tipo de ejecutivo.
+
+    Lo esperado sale del roster; lo real se acumula con `registrar` (una
+    respuesta, O(niveles · log n)) o con `cargar` (un DataFrame completo en
+    una pasada agrupada). Cada nivel mantiene rankings incrementales por
+    tasa de respuesta y por faltante.
+    """
+
+    def __init__(self, ejecutivos):
+        self.esperado = {nivel: {} for nivel in NIVELES}
+        self.real = {nivel: {} for nivel in NIVELES}
+        self.nombres = {nivel: {} for nivel in NIVELES}
+        self.rankings = {(nivel, criterio): RankingIncremental() for nivel in NIVELES for criterio in CRITERIOS}
+        self.respuestas = 0
+
+        for fila in ejecutivos.to_dict('records'):
+            for nivel in NIVELES:
+                llave = self._llave(nivel, fila.get(nivel))
+                self.esperado[nivel][llave] = self.esperado[nivel].get(llave, 0) + int(fila['cantidad encuesta'])
+        for nivel in NIVELES:
+            for llave in self.esperado[nivel]:
+                self._actualizar_rankings(nivel, llave)
+
+    def _llave(self, nivel, valor):
+        texto = str(valor).strip() if isinstance(valor, str) else ''
+        llave = normalizar_nombre(texto) or 'SIN DATO'
+        self.nombres[nivel].setdefault(llave, texto or 'Sin dato')
+        return llave
+
+    def _actualizar_rankings(self, nivel, llave):
+        esperado = self.esperado[nivel].get(llave, 0)
+        real = self.real[nivel].get(llave, 0)
+        # Grupos fuera del roster (esperado 0) no compiten por tasa
+        if esperado > 0:
+            self.rankings[(nivel, 'tasa')].actualizar(llave, real / esperado)
+        self.rankings[(nivel, 'faltante')].actualizar(llave, esperado - real)
+
+    def registrar(self, fila, cantidad=1):
+        """Suma una respuesta (dict con EJECUTIVO_FINAL, AGENCIA, CIUDAD y TIPO_EJECUTIVO)."""
+        self.respuestas += cantidad
+        for nivel in NIVELES:
+            llave = self._llave(nivel, fila.get(nivel))
+            self.real[nivel][llave] = self.real[nivel].get(llave, 0) + cantidad
+            self._actualizar_rankings(nivel, llave)
+
+    def cargar(self, encuestas):
+        """Carga masiva: un `groupby` por todas las combinaciones y un `registrar` por combinación."""
+        combinaciones = encuestas.groupby(list(NIVELES), dropna=False, observed=True).size()
+        for valores, cantidad in combinaciones.items():
+            self.registrar(dict(zip(NIVELES, valores)), int(cantidad))
+        return self
+
+    def fila(self, nivel, llave):
+        esperado = self.esperado[nivel].get(llave, 0)
+        real = self.real[nivel].get(llave, 0)
+        return {
+            'nivel': nivel,
+            'grupo': self.nombres[nivel].get(llave, llave),
+            'esperado': esperado,
+            'real': real,
+            'tasa': round(real / esperado, 4) if esperado else None,
+            'faltante': max(esperado - real, 0),
+            'en_roster': esperado > 0,
+        }
+
+    def tabla(self, nivel):
+        llaves = self.esperado[nivel].keys() | self.real[nivel].keys()
+        return [self.fila(nivel, llave) for llave in llaves]
+
+    def top(self, nivel, criterio='tasa', k=TOP_K):
+        return [self.fila(nivel, llave) for llave, _ in self.rankings[(nivel, criterio)].mayores(k)]
+
+    def bottom(self, nivel, criterio='tasa', k=TOP_K):
+        return [self.fila(nivel, llave) for llave, _ in self.rankings[(nivel, criterio)].menores(k)]
+
+    def alertas(self, umbral=UMBRAL_ALERTA):
+        """
+        Todos los grupos con tasa de respuesta bajo el umbral, sacados del
+        heap de mínimos de cada nivel hasta la primera tasa que lo alcanza
+        (no se recorre ni ordena la tabla completa), más las respuestas de
+        ejecutivos que no están en el roster.
+        """
+        resultado = []
+        for nivel in NIVELES:
+            for llave, _ in self.rankings[(nivel, 'tasa')].menores_que(umbral):
+                fila = self.fila(nivel, llave)
+                resultado.append({**fila, 'motivo': f"tasa {fila['tasa'] * 100:.0f}% < {umbral * 100:.0f}%"})
+        for llave in self.real['EJECUTIVO_FINAL']:
+            if self.esperado['EJECUTIVO_FINAL'].get(llave, 0) == 0:
+                resultado.append({**self.fila('EJECUTIVO_FINAL', llave), 'motivo': 'fuera del roster'})
+        return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Participación real vs esperada por gerente')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--hasta', help='Solo respuestas hasta esta fecha (AAAA-MM-DD), simulando la recolección')
+    parser.add_argument('--k', type=int, default=TOP_K)
+    parser.add_argument('--salida', help='Ruta JSON con tablas, rankings y alertas')
+    args = parser.parse_args()
+
+    print("👥 PARTICIPACIÓN DE GERENTES")
+    print("=" * 60)
+    encuestas = cargar_encuestas(args.datos)
+    motor = MotorParticipacion(cargar_ejecutivos(RUTA_EJECUTIVOS))
+
+    inicio = time.perf_counter()
+    if args.hasta:
+        # Réplica en orden cronológico, una respuesta a la vez
+        import pandas as pd
+
+        recolectadas = encuestas[encuestas['DATE_MODIFIED'] < pd.Timestamp(args.hasta) + pd.Timedelta(days=1)]
+        for fila in recolectadas.sort_values('DATE_MODIFIED')[list(NIVELES)].to_dict('records'):
+            motor.registrar(fila)
+    else:
+        motor.cargar(encuestas)
+    milisegundos = (time.perf_counter() - inicio) * 1000
+    print(f"   • Respuestas registradas: {motor.respuestas:,} en {milisegundos:.1f} ms")
+
+    for nivel in NIVELES[1:]:
+        filas = sorted(motor.tabla(nivel), key=lambda f: f['grupo'])
+        print(f"\n📊 POR {nivel}:")
+        for fila in filas:
+            tasa = f"{fila['tasa'] * 100:.0f}%" if fila['tasa'] is not None else '—'
+            print(f"   • {fila['grupo']}: {fila['real']:,} de {fila['esperado']:,} ({tasa})")
+
+    print(f"\n🔻 {args.k} GERENTES CON MENOR PARTICIPACIÓN:")
+    for fila in motor.bottom('EJECUTIVO_FINAL', 'tasa', args.k):
+        print(f"   • {fila['grupo']}: {fila['real']} de {fila['esperado']} (faltan {fila['faltante']})")
+    print(f"\n🔺 {args.k} GERENTES CON MAYOR FALTANTE:")
+    for fila in motor.top('EJECUTIVO_FINAL', 'faltante', args.k):
+        print(f"   • {fila['grupo']}: faltan {fila['faltante']} de {fila['esperado']}")
+
+    alertas = motor.alertas()
+    print(f"\n🚨 ALERTAS: {len(alertas)}")
+    for alerta in alertas[:15]:
+        print(f"   • [{alerta['nivel']}] {alerta['grupo']}: {alerta['motivo']}")
+
+    if args.salida:
+        salida = {
+            'tablas': {nivel: motor.tabla(nivel) for nivel in NIVELES},
+            'top': {nivel: motor.top(nivel, 'tasa', args.k) for nivel in NIVELES},
+            'bottom': {nivel: motor.bottom(nivel, 'tasa', args.k) for nivel in NIVELES},
+            'alertas': alertas,
+        }
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(salida, archivo, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultado guardado en: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
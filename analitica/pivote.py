@@ -0,0 +1,170 @@
+# 📌 Pivote genérico disperso: cualquier combinación de dimensiones x métricas con llaves combinadas
+import argparse
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from .datos import CALIFICACIONES, DIMENSIONES, METRICAS, RUTA_DATOS
+from .motor import FILTROS, PERIODOS, MotorEncuestas, normalizar_filtros
+
+ESTADISTICOS = ['respuestas', 'promedio', 'pct_1', 'pct_2', 'pct_3', 'pct_4', 'pct_5', 'top_box', 'top2_box']
+LIMITE_LLAVE = 2 ** 62  # Por encima, las combinaciones se compactan con np.unique por filas
+
+
+def resolver_dimension(nombre):
+    """
+    Acepta el nombre de la columna ('TIPO EJECUTIVO' o 'TIPO_EJECUTIVO'), el
+    parámetro de filtro ('agencia') o una frecuencia ('mes', 'semana', 'dia').
+    """
+    limpio = nombre.strip()
+    clave = limpio.lower()
+    if clave in PERIODOS:
+        return PERIODOS[clave]
+    if clave in FILTROS:
+        return FILTROS[clave]
+    columna = limpio.upper().replace(' ', '_')
+    if columna in DIMENSIONES or columna in PERIODOS.values():
+        return columna
+    raise KeyError(f"Dimensión desconocida: {nombre}")
+
+
+def llave_combinada(codigos, cardinalidades):
+    """
+    Índice mixto (c0·r1·r2 + c1·r2 + c2 ...) de cada registro, compactado a las
+    combinaciones observadas: retorna `(combinaciones, inverso)`, donde
+    `combinaciones` es una matriz (k x dimensiones) de códigos y `inverso`
+    asigna cada registro a su fila. El tamaño es k (combinaciones presentes),
+    nunca el producto de las cardinalidades.
+    """
+    if math.prod(cardinalidades) < LIMITE_LLAVE:
+        llave = np.ravel_multi_index(codigos, cardinalidades) if codigos else np.zeros(0, dtype=np.int64)
+        unicas, inverso = np.unique(llave, return_inverse=True)
+        combinaciones = np.stack(np.unravel_index(unicas, cardinalidades), axis=1)
+    else:
+        combinaciones, inverso = np.unique(np.stack(codigos, axis=1), axis=0, return_inverse=True)
+    return combinaciones, inverso.ravel()
+
+
+def pivote(motor, filas, metricas=None, filtros=(), minimo=1):
+    """
+    Tabla larga con una fila por combinación observada de `filas` x métrica.
+
+    Columnas: una por dimensión, metrica, registros (filas de la combinación),
+    respuestas (con calificación), promedio, pct_1..pct_5, top_box (% 5) y
+    top2_box (% 4-5). Los histogramas salen de un `np.bincount` sobre
+    inverso·6 + calificación, así el costo es O(registros · métricas + k) y
+    la memoria O(k), con k las combinaciones presentes.
+    """
+    dimensiones = [resolver_dimension(f) for f in filas]
+    metricas = list(metricas or METRICAS)
+    for metrica in metricas:
+        if metrica not in METRICAS:
+            raise KeyError(f"Métrica desconocida: {metrica}")
+
+    mascara = motor.mascara(filtros)
+    seleccion = (lambda arreglo: arreglo) if mascara is None else (lambda arreglo: arreglo[mascara])
+    codigos = [seleccion(motor.codigos[d]).astype(np.int64) for d in dimensiones]
+    cardinalidades = [len(motor.categorias[d]) for d in dimensiones]
+    total = len(codigos[0]) if codigos else (motor.total if mascara is None else int(mascara.sum()))
+    if not codigos:
+        combinaciones, inverso = np.zeros((1, 0), dtype=np.int64), np.zeros(total, dtype=np.int64)
+    else:
+        combinaciones, inverso = llave_combinada(codigos, cardinalidades)
+    k = len(combinaciones) if total else 0
+    registros = np.bincount(inverso, minlength=k)
+
+    etiquetas = {
+        dimension: np.asarray(motor.categorias[dimension], dtype=object)[combinaciones[:, i]]
+        for i, dimension in enumerate(dimensiones)
+    }
+    bloques = []
+    for metrica in metricas:
+        valores = seleccion(motor.calificaciones[metrica]).astype(np.int64)
+        histograma = np.bincount(inverso * CALIFICACIONES + valores, minlength=k * CALIFICACIONES)
+        conteos = histograma.reshape(k, CALIFICACIONES)[:, 1:]
+        respuestas = conteos.sum(axis=1)
+        presentes = np.nonzero(respuestas >= max(minimo, 1))[0]
+        if len(presentes) == 0:
+            continue
+        celdas, n = conteos[presentes], respuestas[presentes]
+        bloque = {dimension: etiquetas[dimension][presentes] for dimension in dimensiones}
+        bloque.update({
+            'metrica': metrica,
+            'registros': registros[presentes],
+            'respuestas': n,
+            'promedio': np.round(celdas @ np.arange(1, CALIFICACIONES) / n, 2),
+        })
+        for calificacion in range(1, CALIFICACIONES):
+            bloque[f'pct_{calificacion}'] = np.round(celdas[:, calificacion - 1] / n * 100, 1)
+        bloque['top_box'] = bloque['pct_5']
+        bloque['top2_box'] = np.round(celdas[:, 3:].sum(axis=1) / n * 100, 1)
+        bloques.append(pd.DataFrame(bloque))
+
+    columnas = [*dimensiones, 'metrica', 'registros', *ESTADISTICOS]
+    if not bloques:
+        return pd.DataFrame(columns=columnas)
+    tabla = pd.concat(bloques, ignore_index=True)[columnas]
+    return tabla.sort_values([*dimensiones, 'metrica'], kind='stable', ignore_index=True)
+
+
+def cruce(tabla, columna, valor='promedio', metrica=None):
+    """
+    Vista de tabla cruzada (ancha) de un pivote largo: `columna` pasa a las
+    columnas y el resto de dimensiones quedan como índice. Las celdas sin
+    respuestas quedan vacías (no se rellenan con ceros).
+    """
+    columna = resolver_dimension(columna)
+    if columna not in tabla.columns:
+        raise KeyError(f"La dimensión {columna} no está en las filas del pivote")
+    if metrica is not None:
+        tabla = tabla[tabla['metrica'] == metrica]
+    indice = [c for c in tabla.columns[:tabla.columns.get_loc('metrica') + 1] if c != columna]
+    return tabla.pivot_table(index=indice, columns=columna, values=valor, aggfunc='first')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pivote de cualquier combinación de dimensiones y métricas')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--filas', default='SEGMENTO', help='Dimensiones separadas por coma, p. ej. CIUDAD,mes')
+    parser.add_argument('--metricas', default='', help='Métricas separadas por coma (por defecto, todas)')
+    parser.add_argument('--filtro', action='append', default=[], metavar='DIMENSION=VALOR[,VALOR]',
+                        help='Filtro como en el servidor, repetible: segmento=PERSONAS')
+    parser.add_argument('--minimo', type=int, default=1, help='Respuestas mínimas por celda')
+    parser.add_argument('--columnas', help='Dimensión a llevar a columnas (tabla cruzada del promedio)')
+    parser.add_argument('--salida', help='Ruta CSV donde guardar la tabla larga')
+    args = parser.parse_args()
+
+    print("🧊 PIVOTE DE DIMENSIONES Y MÉTRICAS")
+    print("=" * 60)
+    motor = MotorEncuestas.desde_archivo(args.datos)
+    filas = [f for f in args.filas.split(',') if f.strip()]
+    if args.columnas and resolver_dimension(args.columnas) not in {resolver_dimension(f) for f in filas}:
+        filas.append(args.columnas)
+    metricas = [m.strip() for m in args.metricas.split(',') if m.strip()] or None
+    filtros = normalizar_filtros(dict(f.split('=', 1) for f in args.filtro if '=' in f))
+
+    inicio = time.perf_counter()
+    tabla = pivote(motor, filas, metricas, filtros, args.minimo)
+    milisegundos = (time.perf_counter() - inicio) * 1000
+    dimensiones = [resolver_dimension(f) for f in filas]
+    posibles = math.prod(len(motor.categorias[d]) for d in dimensiones)
+    combinaciones = len(tabla[dimensiones].drop_duplicates()) if dimensiones else min(len(tabla), 1)
+    print(f"   • Filas: {', '.join(dimensiones) or 'TOTAL'} | Filtros: {filtros or 'ninguno'}")
+    print(f"   • Combinaciones presentes: {combinaciones:,} de {posibles:,} posibles en {milisegundos:.1f} ms")
+    print()
+
+    with pd.option_context('display.max_rows', 40, 'display.width', 160):
+        if args.columnas:
+            print(cruce(tabla, args.columnas, metrica=metricas[0] if metricas else None).to_string())
+        else:
+            print(tabla[[*dimensiones, 'metrica', 'respuestas', 'promedio', 'top_box', 'top2_box']].to_string(index=False))
+
+    if args.salida:
+        tabla.to_csv(args.salida, index=False, sep=';', encoding='utf-8')
+        print(f"\n💾 Tabla guardada en: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# 📌 Planificador de tamaño de muestra con asignación óptima por estratos
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from .datos import RUTA_DATOS, RUTA_EJECUTIVOS, UNIVERSO_TOTAL, cargar_ejecutivos
+from .motor import MotorEncuestas
+
+# Mismos valores Z que `calcular_margen_error` en validacion-ficha-tecnica.py
+VALORES_Z = {
+    0.90: 1.645,
+    0.95: 1.96,
+    0.99: 2.576,
+}
+
+ESTRATOS = ('SEGMENTO', 'AGENCIA')
+MINIMO_VARIANZA = 10  # Con menos respuestas se asume p = 0.5 en el estrato
+
+
+def valor_z(nivel_confianza):
+    """Valor Z vectorizado; niveles desconocidos usan 1.96 como el script original."""
+    niveles = np.asarray(nivel_confianza, dtype=float)
+    z = np.full(niveles.shape, 1.96)
+    for nivel, valor in VALORES_Z.items():
+        z = np.where(np.isclose(niveles, nivel), valor, z)
+    return z
+
+
+def margen_error(N, n, nivel_confianza=0.95, p=0.5):
+    """
+    Margen de error con corrección por población finita, vectorizado.
+
+    Misma fórmula que `calcular_margen_error`: Z·√(p(1-p)/n)·√((N-n)/(N-1)).
+    """
+    N = np.asarray(N, dtype=float)
+    n = np.asarray(n, dtype=float)
+    z = valor_z(nivel_confianza)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return z * np.sqrt(p * (1 - p) / n) * np.sqrt(np.clip((N - n) / (N - 1), 0, None))
+
+
+def tamano_muestra(N, margen, nivel_confianza=0.95, p=0.5):
+    """
+    Inversa exacta de `margen_error` en forma cerrada:
+
+        n = Z²·p(1-p)·N / (e²·(N-1) + Z²·p(1-p))
+
+    `margen` va en proporción (0.025 = 2,5%). Retorna enteros redondeados
+    hacia arriba y nunca mayores que N.
+    """
+    N = np.asarray(N, dtype=float)
+    e = np.asarray(margen, dtype=float)
+    z = valor_z(nivel_confianza)
+    varianza = z ** 2 * p * (1 - p)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        n = varianza * N / (e ** 2 * (N - 1) + varianza)
+    return np.minimum(np.ceil(n - 1e-9), N).astype(np.int64)
+
+
+def estratos_desde_roster(ejecutivos, motor, estratos=ESTRATOS, metrica='satisfaccion_general',
+                          universo=UNIVERSO_TOTAL):
+    """
+    Tabla de estratos con tamaño, variabilidad y tasa de respuesta observadas.
+
+    - N: `cantidad encuesta` del roster por estrato, escalada al universo.
+    - n_observado: respuestas de la última ola.
+    - p: proporción top-box (calificación 5) observada en `metrica`.
+    - S: desviación de Bernoulli √(p(1-p)), usada por la asignación de Neyman
+      (0.5 si el estrato tiene menos de MINIMO_VARIANZA respuestas: caso más
+      conservador).
+    - tasa_respuesta: n_observado / N.
+    """
+    estratos = list(estratos)
+    roster = ejecutivos.copy()
+    for columna in estratos:
+        roster[columna] = roster[columna].astype(str).str.strip().str.upper()
+    N = roster.groupby(estratos)['cantidad encuesta'].sum()
+    N = N[N > 0]
+    N = N / N.sum() * universo
+
+    df = motor.df[estratos].apply(lambda c: c.astype(str).str.strip().str.upper())
+    df['respuesta'] = motor.calificaciones[metrica] > 0
+    df['top_box'] = motor.calificaciones[metrica] == 5
+    observados = df.groupby(estratos).agg(n_observado=('respuesta', 'sum'), top=('top_box', 'sum'))
+
+    tabla = pd.DataFrame({'N': N}).join(observados, how='left').fillna(0)
+    tabla['n_observado'] = tabla['n_observado'].astype(np.int64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        tabla['p'] = np.where(tabla['n_observado'] >= MINIMO_VARIANZA, tabla['top'] / tabla['n_observado'], 0.5)
+    tabla['S'] = np.sqrt(tabla['p'] * (1 - tabla['p'])).clip(lower=1e-3)
+    tabla['tasa_respuesta'] = (tabla['n_observado'] / tabla['N']).where(tabla['n_observado'] > 0)
+    tasa_global = tabla['n_observado'].sum() / tabla['N'].sum()
+    tabla['tasa_respuesta'] = tabla['tasa_respuesta'].fillna(tasa_global)
+    return tabla.drop(columns='top').reset_index()
+
+
+def asignar(N, S, n_total, metodo='neyman'):
+    """
+    Reparte uno o muchos tamaños de muestra totales entre estratos.
+
+    `n_total` puede ser escalar o arreglo (escenarios,); el resultado es
+    (escenarios, estratos). Neyman asigna ∝ N_h·S_h y la proporcional ∝ N_h.
+    Los estratos que superarían su N_h se fijan en N_h y el remanente se
+    redistribuye entre los demás (pocas pasadas vectorizadas).
+    """
+    N = np.asarray(N, dtype=float)
+    pesos = N * np.asarray(S, dtype=float) if metodo == 'neyman' else N.copy()
+    totales = np.atleast_1d(np.asarray(n_total, dtype=float))[:, None]
+
+    fijos = np.zeros((len(totales), len(N)), dtype=bool)
+    for _ in range(len(N)):
+        libres = np.where(fijos, 0.0, pesos)
+        restante = totales[:, 0] - np.where(fijos, N, 0.0).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            asignacion = np.where(fijos, N, libres / libres.sum(axis=1, keepdims=True) * restante[:, None])
+        excedidos = (asignacion > N) & ~fijos
+        if not excedidos.any():
+            break
+        fijos |= excedidos
+    return np.minimum(np.nan_to_num(asignacion), N)
+
+
+def margen_estratificado(N, S, n_h, nivel_confianza=0.95):
+    """
+    Margen del estimador estratificado: Z·√(Σ W_h²·S_h²/n_h·(1 - n_h/N_h)).
+    Acepta asignaciones (escenarios, estratos); los estratos con n_h = 0 no
+    aportan varianza.
+    """
+    N = np.asarray(N, dtype=float)
+    W = N / N.sum()
+    S = np.asarray(S, dtype=float)
+    n_h = np.asarray(n_h, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        varianza = np.where(n_h > 0, W ** 2 * S ** 2 / n_h * (1 - n_h / N), 0.0).sum(axis=-1)
+    return valor_z(nivel_confianza) * np.sqrt(varianza)
+
+
+def planear_escenarios(estratos, margenes, niveles_confianza=(0.95,), p=0.5):
+    """
+    Evalúa en una sola llamada todos los escenarios margen objetivo x nivel de confianza.
+
+    Para cada escenario calcula el n requerido en cada estrato para lograr
+    ese margen dentro del estrato, el total, las invitaciones necesarias
+    según la tasa de respuesta observada y el margen consolidado resultante
+    del diseño estratificado. Todo se resuelve por broadcasting
+    (escenarios x estratos).
+    """
+    margenes = np.asarray(margenes, dtype=float)
+    niveles = np.asarray(niveles_confianza, dtype=float)
+    e, z = np.meshgrid(margenes, niveles, indexing='ij')
+    e, z = e.ravel(), z.ravel()
+
+    N = estratos['N'].to_numpy()
+    S = estratos['S'].to_numpy()
+    tasa = estratos['tasa_respuesta'].to_numpy()
+    requerido = tamano_muestra(N[None, :], e[:, None], z[:, None], p)
+    invitaciones = np.minimum(np.ceil(requerido / tasa[None, :]), N[None, :])
+
+    return pd.DataFrame({
+        'margen_objetivo': e,
+        'nivel_confianza': z,
+        'n_total': requerido.sum(axis=1),
+        'invitaciones': invitaciones.sum(axis=1).astype(np.int64),
+        'margen_consolidado': margen_estratificado(N, S, requerido, z),
+        'estrato_mas_exigente': np.asarray(_etiquetas(estratos), dtype=object)[requerido.argmax(axis=1)],
+    }), requerido
+
+
+def _etiquetas(estratos):
+    columnas = [c for c in estratos.columns if c not in ('N', 'n_observado', 'p', 'S', 'tasa_respuesta')]
+    return estratos[columnas].astype(str).agg(' / '.join, axis=1).tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Planificador de la próxima ola de la encuesta')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--margen', type=float, default=2.5, help='Margen objetivo consolidado en %%')
+    parser.add_argument('--margen-estrato', type=float, default=10.0, help='Margen objetivo por estrato en %%')
+    args = parser.parse_args()
+
+    print("🧮 PLANIFICADOR DE TAMAÑO DE MUESTRA")
+    print("=" * 60)
+    motor = MotorEncuestas.desde_archivo(args.datos)
+    estratos = estratos_desde_roster(cargar_ejecutivos(RUTA_EJECUTIVOS), motor)
+    N, S = estratos['N'].to_numpy(), estratos['S'].to_numpy()
+
+    n = int(tamano_muestra(UNIVERSO_TOTAL, args.margen / 100))
+    print(f"📐 Margen consolidado de {args.margen}% (95%, p=0.5): n = {n:,} de {UNIVERSO_TOTAL:,}")
+    print(f"   • Comprobación: margen con n={n:,}: {margen_error(UNIVERSO_TOTAL, n) * 100:.3f}%")
+    print()
+
+    print(f"📊 ASIGNACIÓN DE n = {n:,} ENTRE {len(estratos)} ESTRATOS (SEGMENTO x AGENCIA):")
+    neyman = asignar(N, S, n, 'neyman')[0]
+    proporcional = asignar(N, S, n, 'proporcional')[0]
+    for etiqueta, fila, ny, pr in zip(_etiquetas(estratos), estratos.itertuples(), neyman, proporcional):
+        print(f"   • {etiqueta}: Neyman {ny:,.0f} | proporcional {pr:,.0f} "
+              f"(invitaciones {np.ceil(ny / fila.tasa_respuesta):,.0f} con tasa {fila.tasa_respuesta * 100:.1f}%)")
+    print(f"   • Margen estratificado Neyman: {margen_estratificado(N, S, neyman) * 100:.2f}% "
+          f"| proporcional: {margen_estratificado(N, S, proporcional) * 100:.2f}% "
+          f"(p observado, no 0.5)")
+    print()
+
+    margenes = np.linspace(0.02, 0.20, 1000)
+    escenarios, _ = planear_escenarios(estratos, margenes, (0.90, 0.95, 0.99))
+    print(f"🔬 ESCENARIOS EVALUADOS: {len(escenarios):,}")
+    objetivo = args.margen_estrato / 100
+    fila = escenarios.iloc[((escenarios['margen_objetivo'] - objetivo).abs()
+                            + (escenarios['nivel_confianza'] - 0.95).abs()).argmin()]
+    print(f"   • Margen de {fila['margen_objetivo'] * 100:.1f}% en cada estrato (95%): "
+          f"{int(fila['n_total']):,} encuestas, {int(fila['invitaciones']):,} invitaciones, "
+          f"margen consolidado {fila['margen_consolidado'] * 100:.2f}%")
+    print(f"   • Estrato más exigente: {fila['estrato_mas_exigente']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+# 📌 Ponderación por raking (IPF) calibrada al universo de 24.067 clientes
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from .datos import CALIFICACIONES, METRICAS, RUTA_DATOS, RUTA_EJECUTIVOS, UNIVERSO_TOTAL, cargar_ejecutivos
+from .motor import MotorEncuestas
+
+DIMENSIONES_RAKING = ('SEGMENTO', 'CIUDAD', 'AGENCIA')
+TOLERANCIA = 1e-6
+MAXIMO_ITERACIONES = 200
+RECORTE = (0.3, 3.0)  # Límites del peso relativo al peso medio
+MAXIMO_RONDAS_RECORTE = 10
+TOLERANCIA_MUESTRA = 0.01  # Metas a menos de 1% de los márgenes de la muestra no corrigen nada
+Z_95 = 1.96
+
+
+def metas_desde_roster(ejecutivos, dimensiones=DIMENSIONES_RAKING, universo=UNIVERSO_TOTAL):
+    """
+    Márgenes objetivo a partir de la `cantidad encuesta` esperada del roster,
+    escalados al universo. Sirve como aproximación mientras no se cuente con
+    el conteo real de clientes por segmento, ciudad y agencia.
+    """
+    metas = {}
+    for dimension in dimensiones:
+        totales = ejecutivos.groupby(dimension)['cantidad encuesta'].sum()
+        totales = totales[totales > 0]
+        metas[dimension] = (totales / totales.sum() * universo).to_dict()
+    return metas
+
+
+def _preparar_metas(motor, metas, dimensiones, universo):
+    """
+    Alinea las metas con los códigos del motor y las escala para que cada
+    dimensión sume el universo. Reporta grupos sin meta o sin muestra.
+    """
+    preparadas = {}
+    avisos = []
+    for dimension in dimensiones:
+        objetivo = {str(k).strip().upper(): float(v) for k, v in metas.get(dimension, {}).items()}
+        categorias = [c.upper() for c in motor.categorias[dimension]]
+        presentes = set(categorias)
+        sin_muestra = sorted(set(objetivo) - presentes)
+        if sin_muestra:
+            avisos.append(f"{dimension}: grupos sin respuestas en la muestra {sin_muestra}")
+        vector = np.array([objetivo.get(c, np.nan) for c in categorias])
+        sin_meta = [motor.categorias[dimension][i] for i in np.flatnonzero(np.isnan(vector))]
+        if sin_meta:
+            avisos.append(f"{dimension}: grupos sin meta, conservan su peso {sin_meta}")
+        alcanzable = np.nansum(vector)
+        if alcanzable > 0:
+            vector = vector / alcanzable * universo
+        preparadas[dimension] = vector
+    return preparadas, avisos
+
+
+def _raking(tamanos, codigos_celda, metas, pesos, tolerancia, maximo_iteraciones):
+    """
+    Ajuste proporcional iterativo sobre celdas: cada iteración recorre las
+    dimensiones y reescala los pesos de celda para igualar su margen.
+    """
+    for iteracion in range(1, maximo_iteraciones + 1):
+        error = 0.0
+        for dimension, codigos in codigos_celda.items():
+            meta = metas[dimension]
+            actual = np.bincount(codigos, weights=tamanos * pesos, minlength=len(meta))
+            con_meta = ~np.isnan(meta) & (actual > 0)
+            factor = np.ones(len(meta))
+            factor[con_meta] = meta[con_meta] / actual[con_meta]
+            pesos = pesos * factor[codigos]
+            error = max(error, float(np.max(np.abs(factor[con_meta] - 1), initial=0.0)))
+        if error < tolerancia:
+            return pesos, iteracion, error
+    return pesos, maximo_iteraciones, error
+
+
+def calcular_pesos(motor, metas, dimensiones=DIMENSIONES_RAKING, universo=UNIVERSO_TOTAL,
+                   tolerancia=TOLERANCIA, maximo_iteraciones=MAXIMO_ITERACIONES, recorte=RECORTE):
+    """
+    Calcula un peso por registro mediante raking vectorizado con recorte.
+
+    El IPF trabaja sobre las celdas únicas SEGMENTO x CIUDAD x AGENCIA (no
+    sobre registros), de modo que cada iteración es un `bincount` por
+    dimensión. Tras converger, los pesos fuera de `recorte` (relativos al
+    peso medio) se recortan y se vuelve a rakear hasta cumplir ambos.
+
+    Retorna `(pesos, diagnostico)`.
+    """
+    inicio = time.perf_counter()
+    metas, avisos = _preparar_metas(motor, metas, dimensiones, universo)
+
+    tamanos_dimension = [len(motor.categorias[d]) for d in dimensiones]
+    combinados = np.ravel_multi_index([motor.codigos[d] for d in dimensiones], tamanos_dimension)
+    celdas, celda_registro = np.unique(combinados, return_inverse=True)
+    tamanos = np.bincount(celda_registro).astype(float)
+    codigos_celda = dict(zip(dimensiones, np.unravel_index(celdas, tamanos_dimension)))
+
+    pesos = np.full(len(celdas), universo / motor.total)
+    iteraciones_totales = 0
+    rondas = 0
+    recorte_cumplido = True
+    for rondas in range(1, MAXIMO_RONDAS_RECORTE + 1):
+        pesos, iteraciones, error = _raking(tamanos, codigos_celda, metas, pesos, tolerancia, maximo_iteraciones)
+        iteraciones_totales += iteraciones
+        if recorte is None:
+            break
+        medio = np.average(pesos, weights=tamanos)
+        minimo, maximo = recorte[0] * medio, recorte[1] * medio
+        recorte_cumplido = pesos.min() >= minimo * (1 - 1e-6) and pesos.max() <= maximo * (1 + 1e-6)
+        if recorte_cumplido or rondas == MAXIMO_RONDAS_RECORTE:
+            break  # La última ronda termina rakeada: se priorizan los márgenes
+        pesos = np.clip(pesos, minimo, maximo)
+
+    pesos_registro = pesos[celda_registro]
+    suma = pesos_registro.sum()
+    n_efectivo = suma ** 2 / np.sum(pesos_registro ** 2)
+    errores_margen = {}
+    for dimension, codigos in codigos_celda.items():
+        meta = metas[dimension]
+        actual = np.bincount(codigos, weights=tamanos * pesos, minlength=len(meta))
+        con_meta = ~np.isnan(meta) & (meta > 0)
+        errores_margen[dimension] = float(np.max(np.abs(actual[con_meta] / meta[con_meta] - 1), initial=0.0))
+
+    # Si las metas reproducen los márgenes de la propia muestra, el raking no corrige nada
+    distancia_muestra = {}
+    for dimension in dimensiones:
+        meta = metas[dimension]
+        muestra = np.bincount(motor.codigos[dimension], minlength=len(meta)) / motor.total * universo
+        con_meta = ~np.isnan(meta) & (muestra > 0)
+        distancia_muestra[dimension] = float(np.max(np.abs(meta[con_meta] / muestra[con_meta] - 1), initial=0.0))
+
+    diagnostico = {
+        'celdas': int(len(celdas)),
+        'iteraciones': iteraciones_totales,
+        'rondas_recorte': rondas,
+        'convergio': error < tolerancia,
+        'recorte_cumplido': bool(recorte_cumplido),
+        'error_maximo_margen': errores_margen,
+        'peso_minimo': float(pesos_registro.min()),
+        'peso_maximo': float(pesos_registro.max()),
+        'razon_max_min': float(pesos_registro.max() / pesos_registro.min()),
+        'cv_pesos': float(pesos_registro.std() / pesos_registro.mean()),
+        'efecto_diseno': float(motor.total / n_efectivo),
+        'n_efectivo': float(n_efectivo),
+        'suma_pesos': float(suma),
+        'milisegundos': round((time.perf_counter() - inicio) * 1000, 2),
+        'avisos': avisos,
+        'distancia_muestra': distancia_muestra,
+        'metas_iguales_muestra': all(d < TOLERANCIA_MUESTRA for d in distancia_muestra.values()),
+    }
+    return pesos_registro, diagnostico
+
+
+def kpis_ponderados(motor, pesos, dimension=None, filtros=(), universo=UNIVERSO_TOTAL, z=Z_95):
+    """
+    KPIs, distribución y márgenes de error ponderados en una sola pasada.
+
+    Por cada métrica se acumulan con `bincount` los conteos brutos, Σw y Σw²
+    por grupo x calificación; de esas tres matrices salen el promedio sin
+    ponderar y ponderado, los porcentajes 1-5, el n efectivo de Kish y los
+    márgenes de error (con corrección por población finita) del promedio y
+    del top-box.
+    """
+    mascara = motor.mascara(filtros)
+    if dimension is None:
+        codigos = np.zeros(motor.total, dtype=np.int64)
+        categorias = ['TOTAL']
+    else:
+        codigos = motor.codigos[dimension].astype(np.int64)
+        categorias = motor.categorias[dimension]
+    if mascara is not None:
+        codigos = codigos[mascara]
+        pesos = pesos[mascara]
+
+    grupos = len(categorias)
+    escala = np.arange(1, CALIFICACIONES)
+    filas = []
+    for metrica in METRICAS:
+        valores = motor.calificaciones[metrica]
+        if mascara is not None:
+            valores = valores[mascara]
+        llave = codigos * CALIFICACIONES + valores
+        tamano = grupos * CALIFICACIONES
+        brutos = np.bincount(llave, minlength=tamano).reshape(grupos, CALIFICACIONES)[:, 1:]
+        w = np.bincount(llave, weights=pesos, minlength=tamano).reshape(grupos, CALIFICACIONES)[:, 1:]
+        w2 = np.bincount(llave, weights=pesos ** 2, minlength=tamano).reshape(grupos, CALIFICACIONES)[:, 1:]
+
+        n = brutos.sum(axis=1)
+        suma_w = w.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            n_efectivo = suma_w ** 2 / w2.sum(axis=1)
+            proporciones = w / suma_w[:, None]
+            promedio = proporciones @ escala
+            promedio_bruto = (brutos @ escala) / n
+            varianza = (proporciones * (escala[None, :] - promedio[:, None]) ** 2).sum(axis=1)
+            correccion = np.sqrt(np.clip((universo - n_efectivo) / (universo - 1), 0, 1))
+            margen_promedio = z * np.sqrt(varianza / n_efectivo) * correccion
+            top_box = proporciones[:, 4]
+            margen_top_box = z * np.sqrt(top_box * (1 - top_box) / n_efectivo) * correccion
+
+        for g in np.flatnonzero(n > 0):
+            filas.append({
+                'dimension': dimension or 'TOTAL',
+                'grupo': categorias[g],
+                'metrica': metrica,
+                'n': int(n[g]),
+                'n_efectivo': round(float(n_efectivo[g]), 1),
+                'promedio_sin_ponderar': round(float(promedio_bruto[g]), 2),
+                'promedio': round(float(promedio[g]), 2),
+                'margen_error_promedio': round(float(margen_promedio[g]), 3),
+                'rating5': round(float(proporciones[g, 4]) * 100, 1),
+                'rating4': round(float(proporciones[g, 3]) * 100, 1),
+                'rating123': round(float(proporciones[g, :3].sum()) * 100, 1),
+                'margen_error_top_box': round(float(margen_top_box[g]) * 100, 2),
+                **{f'pct_{k}': round(float(proporciones[g, k - 1]) * 100, 1) for k in escala},
+            })
+    return pd.DataFrame(filas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pesos de raking calibrados al universo')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--metas', help='JSON {dimension: {grupo: poblacion}}; por defecto, el roster')
+    parser.add_argument('--salida', help='Ruta CSV donde guardar ID;peso')
+    args = parser.parse_args()
+
+    print("⚖️  PONDERACIÓN POR RAKING (IPF)")
+    print("=" * 60)
+    motor = MotorEncuestas.desde_archivo(args.datos)
+    if args.metas:
+        with open(args.metas, encoding='utf-8') as archivo:
+            metas = json.load(archivo)
+        print(f"   • Metas: {args.metas}")
+    else:
+        metas = metas_desde_roster(cargar_ejecutivos(RUTA_EJECUTIVOS))
+        print("   ⚠️  Metas aproximadas desde 'cantidad encuesta' del roster")
+
+    pesos, diagnostico = calcular_pesos(motor, metas)
+    print(f"   • Celdas: {diagnostico['celdas']} | iteraciones: {diagnostico['iteraciones']} "
+          f"| rondas de recorte: {diagnostico['rondas_recorte']} | {diagnostico['milisegundos']} ms")
+    print(f"   • Convergió: {'✅' if diagnostico['convergio'] else '❌'} | "
+          f"recorte cumplido: {'✅' if diagnostico['recorte_cumplido'] else '⚠️'}")
+    for dimension, error in diagnostico['error_maximo_margen'].items():
+        print(f"   • Error máximo de margen {dimension}: {error:.2e}")
+    print(f"   • Pesos: {diagnostico['peso_minimo']:.2f} - {diagnostico['peso_maximo']:.2f} "
+          f"(CV {diagnostico['cv_pesos']:.2f})")
+    print(f"   • Efecto de diseño: {diagnostico['efecto_diseno']:.2f} | n efectivo: {diagnostico['n_efectivo']:,.0f}")
+    for aviso in diagnostico['avisos']:
+        print(f"   ⚠️  {aviso}")
+    if diagnostico['metas_iguales_muestra']:
+        print("   ⚠️  Las metas coinciden con los márgenes de la propia muestra: los pesos son uniformes y")
+        print("      los KPIs ponderados equivalen a los sin ponderar (no hay corrección de sesgo).")
+        print("      Use --metas con el conteo real de clientes por segmento, ciudad y agencia.")
+    print()
+
+    if diagnostico['metas_iguales_muestra']:
+        print("📊 KPIs CON PESOS UNIFORMES (= SIN PONDERAR, CONSOLIDADO):")
+    else:
+        print("📊 KPIs PONDERADOS (CONSOLIDADO):")
+    for fila in kpis_ponderados(motor, pesos).itertuples():
+        print(f"   • {METRICAS[fila.metrica]}: {fila.promedio:.2f} ± {fila.margen_error_promedio:.2f} "
+              f"(sin ponderar {fila.promedio_sin_ponderar:.2f}) | top-box {fila.rating5:.1f}% "
+              f"± {fila.margen_error_top_box:.2f}")
+
+    if args.salida:
+        pd.DataFrame({'ID': motor.df['ID'], 'peso': pesos}).to_csv(args.salida, index=False, sep=';')
+        print(f"\n💾 Pesos guardados en: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+# 📌 Generación en lote de reportes por ejecutivo y por agencia (Markdown/HTML, opcional pandoc)
+import argparse
+import hashlib
+import html
+import json
+import os
+import shutil
+import subprocess
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from string import Template
+
+import numpy as np
+
+from .conciliacion import normalizar_nombre
+from .datos import METRICAS, RAIZ, RUTA_DATOS, RUTA_EJECUTIVOS, cargar_ejecutivos, limpiar_sugerencia
+from .motor import MotorEncuestas, estadisticas_desde_conteos
+from .planificador import margen_error
+from .ponderacion import metas_desde_roster
+
+RUTA_REPORTES = RAIZ / 'reportes'
+MANIFIESTO = 'manifiesto.json'
+TOP_SUGERENCIAS = 5
+FORMATOS = ('md', 'html')
+
+# Tipo de reporte -> (dimensión del motor, carpeta de salida)
+TIPOS = {
+    'ejecutivo': ('EJECUTIVO_FINAL', 'ejecutivos'),
+    'agencia': ('AGENCIA', 'agencias'),
+}
+
+PLANTILLA_MD = Template("""# 📊 Reporte de Satisfacción: $grupo
+
+**$tipo** · $descripcion
+
+## 🎯 Indicadores
+
+| Métrica | Promedio | 5⭐ | 4⭐ | 1-3⭐ | Respuestas |
+|---|---|---|---|---|---|
+$filas_kpis
+
+## 📈 Distribución de calificaciones
+
+| Métrica | 1 | 2 | 3 | 4 | 5 |
+|---|---|---|---|---|---|
+$filas_distribucion
+
+## 📐 Margen de error
+
+- Encuestas respondidas: **$encuestas**
+- Universo estimado: **$universo**
+- Margen de error (95%, p=0.5): **$margen**
+
+## 💬 Sugerencias principales
+
+$sugerencias
+
+---
+*Versión del dataset: `$version` · Generado el $fecha*
+""")
+
+PLANTILLA_HTML = Template("""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Reporte de Satisfacción: $grupo</title>
+<style>
+body { font-family: system-ui, sans-serif; max-width: 900px; margin: 2rem auto; color: #1f2937; }
+table { border-collapse: collapse; width: 100%; margin-bottom: 1.5rem; }
+th, td { border: 1px solid #e5e7eb; padding: .4rem .6rem; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+th { background: #f3f4f6; }
+</style>
+</head>
+<body>
+<h1>📊 Reporte de Satisfacción: $grupo</h1>
+<p><strong>$tipo</strong> · $descripcion</p>
+<h2>🎯 Indicadores</h2>
+<table>
+<tr><th>Métrica</th><th>Promedio</th><th>5⭐</th><th>4⭐</th><th>1-3⭐</th><th>Respuestas</th></tr>
+$filas_kpis
+</table>
+<h2>📈 Distribución de calificaciones</h2>
+<table>
+<tr><th>Métrica</th><th>1</th><th>2</th><th>3</th><th>4</th><th>5</th></tr>
+$filas_distribucion
+</table>
+<h2>📐 Margen de error</h2>
+<ul>
+<li>Encuestas respondidas: <strong>$encuestas</strong></li>
+<li>Universo estimado: <strong>$universo</strong></li>
+<li>Margen de error (95%, p=0.5): <strong>$margen</strong></li>
+</ul>
+<h2>💬 Sugerencias principales</h2>
+$sugerencias
+<hr>
+<p><em>Versión del dataset: <code>$version</code> · Generado el $fecha</em></p>
+</body>
+</html>
+""")
+
+# La huella de las plantillas entra en la de cada documento: cambiarlas regenera todo
+HUELLA_PLANTILLAS = hashlib.sha256((PLANTILLA_MD.template + PLANTILLA_HTML.template).encode('utf-8')).hexdigest()
+
+
+def nombre_archivo(grupo):
+    """'Gladys Yanira Aguilar Muñoz' -> 'gladys-yanira-aguilar-munoz'."""
+    return '-'.join(normalizar_nombre(grupo).lower().replace('&', 'y').split()) or 'sin-nombre'
+
+
+def _top_sugerencias(textos, cantidad=TOP_SUGERENCIAS):
+    """Sugerencias más repetidas (sin distinguir mayúsculas); a igual frecuencia, las más largas."""
+    conteo = Counter()
+    original = {}
+    for texto in textos:
+        limpio = limpiar_sugerencia(texto)
+        if not limpio:
+            continue
+        llave = ' '.join(limpio.lower().split())
+        conteo[llave] += 1
+        original.setdefault(llave, limpio)
+    orden = sorted(conteo, key=lambda k: (-conteo[k], -len(k)))
+    return [(original[k], conteo[k]) for k in orden[:cantidad]]
+
+
+def calcular_contextos(motor, ejecutivos):
+    """
+    Calcula todos los agregados en una pasada por dimensión y arma el
+    contexto (solo tipos nativos de Python) de cada documento.
+
+    Los histogramas salen de `conteos_por_grupo` (una llave combinada por
+    métrica), las sugerencias se agrupan una sola vez por código de grupo y
+    el universo de cada grupo se estima con la `cantidad encuesta` del roster.
+    """
+    metas = metas_desde_roster(ejecutivos, dimensiones=[d for d, _ in TIPOS.values()])
+    atributos = {e['ejecutivo']: e for e in motor.ejecutivos()}
+    sugerencias = motor.df['sugerencias'].to_numpy(dtype=object) if 'sugerencias' in motor.df else None
+    ciudades = motor.df['CIUDAD'].to_numpy(dtype=object)
+
+    contextos = []
+    for tipo, (dimension, carpeta) in TIPOS.items():
+        categorias = motor.categorias[dimension]
+        codigos = motor.codigos[dimension]
+        registros = motor.registros_por_grupo(dimension)
+        histogramas = {m: motor.conteos_por_grupo(m, dimension) for m in METRICAS}
+        universos = {normalizar_nombre(k): v for k, v in metas.get(dimension, {}).items()}
+
+        # Índices de registros por grupo con un solo argsort
+        orden = np.argsort(codigos, kind='stable')
+        cortes = np.searchsorted(codigos[orden], np.arange(len(categorias) + 1))
+
+        for i, grupo in enumerate(categorias):
+            if not grupo or registros[i] == 0:
+                continue
+            filas = orden[cortes[i]:cortes[i + 1]]
+            if tipo == 'ejecutivo':
+                info = atributos.get(grupo, {})
+                descripcion = ' · '.join(v for v in (info.get('tipoEjecutivo'), info.get('agencia'),
+                                                      info.get('ciudad'), info.get('segmento')) if v)
+            else:
+                descripcion = ', '.join(sorted({str(c) for c in ciudades[filas] if c}))
+            n = int(registros[i])
+            universo = universos.get(normalizar_nombre(grupo))
+            margen = float(margen_error(universo, n)) if universo and universo > 1 else float(margen_error(1e12, n))
+            contextos.append({
+                'tipo': tipo,
+                'grupo': grupo,
+                'archivo': f'{carpeta}/{nombre_archivo(grupo)}',
+                'descripcion': descripcion,
+                'encuestas': n,
+                'universo': round(universo) if universo else None,
+                'margen': round(margen * 100, 2),
+                'metricas': {
+                    m: {
+                        'estadisticas': estadisticas_desde_conteos(histogramas[m][i]),
+                        'conteos': [int(c) for c in histogramas[m][i][1:]],
+                    }
+                    for m in METRICAS
+                },
+                'sugerencias': _top_sugerencias(sugerencias[filas]) if sugerencias is not None else [],
+                'version': motor.version[:12],
+            })
+    return contextos
+
+
+def huella_contexto(contexto):
+    """Huella del contenido del documento: si no cambia, no se vuelve a escribir."""
+    serializado = json.dumps(contexto, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256((serializado + HUELLA_PLANTILLAS).encode('utf-8')).hexdigest()
+
+
+def _valores_plantilla(contexto, formato):
+    escapar = html.escape if formato == 'html' else (lambda texto: str(texto).replace('|', '\\|'))
+    filas_kpis = []
+    filas_distribucion = []
+    for metrica, nombre in METRICAS.items():
+        e = contexto['metricas'][metrica]['estadisticas']
+        conteos = contexto['metricas'][metrica]['conteos']
+        total = max(sum(conteos), 1)
+        celdas_kpi = [nombre, f"{e['average']:.2f}", f"{e['rating5']}%", f"{e['rating4']}%",
+                      f"{e['rating123']}%", f"{e['total']:,}"]
+        celdas_dist = [nombre] + [f"{c} ({c / total * 100:.1f}%)" for c in conteos]
+        if formato == 'html':
+            filas_kpis.append('<tr>' + ''.join(f'<td>{escapar(c)}</td>' for c in celdas_kpi) + '</tr>')
+            filas_distribucion.append('<tr>' + ''.join(f'<td>{escapar(c)}</td>' for c in celdas_dist) + '</tr>')
+        else:
+            filas_kpis.append('| ' + ' | '.join(celdas_kpi) + ' |')
+            filas_distribucion.append('| ' + ' | '.join(celdas_dist) + ' |')
+
+    if not contexto['sugerencias']:
+        sugerencias = '<p>Sin sugerencias con contenido.</p>' if formato == 'html' else '_Sin sugerencias con contenido._'
+    elif formato == 'html':
+        sugerencias = '<ul>\n' + '\n'.join(
+            f'<li>“{escapar(texto)}” (×{veces})</li>' for texto, veces in contexto['sugerencias']) + '\n</ul>'
+    else:
+        sugerencias = '\n'.join(f'- “{texto}” (×{veces})' for texto, veces in contexto['sugerencias'])
+
+    universo = f"{contexto['universo']:,}" if contexto['universo'] else 'sin dato en el roster (población infinita)'
+    return {
+        'grupo': escapar(contexto['grupo']),
+        'tipo': 'Ejecutivo' if contexto['tipo'] == 'ejecutivo' else 'Agencia',
+        'descripcion': escapar(contexto['descripcion'] or '—'),
+        'filas_kpis': '\n'.join(filas_kpis),
+        'filas_distribucion': '\n'.join(filas_distribucion),
+        'encuestas': f"{contexto['encuestas']:,}",
+        'universo': universo,
+        'margen': f"±{contexto['margen']:.2f}%",
+        'sugerencias': sugerencias,
+        'version': contexto['version'],
+        'fecha': datetime.now().strftime('%d/%m/%Y %H:%M'),
+    }
+
+
+def renderizar(contexto, formato='md'):
+    plantilla = PLANTILLA_HTML if formato == 'html' else PLANTILLA_MD
+    return plantilla.substitute(_valores_plantilla(contexto, formato))
+
+
+def _escribir_documento(trabajo):
+    """Tarea del pool: renderiza y escribe los formatos de un documento."""
+    contexto, destino, formatos, pandoc = trabajo
+    base = Path(destino) / contexto['archivo']
+    base.parent.mkdir(parents=True, exist_ok=True)
+    archivos = []
+    for formato in formatos:
+        ruta = base.with_suffix(f'.{formato}')
+        ruta.write_text(renderizar(contexto, formato), encoding='utf-8')
+        archivos.append(str(ruta.relative_to(destino)))
+    if pandoc and 'md' in formatos:
+        ruta = base.with_suffix(f'.{pandoc}')
+        subprocess.run(['pandoc', str(base.with_suffix('.md')), '-o', str(ruta)], check=True)
+        archivos.append(str(ruta.relative_to(destino)))
+    return archivos
+
+
+def _archivos_esperados(contexto, formatos, pandoc):
+    """Rutas relativas que `_escribir_documento` produce para estos formatos."""
+    base = Path(contexto['archivo'])
+    extensiones = list(formatos) + ([pandoc] if pandoc and 'md' in formatos else [])
+    return [str(base.with_suffix(f'.{extension}')) for extension in extensiones]
+
+
+def generar_reportes(motor, ejecutivos, destino=RUTA_REPORTES, formatos=FORMATOS, procesos=None,
+                     forzar=False, pandoc=None):
+    """
+    Genera los reportes de todos los ejecutivos y agencias.
+
+    Los documentos cuya huella (contenido + plantillas) coincide con la del
+    manifiesto anterior y que ya tienen en disco un archivo por cada formato
+    pedido (y el de `pandoc`) se omiten; el resto se renderiza en un pool de
+    procesos. Retorna el manifiesto escrito.
+    """
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    previo = {}
+    ruta_manifiesto = destino / MANIFIESTO
+    if ruta_manifiesto.exists() and not forzar:
+        with open(ruta_manifiesto, encoding='utf-8') as archivo:
+            previo = {d['archivo']: d for d in json.load(archivo).get('documentos', [])}
+
+    documentos = []
+    trabajos = []
+    for contexto in calcular_contextos(motor, ejecutivos):
+        huella = huella_contexto(contexto)
+        anterior = previo.get(contexto['archivo'])
+        esperados = _archivos_esperados(contexto, formatos, pandoc)
+        vigente = (anterior is not None and anterior['huella'] == huella
+                   and set(esperados) <= set(anterior['archivos'])
+                   and all((destino / a).exists() for a in anterior['archivos']))
+        documento = {
+            'tipo': contexto['tipo'],
+            'grupo': contexto['grupo'],
+            'archivo': contexto['archivo'],
+            'huella': huella,
+            'encuestas': contexto['encuestas'],
+            'archivos': anterior['archivos'] if vigente else [],
+            'regenerado': not vigente,
+        }
+        documentos.append(documento)
+        if not vigente:
+            trabajos.append((documento, (contexto, str(destino), tuple(formatos), pandoc)))
+
+    if trabajos:
+        procesos = procesos or os.cpu_count() or 1
+        if procesos > 1 and len(trabajos) > 1:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                escritos = list(pool.map(_escribir_documento, [t for _, t in trabajos],
+                                         chunksize=max(1, len(trabajos) // (procesos * 4))))
+        else:
+            escritos = [_escribir_documento(t) for _, t in trabajos]
+        for (documento, _), archivos in zip(trabajos, escritos):
+            documento['archivos'] = archivos
+
+    manifiesto = {
+        'version': motor.version,
+        'generado': datetime.now().isoformat(timespec='seconds'),
+        'formatos': list(formatos) + ([pandoc] if pandoc else []),
+        'documentos': documentos,
+    }
+    with open(ruta_manifiesto, 'w', encoding='utf-8') as archivo:
+        json.dump(manifiesto, archivo, ensure_ascii=False, indent=2)
+    return manifiesto
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reportes por ejecutivo y por agencia')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--destino', default=str(RUTA_REPORTES))
+    parser.add_argument('--formatos', default=','.join(FORMATOS), help='Lista separada por coma: md,html')
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--forzar', action='store_true', help='Regenera aunque nada haya cambiado')
+    parser.add_argument('--pandoc', metavar='EXTENSION', help='Además convierte el Markdown con pandoc (p. ej. docx)')
+    args = parser.parse_args()
+
+    print("📑 GENERACIÓN DE REPORTES")
+    print("=" * 60)
+    pandoc = args.pandoc
+    if pandoc and shutil.which('pandoc') is None:
+        print("⚠️  pandoc no está instalado: se omite la conversión")
+        pandoc = None
+
+    inicio = time.perf_counter()
+    motor = MotorEncuestas.desde_archivo(args.datos)
+    formatos = tuple(f.strip() for f in args.formatos.split(',') if f.strip() in FORMATOS)
+    manifiesto = generar_reportes(motor, cargar_ejecutivos(RUTA_EJECUTIVOS), args.destino, formatos,
+                                  args.procesos, args.forzar, pandoc)
+    segundos = time.perf_counter() - inicio
+
+    documentos = manifiesto['documentos']
+    regenerados = sum(d['regenerado'] for d in documentos)
+    por_tipo = Counter(d['tipo'] for d in documentos)
+    print(f"   • Documentos: {len(documentos)} ({por_tipo['ejecutivo']} ejecutivos, {por_tipo['agencia']} agencias)")
+    print(f"   • Regenerados: {regenerados} | Sin cambios: {len(documentos) - regenerados}")
+    print(f"   • Tiempo total: {segundos:.2f} s")
+    print(f"\n💾 Manifiesto: {Path(args.destino) / MANIFIESTO}")
+
+
+if __name__ == "__main__":
+    main()
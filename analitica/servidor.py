@@ -0,0 +1,211 @@
+# 📌 API HTTP local (asyncio) que sirve los indicadores desde el motor en memoria
+import argparse
+import asyncio
+import gzip
+import json
+from urllib.parse import parse_qs, urlsplit
+
+from .cache import CacheLRU, ConsultasMemoizadas
+from .datos import RUTA_DATOS
+from .impulsores import analizar_impulsores, tabla_dashboard
+from .motor import normalizar_filtros
+from .significancia import comparar_grupos
+
+PUERTO_POR_DEFECTO = 8787
+TAMANO_MINIMO_GZIP = 1024  # No vale la pena comprimir respuestas pequeñas
+TIEMPO_INACTIVO = 15  # Segundos que se mantiene abierta una conexión keep-alive
+MAXIMO_ENCABEZADOS = 100
+
+MENSAJES = {
+    200: 'OK',
+    204: 'No Content',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error',
+}
+
+
+class ServidorAnalitica:
+    """
+    Servidor HTTP/1.1 mínimo sobre `asyncio.start_server`.
+
+    El bucle de eventos solo lee y escribe sockets; el cálculo y la
+    compresión se delegan al pool de hilos del loop para que una consulta
+    pesada no bloquee a los demás clientes. El ETag es la huella del
+    dataset, así que un cliente con la versión vigente recibe 304 sin que
+    se recalcule nada.
+    """
+
+    def __init__(self, consultas):
+        self.consultas = consultas
+        self.rutas = {
+            '/kpis': lambda filtros, params: self.consultas.consultar('kpis', filtros),
+            '/distribution': lambda filtros, params: self.consultas.consultar(
+                'distribucion', filtros,
+                metrica=params.get('metrica', params.get('metric', 'satisfaccion_general'))),
+            '/cities': lambda filtros, params: self.consultas.consultar('ciudades', filtros),
+            '/trend': lambda filtros, params: self.consultas.consultar(
+                'tendencia', filtros, frecuencia=params.get('frecuencia', 'mes')),
+            '/executives': lambda filtros, params: self.consultas.consultar('ejecutivos', filtros),
+            '/technical-info': lambda filtros, params: self.consultas.motor.ficha_tecnica(),
+            '/significance': lambda filtros, params: comparar_grupos(
+                self.consultas.motor, params.get('dimension', 'SEGMENTO').upper(),
+                filtros=filtros).to_dict('records'),
+            '/drivers': lambda filtros, params: tabla_dashboard(
+                analizar_impulsores(self.consultas.motor)),
+            '/cache-stats': lambda filtros, params: self.consultas.estadisticas(),
+        }
+
+    @property
+    def etag(self):
+        """Versión ya cargada; no revisa el archivo, así que es seguro leerlo en el bucle."""
+        return f'W/"{self.consultas.version[:32]}"'
+
+    def resolver(self, ruta, params):
+        """Calcula la respuesta de una ruta (se ejecuta fuera del bucle de eventos)."""
+        filtros = normalizar_filtros(params)
+        return self.rutas[ruta](filtros, params)
+
+    async def atender(self, lector, escritor):
+        try:
+            while True:
+                try:
+                    linea = await asyncio.wait_for(lector.readline(), TIEMPO_INACTIVO)
+                except asyncio.TimeoutError:
+                    break
+                if not linea:
+                    break
+
+                partes = linea.decode('latin-1').split()
+                if len(partes) != 3:
+                    await self._enviar(escritor, 400, {'error': 'Solicitud mal formada'}, {})
+                    break
+                metodo, objetivo, version_http = partes
+
+                encabezados = {}
+                for _ in range(MAXIMO_ENCABEZADOS):
+                    linea = await lector.readline()
+                    if linea in (b'\r\n', b'\n', b''):
+                        break
+                    nombre, _, valor = linea.decode('latin-1').partition(':')
+                    encabezados[nombre.strip().lower()] = valor.strip()
+
+                mantener = (
+                    encabezados.get('connection', '').lower() != 'close'
+                    and version_http == 'HTTP/1.1'
+                )
+                await self._procesar(escritor, metodo, objetivo, encabezados)
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _procesar(self, escritor, metodo, objetivo, encabezados):
+        url = urlsplit(objetivo)
+        ruta = url.path.rstrip('/') or '/'
+        if ruta.startswith('/api/'):
+            ruta = ruta[4:]
+
+        if metodo == 'OPTIONS':
+            await self._enviar(escritor, 204, None, encabezados)
+            return
+        if metodo not in ('GET', 'HEAD'):
+            await self._enviar(escritor, 405, {'error': f'Método no permitido: {metodo}'}, encabezados)
+            return
+        if ruta not in self.rutas:
+            await self._enviar(escritor, 404, {'error': f'Ruta desconocida: {ruta}'}, encabezados)
+            return
+
+        # La revisión del archivo (y una posible recarga) corre en el pool: el ETag solo lee la versión
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.consultas.verificar)
+        if ruta != '/cache-stats' and self.etag in [
+                e.strip() for e in encabezados.get('if-none-match', '').split(',')]:
+            await self._enviar(escritor, 304, None, encabezados)
+            return
+
+        params = {clave: valores[-1] for clave, valores in parse_qs(url.query).items()}
+        try:
+            datos = await loop.run_in_executor(None, self.resolver, ruta, params)
+        except KeyError as error:
+            await self._enviar(escritor, 400, {'error': str(error).strip("'\"")}, encabezados)
+            return
+        except Exception as error:
+            await self._enviar(escritor, 500, {'error': str(error)}, encabezados)
+            return
+
+        await self._enviar(escritor, 200, datos, encabezados, solo_encabezados=metodo == 'HEAD')
+
+    async def _enviar(self, escritor, estado, datos, encabezados, solo_encabezados=False):
+        respuesta = {
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Allow-Methods': 'GET, HEAD, OPTIONS',
+            'Access-Control-Allow-Headers': 'If-None-Match',
+            'Access-Control-Expose-Headers': 'ETag',
+            'Vary': 'Accept-Encoding',
+        }
+        cuerpo = b''
+        if estado in (200, 304):
+            respuesta['ETag'] = self.etag
+            respuesta['Cache-Control'] = 'no-cache'
+        if datos is not None:
+            cuerpo = json.dumps(datos, ensure_ascii=False, default=_serializar).encode('utf-8')
+            respuesta['Content-Type'] = 'application/json; charset=utf-8'
+            if len(cuerpo) >= TAMANO_MINIMO_GZIP and 'gzip' in encabezados.get('accept-encoding', ''):
+                loop = asyncio.get_running_loop()
+                cuerpo = await loop.run_in_executor(None, gzip.compress, cuerpo, 6)
+                respuesta['Content-Encoding'] = 'gzip'
+        respuesta['Content-Length'] = str(len(cuerpo))
+
+        cabecera = f'HTTP/1.1 {estado} {MENSAJES[estado]}\r\n'
+        cabecera += ''.join(f'{k}: {v}\r\n' for k, v in respuesta.items()) + '\r\n'
+        escritor.write(cabecera.encode('latin-1'))
+        if cuerpo and not solo_encabezados:
+            escritor.write(cuerpo)
+        await escritor.drain()
+
+
+def _serializar(valor):
+    """Convierte escalares NumPy y fechas a tipos JSON."""
+    if hasattr(valor, 'item'):
+        return valor.item()
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    raise TypeError(f'No serializable: {type(valor).__name__}')
+
+
+async def servir(host='127.0.0.1', puerto=PUERTO_POR_DEFECTO, ruta_datos=RUTA_DATOS, cache=None):
+    consultas = ConsultasMemoizadas(ruta_datos, cache=cache)
+    motor = consultas.motor
+    servidor = ServidorAnalitica(consultas)
+    servidor_tcp = await asyncio.start_server(servidor.atender, host, puerto)
+    print("🚀 API DE ANALÍTICA INICIADA")
+    print(f"   • Dataset: {ruta_datos} ({motor.total:,} registros)")
+    print(f"   • Versión: {motor.version[:12]}")
+    print(f"   • Escuchando en: http://{host}:{puerto}/")
+    print(f"   • Rutas: {', '.join(servidor.rutas)}")
+    async with servidor_tcp:
+        await servidor_tcp.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API local de indicadores de la encuesta')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=PUERTO_POR_DEFECTO)
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--cache-entradas', type=int, default=512, help='Máximo de resultados memoizados')
+    parser.add_argument('--cache-mb', type=float, default=64, help='Presupuesto de memoria de la cache (MB)')
+    args = parser.parse_args()
+    cache = CacheLRU(args.cache_entradas, int(args.cache_mb * 1024 * 1024))
+    try:
+        asyncio.run(servir(args.host, args.puerto, args.datos, cache))
+    except KeyboardInterrupt:
+        print("\n🛑 Servidor detenido")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# 📌 Seudonimización en flujo: EMAIL, IP_ADDRESS, NOMBRE y CEDULA como hashes con clave
+import argparse
+import hashlib
+import os
+import secrets
+import statistics
+import time
+from collections import deque
+
+from .conciliacion import normalizar_nombre
+from .datos import RAIZ, RUTA_DATOS, cargar_encuestas
+from .ingesta import detectar_formato
+
+RUTA_ANALITICA = RAIZ / 'public' / 'datos-analitica.csv'
+RUTA_CLAVE = RAIZ / '.clave-seudonimos'
+VARIABLE_CLAVE = 'ANALITICA_CLAVE_SEUDONIMOS'
+
+TAMANO_LOTE = 50_000  # Filas por lote enviado a un proceso
+# Ningún análisis usa el nombre ni la IP (EMAIL y CEDULA sí, para deduplicar y cruzar olas):
+# por defecto se omiten en la copia analítica en vez de hashearse
+DESCARTAR = ('NOMBRE', 'IP_ADDRESS')
+BYTES_HASH = 8  # 16 caracteres hex: colisión ≈ n²/2^65, despreciable para cientos de miles de encuestados
+
+
+def _digitos(valor):
+    return ''.join(c for c in valor if c.isdigit())
+
+
+# Columna -> normalización previa al hash, para que variantes del mismo dato coincidan
+CAMPOS_PERSONALES = {
+    'EMAIL': lambda v: v.strip().lower(),
+    'CEDULA': _digitos,
+    'NOMBRE': normalizar_nombre,
+    'IP_ADDRESS': lambda v: v.strip(),
+}
+
+
+def obtener_clave(ruta=RUTA_CLAVE):
+    """
+    Clave secreta del hash: la variable de entorno ANALITICA_CLAVE_SEUDONIMOS
+    (hex) o, si no está, el archivo `.clave-seudonimos`, que se crea con 32
+    bytes aleatorios la primera vez. La misma clave produce los mismos
+    seudónimos entre olas, así que deduplicar y cruzar archivos sigue siendo
+    posible; sin ella no se pueden recalcular por fuerza bruta.
+    """
+    if os.environ.get(VARIABLE_CLAVE):
+        return bytes.fromhex(os.environ[VARIABLE_CLAVE])
+    if not ruta.exists():
+        ruta.write_text(secrets.token_hex(32), encoding='ascii')
+        os.chmod(ruta, 0o600)
+    return bytes.fromhex(ruta.read_text(encoding='ascii').strip())
+
+
+def seudonimo(valor, clave, campo):
+    """BLAKE2b con clave (MAC) del valor normalizado; `campo` separa dominios entre columnas."""
+    normalizado = CAMPOS_PERSONALES[campo](valor) if isinstance(valor, str) else ''
+    if not normalizado:
+        return ''
+    return hashlib.blake2b(normalizado.encode('utf-8'), digest_size=BYTES_HASH, key=clave,
+                           person=campo.encode('ascii')[:16]).hexdigest()
+
+
+def seudonimizar_lote(lote, clave):
+    """
+    Reemplaza las columnas personales de un lote (DataFrame de texto). Cada
+    columna se factoriza primero, así cada valor distinto se hashea una sola
+    vez y el resultado se expande con un `take` vectorizado.
+    """
+    import numpy as np
+    import pandas as pd
+
+    for campo in CAMPOS_PERSONALES:
+        if campo not in lote.columns:
+            continue
+        codigos, unicos = pd.factorize(lote[campo])
+        hashes = np.array([seudonimo(v, clave, campo) for v in unicos] + [''], dtype=object)
+        lote[campo] = hashes[codigos]  # El código -1 (vacío) toma el '' final
+    return lote
+
+
+def seudonimizar(origen=RUTA_DATOS, destino=RUTA_ANALITICA, procesos=None, tamano_lote=TAMANO_LOTE, clave=None,
+                 descartar=DESCARTAR):
+    """
+    Lee `origen` por lotes, los seudonimiza en un pool de procesos y escribe
+    `destino` en orden, con el mismo formato (BOM, separador, encabezados).
+    Las columnas de `descartar` se omiten por completo en vez de hashearse.
+    Como mucho hay 2 lotes por proceso en vuelo, así la memoria no crece con
+    el tamaño del archivo. Retorna las filas escritas.
+    """
+    import pandas as pd
+
+    clave = clave or obtener_clave()
+    formato = detectar_formato(origen)
+    procesos = procesos or os.cpu_count() or 1
+    lector = pd.read_csv(origen, sep=formato.separador, quotechar=formato.comillas,
+                         encoding='utf-8-sig' if formato.codificacion == 'utf-8' else formato.codificacion,
+                         dtype=str, keep_default_na=False, chunksize=tamano_lote)
+    filas = 0
+    temporal = destino.with_suffix('.tmp')
+    with open(temporal, 'w', encoding=formato.codificacion, newline='') as salida:
+        if formato.bom:
+            salida.write('\ufeff')
+
+        def escribir(lote, primero):
+            lote = lote.drop(columns=[c for c in descartar if c in lote.columns])
+            lote.to_csv(salida, sep=formato.separador, index=False, header=primero, lineterminator='\n')
+            return len(lote)
+
+        if procesos < 2:
+            for numero, lote in enumerate(lector):
+                filas += escribir(seudonimizar_lote(lote, clave), numero == 0)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+                pendientes = deque()
+                numero = 0
+                for lote in lector:
+                    pendientes.append(ejecutor.submit(seudonimizar_lote, lote, clave))
+                    if len(pendientes) >= 2 * procesos:
+                        filas += escribir(pendientes.popleft().result(), numero == 0)
+                        numero += 1
+                while pendientes:
+                    filas += escribir(pendientes.popleft().result(), numero == 0)
+                    numero += 1
+    os.replace(temporal, destino)  # El dashboard nunca ve un archivo a medio escribir
+    return filas
+
+
+def _tiempo_carga(ruta, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        cargar_encuestas(ruta)
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Copia analítica sin datos personales (hashes con clave)')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--destino', default=str(RUTA_ANALITICA))
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--lote', type=int, default=TAMANO_LOTE, help='Filas por lote')
+    parser.add_argument('--descartar', default=','.join(DESCARTAR),
+                        help="Columnas personales a omitir ('' para seudonimizarlas todas)")
+    args = parser.parse_args()
+
+    from pathlib import Path
+
+    print("🔒 SEUDONIMIZACIÓN DE DATOS PERSONALES")
+    print("=" * 60)
+    origen, destino = Path(args.datos), Path(args.destino)
+    inicio = time.perf_counter()
+    descartar = [c.strip().upper() for c in args.descartar.split(',') if c.strip().upper() in CAMPOS_PERSONALES]
+    filas = seudonimizar(origen, destino, args.procesos, args.lote, descartar=descartar)
+    print(f"   • Filas: {filas:,} en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    print(f"   • Columnas seudonimizadas: {', '.join(c for c in CAMPOS_PERSONALES if c not in descartar)}")
+
+    original, liviano = origen.stat().st_size, destino.stat().st_size
+    print(f"   • Tamaño: {original / 1024:,.0f} KB → {liviano / 1024:,.0f} KB "
+          f"(-{(1 - liviano / original) * 100:.1f}%)")
+    carga_original, carga_liviana = _tiempo_carga(origen), _tiempo_carga(destino)
+    print(f"   • Carga: {carga_original * 1000:.0f} ms → {carga_liviana * 1000:.0f} ms "
+          f"(-{(1 - carga_liviana / carga_original) * 100:.1f}%)")
+
+    # Los seudónimos deben conservar la deduplicación: mismos distintos que los valores normalizados
+    antes, despues = cargar_encuestas(origen), cargar_encuestas(destino)
+    for campo, normalizar in CAMPOS_PERSONALES.items():
+        if campo not in despues.columns:
+            print(f"   🗑️ {campo}: descartada")
+            continue
+        reales = {normalizar(str(v)) for v in antes[campo].dropna()} - {''}
+        seudonimos = set(despues[campo].dropna().astype(str)) - {''}
+        emoji = "✅" if len(reales) == len(seudonimos) else "⚠️"
+        print(f"   {emoji} {campo}: {len(reales):,} valores distintos → {len(seudonimos):,} seudónimos")
+    print(f"\n💾 Copia analítica guardada en: {destino}")
+
+
+if __name__ == "__main__":
+    main()
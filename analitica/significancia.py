@@ -0,0 +1,220 @@
+# 📌 Pruebas de significancia por lotes entre segmentos, ciudades y agencias
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from .cache import CacheLRU
+from .datos import METRICAS, RUTA_DATOS
+from .motor import MotorEncuestas
+
+MINIMO_RESPUESTAS = 5  # Grupos con menos respuestas no se comparan
+ALFA = 0.05
+
+# Resultados por versión del dataset; la medida es la memoria del DataFrame
+_CACHE = CacheLRU(max_entradas=64, medir=lambda df: int(df.memory_usage(deep=True).sum()))
+
+
+def erfc(x):
+    """
+    Función de error complementaria vectorizada (aproximación de Chebyshev,
+    error relativo < 1.2e-7), para no depender de SciPy.
+    """
+    x = np.asarray(x, dtype=float)
+    z = np.abs(x)
+    t = 1.0 / (1.0 + 0.5 * z)
+    polinomio = -z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (
+        0.09678418 + t * (-0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (
+            1.48851587 + t * (-0.82215223 + t * 0.17087277))))))))
+    resultado = t * np.exp(polinomio)
+    return np.where(x >= 0, resultado, 2.0 - resultado)
+
+
+def p_valor_chi2(estadistico, grados):
+    """
+    P-valor de la chi-cuadrado para 0-4 grados de libertad (tablas 2x5),
+    con las formas cerradas de la función de supervivencia.
+    """
+    x = np.maximum(np.asarray(estadistico, dtype=float), 0.0)
+    mitad = x / 2
+    raiz = np.sqrt(mitad)
+    exponencial = np.exp(-mitad)
+    return np.select(
+        [grados <= 0, grados == 1, grados == 2, grados == 3, grados == 4],
+        [
+            np.ones_like(x),
+            erfc(raiz),
+            exponencial,
+            erfc(raiz) + np.sqrt(2 * x / np.pi) * exponencial,
+            exponencial * (1 + mitad),
+        ],
+        default=np.nan,
+    )
+
+
+def chi_cuadrado_pares(a, b):
+    """
+    Prueba chi-cuadrado de independencia para muchas tablas 2xK a la vez.
+
+    `a` y `b` son matrices (pares x K) con los conteos por calificación de
+    cada grupo. Las columnas vacías en ambos grupos no suman grados de
+    libertad. Retorna `(chi2, grados, p, v_cramer)`.
+    """
+    a = a.astype(float)
+    b = b.astype(float)
+    columnas = a + b
+    n_a = a.sum(axis=1, keepdims=True)
+    n_b = b.sum(axis=1, keepdims=True)
+    n = n_a + n_b
+    with np.errstate(invalid='ignore', divide='ignore'):
+        esperado_a = n_a * columnas / n
+        esperado_b = n_b * columnas / n
+        aporte = np.where(esperado_a > 0, (a - esperado_a) ** 2 / esperado_a, 0.0)
+        aporte += np.where(esperado_b > 0, (b - esperado_b) ** 2 / esperado_b, 0.0)
+    chi2 = aporte.sum(axis=1)
+    grados = (columnas > 0).sum(axis=1) - 1
+    p = p_valor_chi2(chi2, grados)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        v_cramer = np.where(grados > 0, np.sqrt(chi2 / n[:, 0]), 0.0)
+    return chi2, grados, p, v_cramer
+
+
+def mann_whitney_pares(a, b):
+    """
+    Prueba U de Mann-Whitney (bilateral, aproximación normal con corrección
+    por empates y por continuidad) calculada directamente de los histogramas.
+
+    Con calificaciones 1-5 el rango medio de cada calificación sale de los
+    conteos acumulados, así que no hace falta ordenar respuestas. Retorna
+    `(u, z, p, r_biserial)`; r > 0 indica que `a` califica más alto.
+    """
+    a = a.astype(float)
+    b = b.astype(float)
+    c = a + b
+    n1 = a.sum(axis=1)
+    n2 = b.sum(axis=1)
+    n = n1 + n2
+    acumulado = np.cumsum(c, axis=1) - c
+    rangos = acumulado + (c + 1) / 2
+    u = (a * rangos).sum(axis=1) - n1 * (n1 + 1) / 2
+    media = n1 * n2 / 2
+    empates = (c ** 3 - c).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        varianza = n1 * n2 / 12 * ((n + 1) - empates / (n * (n - 1)))
+        z = (u - media - np.sign(u - media) * 0.5) / np.sqrt(varianza)
+        z = np.where(varianza > 0, z, 0.0)
+        r = np.where(n1 * n2 > 0, 2 * u / (n1 * n2) - 1, 0.0)
+    p = erfc(np.abs(z) / np.sqrt(2))
+    return u, z, p, r
+
+
+def benjamini_hochberg(p):
+    """P-valores ajustados (q-valores) de Benjamini-Hochberg, vectorizado."""
+    p = np.asarray(p, dtype=float)
+    m = len(p)
+    if m == 0:
+        return p
+    orden = np.argsort(p)
+    escalados = p[orden] * m / np.arange(1, m + 1)
+    ajustados = np.minimum.accumulate(escalados[::-1])[::-1]
+    q = np.empty(m)
+    q[orden] = np.minimum(ajustados, 1.0)
+    return q
+
+
+def comparar_grupos(motor, dimension='SEGMENTO', metricas=None, filtros=(), minimo=MINIMO_RESPUESTAS, alfa=ALFA):
+    """
+    Compara todos los pares de grupos de una dimensión en todas las métricas.
+
+    Corre chi-cuadrado sobre la distribución 1-5 y Mann-Whitney sobre las
+    calificaciones para cada métrica x par, en operaciones sobre arreglos
+    (pares x 5). La corrección de Benjamini-Hochberg se aplica a cada prueba
+    sobre la familia completa de la llamada. El resultado se cachea por
+    versión del dataset.
+    """
+    metricas = tuple(metricas or METRICAS)
+    llave = (motor.version, dimension, metricas, filtros, minimo, alfa)
+    encontrado, resultado = _CACHE.obtener(llave)
+    if encontrado:
+        return resultado
+
+    mascara = motor.mascara(filtros)
+    categorias = np.asarray(motor.categorias[dimension], dtype=object)
+    bloques = []
+    for metrica in metricas:
+        conteos = motor.conteos_por_grupo(metrica, dimension, mascara)[:, 1:]
+        totales = conteos.sum(axis=1)
+        elegibles = np.flatnonzero((totales >= minimo) & (categorias != ''))
+        if len(elegibles) < 2:
+            continue
+        i, j = np.triu_indices(len(elegibles), k=1)
+        i, j = elegibles[i], elegibles[j]
+        a, b = conteos[i], conteos[j]
+
+        chi2, grados, p_chi2, v_cramer = chi_cuadrado_pares(a, b)
+        u, z, p_mw, r = mann_whitney_pares(a, b)
+        escala = np.arange(1, 6)
+        bloques.append(pd.DataFrame({
+            'dimension': dimension,
+            'metrica': metrica,
+            'grupo_a': categorias[i],
+            'grupo_b': categorias[j],
+            'n_a': totales[i],
+            'n_b': totales[j],
+            'promedio_a': np.round(a @ escala / totales[i], 2),
+            'promedio_b': np.round(b @ escala / totales[j], 2),
+            'chi2': chi2,
+            'gl': grados,
+            'p_chi2': p_chi2,
+            'v_cramer': v_cramer,
+            'u': u,
+            'z': z,
+            'p_mann_whitney': p_mw,
+            'r_biserial': r,
+        }))
+
+    if bloques:
+        resultado = pd.concat(bloques, ignore_index=True)
+        resultado['q_chi2'] = benjamini_hochberg(resultado['p_chi2'].to_numpy())
+        resultado['q_mann_whitney'] = benjamini_hochberg(resultado['p_mann_whitney'].to_numpy())
+        resultado['significativo'] = (resultado['q_chi2'] < alfa) | (resultado['q_mann_whitney'] < alfa)
+    else:
+        resultado = pd.DataFrame(columns=[
+            'dimension', 'metrica', 'grupo_a', 'grupo_b', 'n_a', 'n_b', 'promedio_a', 'promedio_b',
+            'chi2', 'gl', 'p_chi2', 'v_cramer', 'u', 'z', 'p_mann_whitney', 'r_biserial',
+            'q_chi2', 'q_mann_whitney', 'significativo'])
+
+    _CACHE.guardar(llave, resultado)
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pruebas de significancia entre grupos')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--dimension', default='SEGMENTO',
+                        choices=['SEGMENTO', 'CIUDAD', 'AGENCIA', 'TIPO_EJECUTIVO', 'EJECUTIVO_FINAL'])
+    parser.add_argument('--minimo', type=int, default=MINIMO_RESPUESTAS)
+    parser.add_argument('--salida', help='Ruta CSV donde guardar todos los resultados')
+    args = parser.parse_args()
+
+    print(f"🧪 PRUEBAS DE SIGNIFICANCIA POR {args.dimension}")
+    print("=" * 60)
+    motor = MotorEncuestas.desde_archivo(args.datos)
+    resultado = comparar_grupos(motor, args.dimension, minimo=args.minimo)
+    print(f"   • Comparaciones realizadas: {len(resultado):,}")
+    print(f"   • Significativas (q < {ALFA}): {int(resultado['significativo'].sum()):,}")
+    print()
+
+    for fila in resultado.sort_values('q_mann_whitney').head(15).itertuples():
+        emoji = "✅" if fila.significativo else "≈"
+        print(f"   {emoji} {METRICAS[fila.metrica]}: {fila.grupo_a} ({fila.promedio_a:.2f}, n={fila.n_a}) "
+              f"vs {fila.grupo_b} ({fila.promedio_b:.2f}, n={fila.n_b}) | "
+              f"q χ²={fila.q_chi2:.4f} | q MW={fila.q_mann_whitney:.4f}")
+
+    if args.salida:
+        resultado.to_csv(args.salida, index=False, sep=';', encoding='utf-8')
+        print(f"\n💾 Resultados guardados en: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
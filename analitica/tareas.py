@@ -0,0 +1,403 @@
+# 📌 Planificador de tareas en grafo (DAG): pasos compartidos una sola vez y ramas en paralelo
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .datos import COLUMNAS, FORMATO_FECHA, METRICAS, RUTA_DATOS, huella_archivo
+from .ingesta import detectar_formato, leer_csv
+
+# Período de campo de la ficha técnica (15 de abril al 01 de junio de 2025)
+INICIO_CAMPO = '2025-04-15'
+FIN_CAMPO = '2025-06-01 23:59:59'
+
+
+class Tarea:
+    """Paso con nombre: `funcion(*resultados_de_entradas)` produce la salida `nombre`."""
+
+    def __init__(self, nombre, funcion, entradas=()):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.entradas = tuple(entradas)
+
+
+class GrafoTareas:
+    """
+    Grafo acíclico de tareas con entradas y salidas declaradas.
+
+    Cada tarea corre como máximo una vez por ejecución aunque muchas otras
+    dependan de ella, y todas las tareas cuyas entradas ya están listas se
+    envían juntas al pool de hilos.
+    """
+
+    def __init__(self):
+        self.tareas = {}
+
+    def agregar(self, nombre, funcion, entradas=()):
+        if nombre in self.tareas:
+            raise ValueError(f"Tarea duplicada: {nombre}")
+        self.tareas[nombre] = Tarea(nombre, funcion, entradas)
+        return self
+
+    def tarea(self, nombre, entradas=()):
+        """Decorador equivalente a `agregar`."""
+        def registrar(funcion):
+            self.agregar(nombre, funcion, entradas)
+            return funcion
+        return registrar
+
+    def necesarias(self, objetivos=None):
+        """
+        Tareas requeridas por `objetivos` (todas si es None) en orden
+        topológico; falla si falta una entrada o hay un ciclo.
+        """
+        objetivos = list(self.tareas) if objetivos is None else list(objetivos)
+        orden = []
+        estado = {}  # 1 = visitando, 2 = terminada
+
+        def visitar(nombre, camino):
+            if nombre not in self.tareas:
+                raise KeyError(f"Entrada desconocida: {nombre} (requerida por {camino[-1] if camino else '—'})")
+            if estado.get(nombre) == 2:
+                return
+            if estado.get(nombre) == 1:
+                raise ValueError(f"Ciclo de dependencias: {' -> '.join(camino + [nombre])}")
+            estado[nombre] = 1
+            for entrada in self.tareas[nombre].entradas:
+                visitar(entrada, camino + [nombre])
+            estado[nombre] = 2
+            orden.append(nombre)
+
+        for objetivo in objetivos:
+            visitar(objetivo, [])
+        return orden
+
+    def ejecutar(self, objetivos=None, hilos=None):
+        """
+        Corre las tareas necesarias y retorna una `Ejecucion` con resultados y tiempos.
+
+        Una tarea se envía al pool en cuanto terminan todas sus entradas; si
+        alguna falla se dejan de enviar tareas y se relanza el error.
+        """
+        orden = self.necesarias(objetivos)
+        pendientes = {n: set(self.tareas[n].entradas) for n in orden}
+        dependientes = {n: [] for n in orden}
+        for nombre in orden:
+            for entrada in self.tareas[nombre].entradas:
+                dependientes[entrada].append(nombre)
+
+        ejecucion = Ejecucion(self, orden)
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=hilos or min(8, (os.cpu_count() or 1) + 2)) as pool:
+            en_curso = {}
+
+            def enviar(nombre):
+                tarea = self.tareas[nombre]
+                argumentos = [ejecucion.resultados[e] for e in tarea.entradas]
+                en_curso[pool.submit(ejecucion.medir, tarea, argumentos, inicio)] = nombre
+
+            for nombre in orden:
+                if not pendientes[nombre]:
+                    enviar(nombre)
+            while en_curso:
+                listos, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    nombre = en_curso.pop(futuro)
+                    ejecucion.resultados[nombre] = futuro.result()
+                    for siguiente in dependientes[nombre]:
+                        pendientes[siguiente].discard(nombre)
+                        if not pendientes[siguiente]:
+                            enviar(siguiente)
+        ejecucion.total = time.perf_counter() - inicio
+        return ejecucion
+
+
+class Ejecucion:
+    """Resultados, tiempos y ruta crítica de una corrida del grafo."""
+
+    def __init__(self, grafo, orden):
+        self.grafo = grafo
+        self.orden = orden
+        self.resultados = {}
+        self.tiempos = {}  # nombre -> (inicio, fin, hilo) relativos al arranque
+        self.corridas = {}  # nombre -> veces ejecutada (siempre 1)
+        self.total = 0.0
+        self._candado = threading.Lock()
+
+    def medir(self, tarea, argumentos, origen):
+        inicio = time.perf_counter() - origen
+        resultado = tarea.funcion(*argumentos)
+        fin = time.perf_counter() - origen
+        with self._candado:
+            self.tiempos[tarea.nombre] = (inicio, fin, threading.current_thread().name)
+            self.corridas[tarea.nombre] = self.corridas.get(tarea.nombre, 0) + 1
+        return resultado
+
+    def duracion(self, nombre):
+        inicio, fin, _ = self.tiempos[nombre]
+        return fin - inicio
+
+    def ruta_critica(self):
+        """
+        Cadena de dependencias con mayor suma de duraciones: el piso del
+        tiempo total por más hilos que se agreguen. Retorna `(tareas, segundos)`.
+        """
+        costo = {}
+        previo = {}
+        for nombre in self.orden:
+            entradas = self.grafo.tareas[nombre].entradas
+            anterior = max(entradas, key=lambda e: costo[e], default=None)
+            costo[nombre] = self.duracion(nombre) + (costo[anterior] if anterior else 0.0)
+            previo[nombre] = anterior
+        if not costo:
+            return [], 0.0
+        actual = max(costo, key=costo.get)
+        total = costo[actual]
+        ruta = []
+        while actual is not None:
+            ruta.append(actual)
+            actual = previo[actual]
+        return ruta[::-1], total
+
+    def paralelismo(self):
+        """Suma de duraciones / tiempo de pared (1.0 = todo en serie)."""
+        trabajo = sum(self.duracion(n) for n in self.tiempos)
+        return trabajo / self.total if self.total else 0.0
+
+
+# ----------------------------------------------------------------------
+# Grafo de validación de métricas (reemplaza los pasos repetidos de los
+# scripts validar-*-claridad*: lectura, búsqueda de columna, conversión
+# numérica y separación por segmento)
+# ----------------------------------------------------------------------
+
+def _columna_metrica(metrica):
+    encabezados = {clave: encabezado for encabezado, clave in COLUMNAS.items()}
+
+    def buscar(tabla):
+        encabezado = encabezados[metrica]
+        if encabezado not in tabla.columns:
+            raise KeyError(f"No se encontró la columna de {METRICAS[metrica]}")
+        return encabezado
+    return buscar
+
+
+def _calificaciones(tabla, columna):
+    import pandas as pd
+
+    return pd.to_numeric(tabla[columna], errors='coerce')
+
+
+def _segmentos(tabla):
+    segmentos = tabla['SEGMENTO'].fillna('').astype(str).str.strip()
+    return {s: indices for s, indices in segmentos.groupby(segmentos).groups.items() if s}
+
+
+def _distribucion(valores):
+    import numpy as np
+
+    validos = valores.dropna()
+    en_rango = validos[(validos >= 1) & (validos <= 5) & (validos == validos.round())]
+    conteos = np.bincount(en_rango.astype(int), minlength=6)
+    return {
+        'registros': len(valores),
+        'respuestas': int(conteos[1:].sum()),
+        'fuera_de_rango': int(len(validos) - len(en_rango)),
+        'conteos': conteos,
+        'promedio': float(en_rango.mean()) if len(en_rango) else 0.0,
+    }
+
+
+def _por_segmento(valores, segmentos):
+    return {s: _distribucion(valores.loc[indices]) for s, indices in segmentos.items()}
+
+
+def _validar_metrica(metrica):
+    def validar(distribucion, por_segmento):
+        chequeos = []
+        respuestas = distribucion['respuestas']
+        chequeos.append((respuestas > 0, f"{respuestas:,} respuestas válidas"))
+        chequeos.append((distribucion['fuera_de_rango'] == 0,
+                         f"{distribucion['fuera_de_rango']} valores fuera de 1-5"))
+        porcentajes = distribucion['conteos'][1:] / max(respuestas, 1) * 100
+        chequeos.append((abs(porcentajes.sum() - 100) < 0.1 or respuestas == 0,
+                         f"distribución suma {porcentajes.sum():.1f}%"))
+        suma_segmentos = sum(d['respuestas'] for d in por_segmento.values())
+        chequeos.append((suma_segmentos == respuestas,
+                         f"segmentos suman {suma_segmentos:,} de {respuestas:,}"))
+        detalle = ' | '.join(f"{s}: {d['promedio']:.2f}" for s, d in sorted(por_segmento.items()))
+        return {
+            'nombre': METRICAS[metrica],
+            'ok': all(ok for ok, _ in chequeos),
+            'chequeos': chequeos,
+            'resumen': f"promedio {distribucion['promedio']:.2f} ({detalle})",
+        }
+    return validar
+
+
+def _fechas(tabla):
+    import pandas as pd
+
+    return pd.to_datetime(tabla['DATE_MODIFIED'], format=FORMATO_FECHA, errors='coerce')
+
+
+def _validar_fechas(fechas):
+    import pandas as pd
+
+    faltantes = int(fechas.isna().sum())
+    fuera = int(((fechas < pd.Timestamp(INICIO_CAMPO)) | (fechas > pd.Timestamp(FIN_CAMPO))).sum())
+    return {
+        'nombre': 'Período de campo',
+        'ok': faltantes == 0 and fuera == 0,
+        'chequeos': [
+            (faltantes == 0, f"{faltantes} fechas sin formato {FORMATO_FECHA}"),
+            (fuera == 0, f"{fuera} fechas fuera de {INICIO_CAMPO} a {FIN_CAMPO[:10]}"),
+        ],
+        'resumen': f"{fechas.min():%Y-%m-%d} a {fechas.max():%Y-%m-%d}",
+    }
+
+
+def _validar_copia(ruta):
+    """La copia seudonimizada que publica el dashboard debe tener las mismas filas que el crudo."""
+    def validar(tabla):
+        if not os.path.exists(ruta):
+            return {
+                'nombre': 'Copia analítica',
+                'ok': False,
+                'chequeos': [(False, f"falta {os.path.basename(ruta)}: python -m analitica.seudonimos")],
+                'resumen': 'sin copia publicable',
+            }
+        copia = leer_csv(ruta)
+        mismos_ids = copia['ID'].astype(str).tolist() == tabla['ID'].astype(str).tolist()
+        correos = copia['EMAIL'].astype(str).str.contains('@').sum() if 'EMAIL' in copia.columns else 0
+        chequeos = [
+            (len(copia) == len(tabla), f"{len(copia):,} filas de {len(tabla):,}"),
+            (mismos_ids, "mismos ID y en el mismo orden que el crudo" if mismos_ids
+             else "los ID no coinciden con el crudo: regenere con python -m analitica.seudonimos"),
+            (correos == 0, f"{correos} correos sin seudonimizar"),
+        ]
+        return {
+            'nombre': 'Copia analítica',
+            'ok': all(ok for ok, _ in chequeos),
+            'chequeos': chequeos,
+            'resumen': os.path.basename(ruta),
+        }
+    return validar
+
+
+def _validar_artefactos(rutas):
+    """Los artefactos binarios que carga el dashboard deben venir de esta versión del CSV."""
+    def validar(huella):
+        from .artefacto import huella_origen
+
+        chequeos = []
+        for ruta in rutas:
+            origen = huella_origen(ruta)
+            if origen is None:
+                mensaje = f"{os.path.basename(ruta)} falta o tiene otro formato"
+            else:
+                mensaje = f"{os.path.basename(ruta)} generado desde {origen[:12]}, el CSV es {huella[:12]}"
+            chequeos.append((origen == huella, mensaje))
+        vigente = all(ok for ok, _ in chequeos)
+        return {
+            'nombre': 'Artefacto binario',
+            'ok': vigente,
+            'chequeos': chequeos,
+            'resumen': f"versión {huella[:12]}" if vigente else "desactualizado: python -m analitica.artefacto",
+        }
+    return validar
+
+
+def grafo_validacion(ruta=RUTA_DATOS, metricas=None, copia=None, artefactos=()):
+    """
+    Grafo de validación del dataset. Las tareas compartidas (formato,
+    tabla, segmentos) existen una sola vez; cada métrica agrega solo sus
+    propias tareas, así sumar una métrica nueva no repite trabajo. Con
+    `copia`, además verifica que la copia seudonimizada siga al crudo, y
+    con `artefactos`, que los binarios del dashboard salgan de este CSV.
+    """
+    grafo = GrafoTareas()
+    grafo.agregar('formato', lambda: detectar_formato(ruta))
+    grafo.agregar('tabla', lambda formato: leer_csv(ruta, formato=formato), ['formato'])
+    grafo.agregar('segmentos', _segmentos, ['tabla'])
+    grafo.agregar('fechas', _fechas, ['tabla'])
+    grafo.agregar('validacion:fechas', _validar_fechas, ['fechas'])
+
+    validaciones = ['validacion:fechas']
+    if copia is not None:
+        grafo.agregar('validacion:copia', _validar_copia(copia), ['tabla'])
+        validaciones.append('validacion:copia')
+    if artefactos:
+        grafo.agregar('huella', lambda: huella_archivo(ruta))
+        grafo.agregar('validacion:artefacto', _validar_artefactos(artefactos), ['huella'])
+        validaciones.append('validacion:artefacto')
+    for metrica in metricas or METRICAS:
+        grafo.agregar(f'columna:{metrica}', _columna_metrica(metrica), ['tabla'])
+        grafo.agregar(f'calificaciones:{metrica}', _calificaciones, ['tabla', f'columna:{metrica}'])
+        grafo.agregar(f'distribucion:{metrica}', _distribucion, [f'calificaciones:{metrica}'])
+        grafo.agregar(f'por_segmento:{metrica}', _por_segmento, [f'calificaciones:{metrica}', 'segmentos'])
+        grafo.agregar(f'validacion:{metrica}', _validar_metrica(metrica),
+                      [f'distribucion:{metrica}', f'por_segmento:{metrica}'])
+        validaciones.append(f'validacion:{metrica}')
+
+    grafo.agregar('resumen', lambda *resultados: list(resultados), validaciones)
+    return grafo
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validación del dataset como grafo de tareas')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--hilos', type=int, default=None)
+    parser.add_argument('--muestra', type=int, default=0, metavar='N',
+                        help='Chequeo rápido con N filas por segmento y ciudad; lee todo solo si alguna cota no alcanza')
+    args = parser.parse_args()
+
+    print("🕸️  VALIDACIÓN EN GRAFO DE TAREAS")
+    print("=" * 60)
+    if args.muestra > 0:
+        from .muestreo import evaluar_muestra
+
+        rapida = evaluar_muestra(args.datos, args.muestra)
+        print(f"🎯 Muestra estratificada: {rapida['muestra']:,} de {rapida['poblacion']:,} registros "
+              f"en {rapida['estratos']} estratos ({rapida['segundos'] * 1000:.0f} ms)")
+        if not rapida['motivos']:
+            print("✅ Todas las cotas dentro de los umbrales: no hace falta leer el archivo completo")
+            return 0
+        print("⚠️ Escalando a lectura completa:")
+        for motivo in rapida['motivos']:
+            print(f"   • {motivo}")
+        print()
+    from pathlib import Path
+
+    from .artefacto import RUTA_ARTEFACTO, RUTA_SUGERENCIAS
+    from .seudonimos import RUTA_ANALITICA
+
+    # Lo que se publica con el dashboard solo se compara contra el dataset por defecto
+    publicado = Path(args.datos).resolve() == RUTA_DATOS.resolve()
+    grafo = grafo_validacion(args.datos, copia=RUTA_ANALITICA if publicado else None,
+                             artefactos=(RUTA_ARTEFACTO, RUTA_SUGERENCIAS) if publicado else ())
+    ejecucion = grafo.ejecutar(['resumen'], hilos=args.hilos)
+
+    resultados = ejecucion.resultados['resumen']
+    for resultado in resultados:
+        emoji = "✅" if resultado['ok'] else "❌"
+        print(f"{emoji} {resultado['nombre']}: {resultado['resumen']}")
+        for ok, mensaje in resultado['chequeos']:
+            if not ok:
+                print(f"   ❌ {mensaje}")
+    print()
+
+    repetidas = [n for n, veces in ejecucion.corridas.items() if veces > 1]
+    ruta, critica = ejecucion.ruta_critica()
+    print("⏱️  EJECUCIÓN:")
+    print(f"   • Tareas: {len(ejecucion.orden)} (repetidas: {len(repetidas)})")
+    print(f"   • Tiempo total: {ejecucion.total * 1000:.1f} ms | paralelismo {ejecucion.paralelismo():.2f}x")
+    print(f"   • Ruta crítica ({critica * 1000:.1f} ms): {' → '.join(ruta)}")
+    for nombre in sorted(ejecucion.tiempos, key=ejecucion.duracion, reverse=True)[:5]:
+        print(f"      - {nombre}: {ejecucion.duracion(nombre) * 1000:.1f} ms")
+    return 0 if all(resultado['ok'] for resultado in resultados) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,293 @@
+# 📌 Temas de las sugerencias: vectores TF-IDF con hashing y k-means en mini-lotes incremental
+import argparse
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .datos import RAIZ, RUTA_DATOS, cargar_encuestas, huella_archivo, terminos
+from .tendencias import codigos_periodo
+
+RUTA_TEMAS = RAIZ / 'temas'
+VERSION_FORMATO = 2  # 2: sin no respuestas ('ninguna por el momento') en los términos
+
+DIMENSION_HASH = 1 << 14  # 16.384 columnas: colisiones raras para el vocabulario de las sugerencias
+TEMAS = 8
+TAMANO_LOTE = 256
+TERMINOS_ETIQUETA = 4
+SEMILLA = 7
+
+
+def _columna(termino):
+    return int.from_bytes(hashlib.blake2b(termino.encode('utf-8'), digest_size=4).digest(), 'little') % DIMENSION_HASH
+
+
+class ModeloTemas:
+    """
+    Agrupamiento en línea de sugerencias (k-means esférico en mini-lotes).
+
+    Cada sugerencia se vuelve un vector disperso con hashing de sus términos
+    (sin guardar vocabulario), ponderado por TF-IDF con frecuencias de
+    documento acumuladas, y normalizado a norma 1. Los centros se inicializan
+    con k-means++ sobre el primer lote; después cada lote se asigna al centro
+    de mayor coseno y cada centro se mueve a la media acumulada de lo que ha
+    absorbido (tasa 1/n, Sculley 2010). Absorber respuestas nuevas cuesta
+    O(lote) y no reentrena lo anterior. Para etiquetar, cada columna recuerda
+    el término más frecuente que cayó en ella.
+    """
+
+    def __init__(self, temas=TEMAS, semilla=SEMILLA):
+        self.temas = temas
+        self.azar = np.random.default_rng(semilla)
+        self.centros = None
+        self.absorbidos = np.zeros(temas, dtype=np.int64)
+        self.documentos = 0
+        self.frecuencia_documento = np.zeros(DIMENSION_HASH, dtype=np.int64)
+        self.nombres = {}  # columna -> {término: veces}
+
+    # ------------------------------------------------------------------
+    # Vectorización dispersa (formato CSR: punteros, columnas, valores)
+    # ------------------------------------------------------------------
+
+    def vectorizar(self, textos, actualizar_idf=True):
+        filas = []
+        for texto in textos:
+            conteo = {}
+            for termino in terminos(texto):
+                columna = _columna(termino)
+                conteo[columna] = conteo.get(columna, 0) + 1
+                nombres = self.nombres.setdefault(columna, {})
+                nombres[termino] = nombres.get(termino, 0) + 1
+            filas.append(conteo)
+        if actualizar_idf:
+            self.documentos += len(filas)
+            for conteo in filas:
+                self.frecuencia_documento[list(conteo)] += 1
+
+        punteros = np.zeros(len(filas) + 1, dtype=np.int64)
+        np.cumsum([len(c) for c in filas], out=punteros[1:])
+        columnas = np.fromiter((c for conteo in filas for c in conteo), dtype=np.int64, count=punteros[-1])
+        tf = np.fromiter((v for conteo in filas for v in conteo.values()), dtype=np.float64, count=punteros[-1])
+        idf = np.log((1 + self.documentos) / (1 + self.frecuencia_documento[columnas])) + 1
+        valores = (1 + np.log(tf)) * idf
+        filas_nnz = np.repeat(np.arange(len(filas)), np.diff(punteros))
+        normas = np.sqrt(np.bincount(filas_nnz, weights=valores ** 2, minlength=len(filas)))
+        valores /= np.where(normas > 0, normas, 1)[filas_nnz]
+        return punteros, columnas, valores
+
+    # ------------------------------------------------------------------
+    # Asignación y actualización
+    # ------------------------------------------------------------------
+
+    def _similitudes(self, punteros, columnas, valores):
+        """Coseno de cada documento contra cada centro: matriz (documentos x temas)."""
+        normas = np.linalg.norm(self.centros, axis=1)
+        centros = self.centros / np.where(normas > 0, normas, 1)[:, None]
+        documentos = len(punteros) - 1
+        if len(columnas) == 0:
+            return np.zeros((documentos, self.temas))
+        aportes = centros[:, columnas] * valores  # temas x nnz
+        resultado = np.zeros((self.temas, documentos))
+        con_datos = np.diff(punteros) > 0
+        resultado[:, con_datos] = np.add.reduceat(aportes, punteros[:-1][con_datos], axis=1)
+        return resultado.T
+
+    def _inicializar(self, punteros, columnas, valores):
+        """k-means++ con distancia coseno sobre el primer lote."""
+        documentos = len(punteros) - 1
+        densos = np.zeros((documentos, DIMENSION_HASH))
+        densos[np.repeat(np.arange(documentos), np.diff(punteros)), columnas] = valores
+        densos = densos[np.diff(punteros) > 0]  # las sugerencias vacías no sirven de semilla
+        documentos = len(densos)
+        elegidos = [int(self.azar.integers(documentos))]
+        distancia = 1 - densos @ densos[elegidos[0]]
+        while len(elegidos) < min(self.temas, documentos):
+            pesos = np.clip(distancia, 0, None) ** 2
+            total = pesos.sum()
+            siguiente = int(self.azar.choice(documentos, p=pesos / total)) if total > 0 else int(self.azar.integers(documentos))
+            elegidos.append(siguiente)
+            distancia = np.minimum(distancia, 1 - densos @ densos[siguiente])
+        self.centros = np.zeros((self.temas, DIMENSION_HASH))
+        self.centros[:len(elegidos)] = densos[elegidos]
+
+    def asignar(self, punteros, columnas, valores):
+        """Tema de cada documento (-1 si no tiene términos)."""
+        similitudes = self._similitudes(punteros, columnas, valores)
+        temas = similitudes.argmax(axis=1)
+        temas[np.diff(punteros) == 0] = -1
+        return temas
+
+    def _resembrar(self, punteros, columnas, valores, temas):
+        """Centros que siguen sin absorber nada se reubican en los documentos peor representados del lote."""
+        vacios = np.nonzero(self.absorbidos == 0)[0]
+        if len(vacios) == 0:
+            return
+        similitudes = self._similitudes(punteros, columnas, valores).max(axis=1)
+        candidatos = np.nonzero(temas >= 0)[0]
+        lejanos = candidatos[np.argsort(similitudes[candidatos], kind='stable')][:len(vacios)]
+        for tema, documento in zip(vacios, lejanos):
+            inicio, fin = punteros[documento], punteros[documento + 1]
+            self.centros[tema] = 0
+            self.centros[tema, columnas[inicio:fin]] = valores[inicio:fin]
+
+    def absorber(self, textos, tamano_lote=TAMANO_LOTE):
+        """Procesa textos nuevos en mini-lotes; retorna el tema asignado a cada uno."""
+        asignados = []
+        for inicio in range(0, len(textos), tamano_lote):
+            punteros, columnas, valores = self.vectorizar(textos[inicio:inicio + tamano_lote])
+            if self.centros is None:
+                if len(columnas) == 0:
+                    asignados.append(np.full(len(punteros) - 1, -1))
+                    continue
+                self._inicializar(punteros, columnas, valores)
+            temas = self.asignar(punteros, columnas, valores)
+
+            # Media acumulada por centro: c ← (n·c + Σx) / (n + m), equivalente a la tasa 1/n por muestra
+            filas_nnz = np.repeat(np.arange(len(temas)), np.diff(punteros))
+            sumas = np.zeros_like(self.centros)
+            validos = temas[filas_nnz] >= 0
+            np.add.at(sumas, (temas[filas_nnz][validos], columnas[validos]), valores[validos])
+            nuevos = np.bincount(temas[temas >= 0], minlength=self.temas)
+            total = self.absorbidos + nuevos
+            movidos = nuevos > 0
+            self.centros[movidos] = ((self.absorbidos[movidos, None] * self.centros[movidos] + sumas[movidos])
+                                     / total[movidos, None])
+            self.absorbidos = total
+            self._resembrar(punteros, columnas, valores, temas)
+            asignados.append(temas)
+        return np.concatenate(asignados) if asignados else np.zeros(0, dtype=np.int64)
+
+    def etiquetas(self, cantidad=TERMINOS_ETIQUETA):
+        """Los términos de mayor peso en cada centro, usando el término más frecuente de cada columna."""
+        resultado = []
+        for centro in (self.centros if self.centros is not None else []):
+            columnas = np.argsort(centro)[::-1]
+            palabras = []
+            for columna in columnas[:cantidad * 3]:
+                if centro[columna] <= 0 or len(palabras) == cantidad:
+                    break
+                nombres = self.nombres.get(int(columna))
+                if nombres:
+                    palabras.append(max(nombres, key=lambda t: (nombres[t], t)))
+            resultado.append(', '.join(palabras))
+        return resultado
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+
+    def guardar(self, ruta):
+        np.savez_compressed(ruta, centros=self.centros, absorbidos=self.absorbidos,
+                            frecuencia_documento=self.frecuencia_documento,
+                            estado=np.array(json.dumps({
+                                'temas': self.temas, 'documentos': self.documentos,
+                                'nombres': {str(c): n for c, n in self.nombres.items()},
+                                'azar': self.azar.bit_generator.state,
+                            })))
+
+    @classmethod
+    def cargar(cls, ruta):
+        with np.load(ruta) as archivo:
+            estado = json.loads(str(archivo['estado']))
+            modelo = cls(estado['temas'])
+            modelo.centros = archivo['centros']
+            modelo.absorbidos = archivo['absorbidos']
+            modelo.frecuencia_documento = archivo['frecuencia_documento']
+        modelo.documentos = estado['documentos']
+        modelo.nombres = {int(c): n for c, n in estado['nombres'].items()}
+        modelo.azar.bit_generator.state = estado['azar']
+        return modelo
+
+
+def temas_vigentes(ruta_datos=RUTA_DATOS, destino=RUTA_TEMAS, temas=TEMAS):
+    """
+    Asignaciones de tema por ID de respuesta, cacheadas por versión del dataset.
+
+    Si la huella de `datos.csv` coincide con la guardada se reutilizan tal
+    cual; si cambió, el modelo guardado absorbe solo las respuestas cuyo ID
+    no tenía asignación (las anteriores conservan su tema). Retorna
+    `(modelo, asignaciones, encuestas, nuevas)`.
+    """
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    ruta_modelo, ruta_asignaciones = destino / 'modelo.npz', destino / 'asignaciones.json'
+    huella = huella_archivo(ruta_datos)
+    encuestas = cargar_encuestas(ruta_datos)
+
+    modelo, asignaciones, version = None, {}, None
+    if ruta_modelo.exists() and ruta_asignaciones.exists():
+        guardado = json.loads(ruta_asignaciones.read_text(encoding='utf-8'))
+        if guardado.get('version_formato') == VERSION_FORMATO and guardado.get('temas') == temas:
+            modelo = ModeloTemas.cargar(ruta_modelo)
+            asignaciones, version = guardado['asignaciones'], guardado['version']
+    if version == huella:
+        return modelo, asignaciones, encuestas, 0
+
+    modelo = modelo or ModeloTemas(temas)
+    pendientes = encuestas[~encuestas['ID'].astype(str).isin(asignaciones.keys())]
+    asignados = modelo.absorber(pendientes['sugerencias'].tolist())
+    asignaciones.update(zip(pendientes['ID'].astype(str), asignados.tolist()))
+
+    modelo.guardar(ruta_modelo)
+    ruta_asignaciones.write_text(json.dumps({
+        'version_formato': VERSION_FORMATO, 'version': huella, 'temas': temas,
+        'etiquetas': modelo.etiquetas(), 'asignaciones': asignaciones,
+    }, ensure_ascii=False), encoding='utf-8')
+    return modelo, asignaciones, encuestas, len(pendientes)
+
+
+def tabla_temas(encuestas, asignaciones, etiquetas, dimension='SEGMENTO', frecuencia='mes'):
+    """Tabla larga: respuestas por tema x grupo de `dimension` x período, con su participación."""
+    import pandas as pd
+
+    tema = encuestas['ID'].astype(str).map(asignaciones).fillna(-1).astype(int)
+    codigos, periodos = codigos_periodo(encuestas['DATE_MODIFIED'].to_numpy(), frecuencia)
+    tabla = pd.DataFrame({
+        'tema': tema,
+        'etiqueta': [etiquetas[t] if t >= 0 else '' for t in tema],
+        'grupo': encuestas[dimension].to_numpy(),
+        'periodo': [periodos[c] if c >= 0 else '' for c in codigos],
+    })
+    tabla = tabla[tabla['tema'] >= 0]
+    conteos = tabla.groupby(['grupo', 'periodo', 'tema', 'etiqueta']).size().rename('respuestas').reset_index()
+    totales = conteos.groupby(['grupo', 'periodo'])['respuestas'].transform('sum')
+    conteos['participacion'] = (conteos['respuestas'] / totales * 100).round(1)
+    return conteos.sort_values(['grupo', 'periodo', 'respuestas'], ascending=[True, True, False], ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Temas principales de las sugerencias')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--temas', type=int, default=TEMAS)
+    parser.add_argument('--dimension', default='SEGMENTO')
+    parser.add_argument('--frecuencia', default='mes', choices=('dia', 'semana', 'mes'))
+    parser.add_argument('--salida', help='Ruta CSV con respuestas por tema, grupo y período')
+    args = parser.parse_args()
+
+    print("🧩 TEMAS DE LAS SUGERENCIAS")
+    print("=" * 60)
+    inicio = time.perf_counter()
+    modelo, asignaciones, encuestas, nuevas = temas_vigentes(args.datos, temas=args.temas)
+    print(f"   • Respuestas absorbidas ahora: {nuevas:,} ({(time.perf_counter() - inicio) * 1000:.0f} ms) "
+          f"| Con tema: {sum(1 for t in asignaciones.values() if t >= 0):,}")
+
+    etiquetas = modelo.etiquetas()
+    print("\n🏷️ TEMAS:")
+    for numero, etiqueta in enumerate(etiquetas):
+        print(f"   • Tema {numero} ({int(modelo.absorbidos[numero]):,}): {etiqueta}")
+
+    tabla = tabla_temas(encuestas, asignaciones, etiquetas, args.dimension, args.frecuencia)
+    print(f"\n📊 PRINCIPALES TEMAS POR {args.dimension} Y {args.frecuencia.upper()}:")
+    for (grupo, periodo), bloque in tabla.groupby(['grupo', 'periodo'], sort=True):
+        principales = ', '.join(f"{f.tema} ({f.participacion:.0f}%)" for f in bloque.head(3).itertuples())
+        print(f"   • {grupo} {periodo}: {principales} (n={bloque['respuestas'].sum():,})")
+
+    if args.salida:
+        tabla.to_csv(args.salida, index=False, sep=';', encoding='utf-8')
+        print(f"\n💾 Tabla guardada en: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# 📌 Motor de tendencias: promedios, top-box y respuestas por día/semana/mes
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from .datos import CALIFICACIONES, CAMPOS_TENDENCIA, METRICAS, RUTA_DATOS, cargar_encuestas
+
+FRECUENCIAS = ('dia', 'semana', 'mes')
+
+DIMENSIONES_TENDENCIA = ('SEGMENTO', 'CIUDAD')
+TOTAL = 'TOTAL'
+
+
+def codigos_periodo(fechas, frecuencia='mes'):
+    """
+    Asigna a cada fecha el código de su período y retorna `(codigos, etiquetas)`.
+
+    Las semanas empiezan el lunes y se etiquetan con la fecha de ese lunes.
+    Las fechas faltantes (NaT) reciben el código -1.
+    """
+    if frecuencia not in FRECUENCIAS:
+        raise KeyError(f"Frecuencia desconocida: {frecuencia}")
+    dias = np.asarray(fechas, dtype='datetime64[ns]').astype('datetime64[D]')
+    validas = ~np.isnat(dias)
+
+    if frecuencia == 'mes':
+        periodos = dias.astype('datetime64[M]')
+    elif frecuencia == 'semana':
+        # 1970-01-01 fue jueves: (días + 3) % 7 da 0 para los lunes
+        enteros = dias.astype(np.int64)
+        periodos = (enteros - (enteros + 3) % 7).astype('datetime64[D]')
+    else:
+        periodos = dias
+
+    codigos = np.full(len(dias), -1, dtype=np.int64)
+    unicos, inversos = np.unique(periodos[validas], return_inverse=True)
+    codigos[validas] = inversos
+    return codigos, [str(p) for p in unicos]
+
+
+def histograma_series(calificaciones, codigos_grupo, grupos, codigos_periodo_, periodos):
+    """
+    Histograma 0-5 de todas las métricas x grupos x períodos en un solo `bincount`.
+
+    `calificaciones` es una matriz (métricas x registros) int8. Retorna un
+    arreglo (métricas, grupos, períodos, 6). El costo es O(registros x métricas)
+    más el tamaño de la salida: no depende de cuántas series se generen.
+    """
+    metricas = calificaciones.shape[0]
+    validos = codigos_periodo_ >= 0
+    celda = (codigos_grupo[validos].astype(np.int64) * periodos + codigos_periodo_[validos]) * CALIFICACIONES
+    desplazamiento = np.arange(metricas, dtype=np.int64)[:, None] * (grupos * periodos * CALIFICACIONES)
+    llave = (desplazamiento + celda[None, :] + calificaciones[:, validos]).ravel()
+    planos = np.bincount(llave, minlength=metricas * grupos * periodos * CALIFICACIONES)
+    return planos.reshape(metricas, grupos, periodos, CALIFICACIONES)
+
+
+def calcular_tendencias(df, frecuencias=('dia', 'semana', 'mes'), dimensiones=DIMENSIONES_TENDENCIA):
+    """
+    Tabla larga (tidy) con una fila por frecuencia x dimensión x grupo x período x métrica.
+
+    Columnas: frecuencia, periodo, dimension, grupo, metrica, promedio,
+    top_box (% calificación 5), top2_box (% 4-5) y respuestas. La serie
+    consolidada aparece con dimension = grupo = 'TOTAL'. Solo se emiten
+    celdas con al menos una respuesta.
+    """
+    nombres = list(METRICAS)
+    calificaciones = np.vstack([df[m].fillna(0).to_numpy(dtype=np.int8) for m in nombres])
+    fechas = df['DATE_MODIFIED'].to_numpy()
+
+    agrupaciones = [(TOTAL, np.zeros(len(df), dtype=np.int64), [TOTAL])]
+    for dimension in dimensiones:
+        codigos, categorias = pd.factorize(df[dimension], sort=True)
+        agrupaciones.append((dimension, codigos.astype(np.int64), [str(c) for c in categorias]))
+
+    bloques = []
+    for frecuencia in frecuencias:
+        periodo, etiquetas = codigos_periodo(fechas, frecuencia)
+        for dimension, codigos, categorias in agrupaciones:
+            validos = codigos >= 0
+            hist = histograma_series(
+                calificaciones[:, validos], codigos[validos], len(categorias),
+                periodo[validos], len(etiquetas))
+
+            conteos = hist[..., 1:]
+            respuestas = conteos.sum(axis=-1)
+            m_idx, g_idx, p_idx = np.nonzero(respuestas)
+            if len(m_idx) == 0:
+                continue
+            celdas = conteos[m_idx, g_idx, p_idx]
+            n = respuestas[m_idx, g_idx, p_idx]
+            bloques.append(pd.DataFrame({
+                'frecuencia': frecuencia,
+                'periodo': np.asarray(etiquetas, dtype=object)[p_idx],
+                'dimension': dimension,
+                'grupo': np.asarray(categorias, dtype=object)[g_idx],
+                'metrica': np.asarray(nombres, dtype=object)[m_idx],
+                'promedio': np.round(celdas @ np.arange(1, CALIFICACIONES) / n, 2),
+                'top_box': np.round(celdas[:, 4] / n * 100, 1),
+                'top2_box': np.round(celdas[:, 3:].sum(axis=1) / n * 100, 1),
+                'respuestas': n.astype(np.int64),
+            }))
+
+    columnas = ['frecuencia', 'periodo', 'dimension', 'grupo', 'metrica',
+                'promedio', 'top_box', 'top2_box', 'respuestas']
+    if not bloques:
+        return pd.DataFrame(columns=columnas)
+    tabla = pd.concat(bloques, ignore_index=True)
+    return tabla.sort_values(['frecuencia', 'dimension', 'grupo', 'metrica', 'periodo'], ignore_index=True)
+
+
+def serie_grafica(tabla, frecuencia='mes', dimension=TOTAL, grupo=TOTAL):
+    """
+    Convierte una serie de la tabla larga al formato `MonthlyTrendData` que
+    consume `SatisfactionTrendChart` (month, satisfaction, loyalty, ...).
+    """
+    serie = tabla[(tabla['frecuencia'] == frecuencia)
+                  & (tabla['dimension'] == dimension)
+                  & (tabla['grupo'] == grupo)]
+    if serie.empty:
+        return []
+    ancha = serie.pivot(index='periodo', columns='metrica', values='promedio')
+    respuestas = serie.groupby('periodo')['respuestas'].max()
+    resultado = []
+    for periodo, fila in ancha.sort_index().iterrows():
+        punto = {'month': periodo}
+        punto.update({
+            campo: float(fila[m]) if pd.notna(fila.get(m)) else None
+            for m, campo in CAMPOS_TENDENCIA.items()
+        })
+        punto['responses'] = int(respuestas[periodo])
+        resultado.append(punto)
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tendencias por día, semana y mes')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--salida', help='Ruta CSV donde guardar la tabla larga')
+    args = parser.parse_args()
+
+    print("📈 MOTOR DE TENDENCIAS")
+    print("=" * 60)
+    df = cargar_encuestas(args.datos)
+    tabla = calcular_tendencias(df)
+    print(f"   • Registros: {len(df):,}")
+    print(f"   • Filas de la tabla larga: {len(tabla):,}")
+    for frecuencia in FRECUENCIAS:
+        series = tabla[tabla['frecuencia'] == frecuencia][['dimension', 'grupo']].drop_duplicates()
+        periodos = tabla[tabla['frecuencia'] == frecuencia]['periodo'].nunique()
+        print(f"   • {frecuencia}: {len(series)} series x {periodos} períodos")
+    print()
+
+    print("📅 TENDENCIA MENSUAL CONSOLIDADA:")
+    for punto in serie_grafica(tabla, 'mes'):
+        print(f"   • {punto['month']}: satisfacción {punto['satisfaction']:.2f} | "
+              f"lealtad {punto['loyalty']:.2f} | recomendación {punto['recommendation']:.2f} "
+              f"(n={punto['responses']:,})")
+
+    if args.salida:
+        tabla.to_csv(args.salida, index=False, sep=';', encoding='utf-8')
+        print(f"\n💾 Tabla guardada en: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+# 📌 KPIs en ventanas móviles (7/30/90 días): histogramas que suman lo que llega y restan lo que vence
+import argparse
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from .datos import CALIFICACIONES, METRICAS, RUTA_DATOS
+from .motor import MotorEncuestas
+
+VENTANAS = (7, 30, 90)
+DIMENSIONES_VENTANAS = ('SEGMENTO', 'AGENCIA')
+TOTAL = 'TOTAL'
+MINUTOS_DIA = 24 * 60
+ORDEN_METRICAS = tuple(METRICAS)
+INDICE_NPS = ORDEN_METRICAS.index('recomendacion')
+
+
+def minutos_epoch(fechas):
+    """Minutos desde 1970-01-01 como int64; -1 para fechas faltantes."""
+    minutos = np.asarray(fechas, dtype='datetime64[ns]').astype('datetime64[m]')
+    faltantes = np.isnat(minutos)
+    resultado = minutos.astype(np.int64)
+    resultado[faltantes] = -1
+    return resultado
+
+
+class VentanasMoviles:
+    """
+    Histogramas 0-5 por ventana x grupo x métrica, mantenidos por eventos.
+
+    Los eventos (respuestas) llegan en orden de DATE_MODIFIED y se guardan
+    en una bitácora; cada ventana tiene un puntero a la respuesta más antigua
+    que todavía cubre. Al llegar una respuesta se suma a los histogramas de
+    sus grupos (TOTAL y uno por dimensión) en todas las ventanas; al avanzar
+    el reloj, cada puntero recorre solo las respuestas que vencieron y las
+    resta. Cada respuesta entra y sale una vez por ventana, así que el costo
+    por evento es O(ventanas · dimensiones · métricas), sin depender de
+    cuántas respuestas tenga la ventana. Los KPIs salen del histograma en
+    O(6) por grupo.
+    """
+
+    def __init__(self, grupos, ventanas=VENTANAS):
+        self.grupos = list(grupos)  # [(dimension, valor)], el primero es (TOTAL, TOTAL)
+        self.indices = {grupo: i for i, grupo in enumerate(self.grupos)}
+        self.ventanas = tuple(ventanas)
+        self.anchos = {ventana: ventana * MINUTOS_DIA for ventana in self.ventanas}
+        self.histogramas = {
+            ventana: np.zeros((len(self.grupos), len(ORDEN_METRICAS), CALIFICACIONES), dtype=np.int64)
+            for ventana in self.ventanas
+        }
+        self.registros = {ventana: np.zeros(len(self.grupos), dtype=np.int64) for ventana in self.ventanas}
+        self.ahora = None
+        self._bitacora = []  # (minuto, índices de grupo, calificaciones)
+        self._punteros = {ventana: 0 for ventana in self.ventanas}
+        self._metricas = np.arange(len(ORDEN_METRICAS))
+
+    def _aplicar(self, ventana, evento, signo):
+        _, grupos, calificaciones = evento
+        self.histogramas[ventana][grupos[:, None], self._metricas, calificaciones] += signo
+        self.registros[ventana][grupos] += signo
+
+    def registrar(self, minuto, grupos, calificaciones):
+        """
+        Suma una respuesta. `grupos` son índices en `self.grupos` (distintos
+        entre sí) y `calificaciones` un arreglo 0-5 en el orden de METRICAS.
+        """
+        if self.ahora is not None and minuto < self.ahora:
+            raise ValueError("Las respuestas deben llegar en orden de fecha")
+        evento = (minuto, np.asarray(grupos, dtype=np.int64), np.asarray(calificaciones, dtype=np.int64))
+        self._bitacora.append(evento)
+        for ventana in self.ventanas:
+            self._aplicar(ventana, evento, 1)
+        self.avanzar(minuto)
+
+    def avanzar(self, minuto):
+        """Mueve el reloj a `minuto` y resta de cada ventana las respuestas que salen de ella."""
+        self.ahora = minuto if self.ahora is None else max(self.ahora, minuto)
+        for ventana in self.ventanas:
+            limite = self.ahora - self.anchos[ventana]
+            puntero = self._punteros[ventana]
+            while puntero < len(self._bitacora) and self._bitacora[puntero][0] <= limite:
+                self._aplicar(ventana, self._bitacora[puntero], -1)
+                puntero += 1
+            self._punteros[ventana] = puntero
+        self._compactar()
+
+    def _compactar(self):
+        """Descarta de la bitácora lo que ya venció en todas las ventanas (costo amortizado O(1))."""
+        vencidos = min(self._punteros.values())
+        if vencidos > 1024 and vencidos * 2 > len(self._bitacora):
+            del self._bitacora[:vencidos]
+            for ventana in self.ventanas:
+                self._punteros[ventana] -= vencidos
+
+    def en_ventana(self, ventana):
+        """Respuestas vigentes en la ventana."""
+        return len(self._bitacora) - self._punteros[ventana]
+
+    def kpis(self, ventana, grupo=(TOTAL, TOTAL), metrica='satisfaccion_general'):
+        """Respuestas, promedio, top-box y top-2-box de un grupo; NPS si la métrica es recomendación."""
+        fila = self.indices[grupo]
+        conteos = self.histogramas[ventana][fila, ORDEN_METRICAS.index(metrica)]
+        validos = conteos[1:]
+        respuestas = int(validos.sum())
+        resultado = {
+            'registros': int(self.registros[ventana][fila]),
+            'respuestas': respuestas,
+            'promedio': round(float(validos @ np.arange(1, CALIFICACIONES)) / respuestas, 2) if respuestas else 0,
+            'top_box': round(float(validos[4]) / respuestas * 100, 1) if respuestas else 0,
+            'top2_box': round(float(validos[3:].sum()) / respuestas * 100, 1) if respuestas else 0,
+        }
+        if metrica == 'recomendacion':
+            resultado['nps'] = self.nps(ventana, grupo)
+        return resultado
+
+    def nps(self, ventana, grupo=(TOTAL, TOTAL)):
+        """Igual que `calculateNPS()`: 5 promotor, 4 pasivo, el resto (incluido vacío) detractor, sobre los registros."""
+        fila = self.indices[grupo]
+        conteos = self.histogramas[ventana][fila, INDICE_NPS]
+        total = int(self.registros[ventana][fila])
+        if total == 0:
+            return 0
+        detractores = total - int(conteos[4]) - int(conteos[5])
+        return math.floor((int(conteos[5]) - detractores) / total * 100 + 0.5)  # Math.round de JavaScript
+
+    def tabla(self, minimo=1):
+        """Estado actual en formato largo: ventana x grupo x métrica, solo grupos con `minimo` registros."""
+        escala = np.arange(1, CALIFICACIONES)
+        bloques = []
+        for ventana in self.ventanas:
+            histograma = self.histogramas[ventana]
+            registros = self.registros[ventana]
+            presentes = np.flatnonzero(registros >= max(minimo, 1))
+            for m, metrica in enumerate(ORDEN_METRICAS):
+                validos = histograma[presentes, m, 1:]
+                respuestas = validos.sum(axis=1)
+                divisor = np.where(respuestas > 0, respuestas, 1)
+                bloque = pd.DataFrame({
+                    'ventana_dias': ventana,
+                    'dimension': [self.grupos[g][0] for g in presentes],
+                    'grupo': [self.grupos[g][1] for g in presentes],
+                    'metrica': metrica,
+                    'registros': registros[presentes],
+                    'respuestas': respuestas,
+                    'promedio': np.round(validos @ escala / divisor, 2),
+                    'top_box': np.round(validos[:, 4] / divisor * 100, 1),
+                    'top2_box': np.round(validos[:, 3:].sum(axis=1) / divisor * 100, 1),
+                })
+                if metrica == 'recomendacion':
+                    bloque['nps'] = [self.nps(ventana, self.grupos[g]) for g in presentes]
+                bloques.append(bloque)
+        return pd.concat(bloques, ignore_index=True) if bloques else pd.DataFrame()
+
+
+def eventos_desde_motor(motor, dimensiones=DIMENSIONES_VENTANAS):
+    """
+    Prepara la secuencia de eventos: grupos, minutos y calificaciones por
+    respuesta, ordenados por DATE_MODIFIED (estable). Las respuestas sin
+    fecha no caben en ninguna ventana y se dejan fuera. Retorna
+    `(grupos, orden, minutos, indices_grupo, calificaciones)`.
+    """
+    grupos = [(TOTAL, TOTAL)]
+    columnas = [np.zeros(motor.total, dtype=np.int64)]
+    for dimension in dimensiones:
+        desplazamiento = len(grupos)
+        grupos.extend((dimension, valor) for valor in motor.categorias[dimension])
+        columnas.append(motor.codigos[dimension].astype(np.int64) + desplazamiento)
+    indices_grupo = np.stack(columnas, axis=1)
+    calificaciones = np.stack([motor.calificaciones[m].astype(np.int64) for m in ORDEN_METRICAS], axis=1)
+    minutos = minutos_epoch(motor.df['DATE_MODIFIED'].to_numpy())
+    orden = np.flatnonzero(minutos >= 0)
+    orden = orden[np.argsort(minutos[orden], kind='stable')]
+    return grupos, orden, minutos, indices_grupo, calificaciones
+
+
+def reproducir(motor, dimensiones=DIMENSIONES_VENTANAS, ventanas=VENTANAS, hasta=None, al_cerrar_dia=None):
+    """
+    Alimenta las ventanas con todas las respuestas en orden y, si se pide,
+    llama `al_cerrar_dia(ventanas, dia)` al terminar cada día (para series
+    diarias). `hasta` (minutos epoch) es el corte: las respuestas posteriores
+    no se registran y al final el reloj se lleva hasta el corte, así sirve
+    tanto para una fecha pasada como para una posterior a la última respuesta.
+    """
+    grupos, orden, minutos, indices_grupo, calificaciones = eventos_desde_motor(motor, dimensiones)
+    ventanas_moviles = VentanasMoviles(grupos, ventanas)
+    dia_actual = None
+    for i in orden:
+        if hasta is not None and minutos[i] > hasta:
+            break
+        dia = int(minutos[i]) // MINUTOS_DIA
+        if al_cerrar_dia and dia_actual is not None and dia != dia_actual:
+            ventanas_moviles.avanzar((dia_actual + 1) * MINUTOS_DIA - 1)
+            al_cerrar_dia(ventanas_moviles, dia_actual)
+        dia_actual = dia
+        ventanas_moviles.registrar(int(minutos[i]), indices_grupo[i], calificaciones[i])
+    if al_cerrar_dia and dia_actual is not None:
+        ventanas_moviles.avanzar((dia_actual + 1) * MINUTOS_DIA - 1)
+        al_cerrar_dia(ventanas_moviles, dia_actual)
+    if hasta is not None:
+        ventanas_moviles.avanzar(hasta)
+    return ventanas_moviles
+
+
+def verificar(motor, ventanas_moviles, dimensiones=DIMENSIONES_VENTANAS, hasta=None):
+    """
+    Recalcula cada ventana desde cero filtrando por fecha hasta el corte
+    (`hasta`, o el reloj de las ventanas si no se da) y compara los
+    histogramas. Retorna la lista de (ventana, grupo) que difieren.
+    """
+    minutos = minutos_epoch(motor.df['DATE_MODIFIED'].to_numpy())
+    corte = ventanas_moviles.ahora if hasta is None else hasta
+    diferencias = []
+    if corte is None:
+        return diferencias
+    for ventana in ventanas_moviles.ventanas:
+        dentro = (minutos >= 0) & (minutos > corte - ventana * MINUTOS_DIA) & (minutos <= corte)
+        for fila, (dimension, valor) in enumerate(ventanas_moviles.grupos):
+            mascara = dentro if dimension == TOTAL else dentro & (
+                motor.codigos[dimension] == motor.categorias[dimension].index(valor))
+            esperado = np.stack([np.bincount(motor.calificaciones[m][mascara], minlength=CALIFICACIONES)
+                                 for m in ORDEN_METRICAS])
+            if not np.array_equal(esperado, ventanas_moviles.histogramas[ventana][fila]):
+                diferencias.append((ventana, dimension, valor))
+    return diferencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description='KPIs en ventanas móviles de 7/30/90 días por grupo')
+    parser.add_argument('--datos', default=str(RUTA_DATOS))
+    parser.add_argument('--ventanas', default=','.join(map(str, VENTANAS)), help='Días separados por coma')
+    parser.add_argument('--dimensiones', default=','.join(DIMENSIONES_VENTANAS))
+    parser.add_argument('--metrica', default='satisfaccion_general', choices=list(METRICAS))
+    parser.add_argument('--fecha', help='Corte YYYY-MM-DD (por defecto, la última respuesta)')
+    parser.add_argument('--minimo', type=int, default=5, help='Registros mínimos para mostrar un grupo')
+    parser.add_argument('--serie', action='store_true', help='Guardar en --salida el cierre de cada día, no solo el corte')
+    parser.add_argument('--verificar', action='store_true', help='Comparar contra el recálculo completo de cada ventana')
+    parser.add_argument('--salida', help='Ruta CSV con los KPIs por ventana, grupo y métrica')
+    args = parser.parse_args()
+
+    print("🪟 KPIs EN VENTANAS MÓVILES")
+    print("=" * 60)
+    motor = MotorEncuestas.desde_archivo(args.datos)
+    ventanas = tuple(int(v) for v in args.ventanas.split(',') if v.strip())
+    dimensiones = tuple(d.strip() for d in args.dimensiones.split(',') if d.strip())
+    hasta = None
+    if args.fecha:
+        hasta = int(minutos_epoch(np.array([pd.Timestamp(args.fecha) + pd.Timedelta(days=1)]))[0]) - 1
+
+    cierres = []
+
+    def al_cerrar_dia(estado, dia):
+        tabla = estado.tabla(minimo=1)
+        tabla.insert(0, 'fecha', str(np.datetime64(dia, 'D')))
+        cierres.append(tabla)
+
+    inicio = time.perf_counter()
+    estado = reproducir(motor, dimensiones, ventanas, hasta, al_cerrar_dia if args.serie else None)
+    segundos = time.perf_counter() - inicio
+    minutos = minutos_epoch(motor.df['DATE_MODIFIED'].to_numpy())
+    eventos = int(((minutos >= 0) & ((minutos <= hasta) if hasta is not None else True)).sum())
+    corte = np.datetime64(estado.ahora, 'm') if estado.ahora is not None else '—'
+    print(f"   • Respuestas con fecha: {eventos:,} | Corte: {corte} | {segundos * 1000:.0f} ms "
+          f"({segundos / max(eventos, 1) * 1e6:.1f} µs por respuesta, {len(ventanas)} ventanas)")
+
+    for ventana in ventanas:
+        total = estado.kpis(ventana, metrica=args.metrica)
+        nps = estado.nps(ventana)
+        print(f"\n📅 ÚLTIMOS {ventana} DÍAS ({estado.en_ventana(ventana):,} respuestas) - {METRICAS[args.metrica]}:")
+        print(f"   • TOTAL: promedio {total['promedio']:.2f} | top-box {total['top_box']:.1f}% | NPS {nps}")
+        tabla = estado.tabla(args.minimo)
+        tabla = tabla[(tabla['ventana_dias'] == ventana) & (tabla['metrica'] == args.metrica)
+                      & (tabla['dimension'] != TOTAL)]
+        tabla = tabla.sort_values(['dimension', 'promedio'], ascending=[True, False]).groupby('dimension').head(6)
+        for fila in tabla.itertuples():
+            print(f"   • {fila.dimension} {fila.grupo}: promedio {fila.promedio:.2f} | "
+                  f"top-box {fila.top_box:.1f}% (n={fila.respuestas})")
+
+    if args.verificar:
+        diferencias = verificar(motor, estado, dimensiones, hasta)
+        print()
+        if diferencias:
+            print(f"❌ {len(diferencias)} ventanas/grupos difieren del recálculo: {diferencias[:5]}")
+            return 1
+        else:
+            print("✅ Idéntico al recálculo completo en todas las ventanas y grupos")
+
+    if args.salida:
+        salida = pd.concat(cierres, ignore_index=True) if args.serie and cierres else estado.tabla(1)
+        salida.to_csv(args.salida, index=False, sep=';', encoding='utf-8')
+        print(f"\n💾 Tabla guardada en: {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,318 @@
+# 📌 Modo vigilancia: reejecuta solo los chequeos cuyas entradas cambiaron, en un proceso caliente
+import argparse
+import contextlib
+import io
+import os
+import re
+import runpy
+import sys
+import time
+from pathlib import Path
+
+from .datos import RAIZ, RUTA_DATOS
+
+PAQUETE = Path(__file__).resolve().parent
+
+INTERVALO = 0.1  # Segundos entre revisiones del disco
+ESPERA = 0.25  # Silencio requerido antes de correr (agrupa los eventos de un guardado)
+
+PATRONES_CHEQUEOS = ('validar-*.py', 'validacion-*.py')
+EXCLUIDOS = {'validar-arranque.py'}  # Mide arranque en procesos nuevos; no tiene sentido en caliente
+
+# Rutas mencionadas en el código de un script: 'data/datos.csv', "src/index.css", ...
+PATRON_RUTA = re.compile(r"""['"]((?:public|src|data)/[^'"\n]+)['"]""")
+
+
+def entradas_declaradas(script):
+    """
+    Archivos del proyecto que el código del script menciona (estimación
+    estática). Se incluyen aunque no existan, para que crearlos dispare el chequeo.
+    """
+    texto = Path(script).read_text(encoding='utf-8', errors='ignore')
+    entradas = {Path(script).resolve()}
+    entradas.update((RAIZ / ruta).resolve() for ruta in PATRON_RUTA.findall(texto))
+    return entradas
+
+
+class RegistroLecturas:
+    """
+    Registra los archivos del proyecto que se abren para lectura mientras está
+    activo, usando un audit hook (`sys.addaudithook`, evento 'open').
+
+    Así las dependencias de cada chequeo se aprenden de lo que realmente lee
+    en cada corrida, no solo de lo que su código menciona.
+    """
+
+    _activo = None
+    _instalado = False
+
+    @classmethod
+    def _gancho(cls, evento, argumentos):
+        registro = cls._activo
+        if registro is None or evento != 'open':
+            return
+        ruta, modo, banderas = argumentos
+        if isinstance(ruta, int):
+            return
+        if modo is not None:
+            if any(c in str(modo) for c in 'wax+'):
+                return
+        elif banderas & (os.O_WRONLY | os.O_RDWR):
+            return
+        try:
+            completa = Path(os.fsdecode(ruta)).resolve()
+        except (TypeError, ValueError, OSError):
+            return
+        # El código de `analitica` ya está cargado: editarlo requiere reiniciar la vigilancia
+        if completa.is_relative_to(RAIZ) and not completa.is_relative_to(PAQUETE) \
+                and '__pycache__' not in completa.parts:
+            registro.add(completa)
+
+    @classmethod
+    def anotar(cls, ruta):
+        """Registra una lectura que no pasó por `open` (p. ej. servida desde memoria)."""
+        if cls._activo is not None:
+            cls._activo.add(Path(ruta).resolve())
+
+    @classmethod
+    @contextlib.contextmanager
+    def capturar(cls):
+        if not cls._instalado:
+            sys.addaudithook(cls._gancho)
+            cls._instalado = True
+        leidos = set()
+        anterior, cls._activo = cls._activo, leidos
+        try:
+            yield leidos
+        finally:
+            cls._activo = anterior
+
+
+class Chequeo:
+    """Un chequeo ejecutable en el proceso caliente con sus archivos de entrada."""
+
+    def __init__(self, nombre, ejecutar, entradas):
+        self.nombre = nombre
+        self.ejecutar = ejecutar
+        self.entradas = set(entradas)
+        self.ultimo_estado = None
+        self.ultima_duracion = 0.0
+
+    def correr(self):
+        """
+        Ejecuta el chequeo capturando su salida; retorna `(ok, salida)`.
+        Las entradas se amplían con lo que la corrida abrió realmente.
+        """
+        salida = io.StringIO()
+        inicio = time.perf_counter()
+        ok = True
+        with RegistroLecturas.capturar() as leidos, contextlib.redirect_stdout(salida):
+            try:
+                resultado = self.ejecutar()
+                ok = resultado is not False
+            except SystemExit as error:
+                ok = error.code in (0, None)
+            except Exception as error:  # Un chequeo roto no debe tumbar la vigilancia
+                print(f"❌ ERROR: {error}")
+                ok = False
+        self.entradas |= leidos
+        self.ultima_duracion = time.perf_counter() - inicio
+        self.ultimo_estado = ok
+        return ok, salida.getvalue()
+
+
+class CacheCSV:
+    """
+    Tablas ya leídas por los chequeos, para no volver a parsear el CSV en cada corrida.
+
+    Mientras está activa, `pd.read_csv` sobre un archivo del proyecto se
+    responde desde memoria si la firma (mtime, tamaño) del archivo y los
+    argumentos de la llamada coinciden con una lectura anterior; cada
+    chequeo recibe una copia, así lo que modifique no afecta a los demás.
+    Lecturas por bloques, de buffers o de fuera del proyecto pasan directo
+    a pandas.
+    """
+
+    def __init__(self):
+        self._tablas = {}  # (ruta, argumentos) -> (firma, DataFrame)
+        self.aciertos = 0
+
+    @contextlib.contextmanager
+    def activa(self):
+        import pandas as pd
+
+        original = pd.read_csv
+
+        def leer_csv(ruta, *args, **kwargs):
+            if args or not isinstance(ruta, (str, os.PathLike)) or kwargs.get('chunksize') or kwargs.get('iterator'):
+                return original(ruta, *args, **kwargs)
+            completa = Path(ruta).resolve()
+            if not completa.is_relative_to(RAIZ):
+                return original(ruta, **kwargs)
+            llave = (completa, repr(sorted(kwargs.items())))
+            firma = _firma(completa)  # Antes de leer: si cambia durante la lectura, la próxima vez no coincide
+            guardada = self._tablas.get(llave)
+            if guardada is not None and guardada[0] == firma:
+                self.aciertos += 1
+                RegistroLecturas.anotar(completa)
+                return guardada[1].copy()
+            tabla = original(ruta, **kwargs)
+            self._tablas[llave] = (firma, tabla.copy())
+            return tabla
+
+        pd.read_csv = leer_csv
+        try:
+            yield self
+        finally:
+            pd.read_csv = original
+
+
+def _script(ruta, cache):
+    def ejecutar():
+        with cache.activa():
+            return runpy.run_path(str(ruta), run_name='__main__')
+    return ejecutar
+
+
+class Vigilante:
+    """
+    Mantiene un proceso caliente con pandas y el motor ya cargados y corre
+    solo los chequeos afectados por cada cambio en disco. Los scripts leen
+    los CSV a través de `CacheCSV`: mientras el archivo no cambie, reciben
+    el DataFrame ya parseado.
+
+    Los cambios se detectan por (mtime, tamaño) de cada entrada vigilada; los
+    eventos que llegan juntos (un guardado suele tocar el archivo varias
+    veces) se agrupan hasta que pasan `espera` segundos sin cambios.
+    """
+
+    def __init__(self, raiz=RAIZ, intervalo=INTERVALO, espera=ESPERA, verboso=False):
+        self.raiz = Path(raiz)
+        self.intervalo = intervalo
+        self.espera = espera
+        self.verboso = verboso
+        self.cache = CacheCSV()
+        self.chequeos = self._descubrir()
+        self._motor = None
+        self._firmas = {}
+
+    def _descubrir(self):
+        chequeos = []
+        for patron in PATRONES_CHEQUEOS:
+            for ruta in sorted(self.raiz.glob(patron)):
+                if ruta.name in EXCLUIDOS:
+                    continue
+                try:
+                    compile(ruta.read_text(encoding='utf-8'), str(ruta), 'exec')
+                except SyntaxError:
+                    continue  # Algunos validar-*.py son en realidad JavaScript
+                chequeos.append(Chequeo(ruta.name, _script(ruta, self.cache), entradas_declaradas(ruta)))
+        chequeos.append(Chequeo('indicadores (motor)', self._indicadores, {RUTA_DATOS.resolve()}))
+        return chequeos
+
+    def _indicadores(self):
+        """KPIs consolidados desde el motor en memoria; se recarga solo si cambió el CSV."""
+        from .motor import MotorEncuestas
+
+        firma = _firma(RUTA_DATOS)
+        if self._motor is None or self._motor[0] != firma:
+            self._motor = (firma, MotorEncuestas.desde_archivo(RUTA_DATOS))
+        for fila in self._motor[1].kpis():
+            consolidado = fila['consolidado']
+            print(f"   • {fila['metric']}: {consolidado['average']:.2f} (n={consolidado['total']:,})")
+
+    def vigiladas(self):
+        return set().union(*(c.entradas for c in self.chequeos))
+
+    def _tomar_firmas(self):
+        return {ruta: _firma(ruta) for ruta in self.vigiladas()}
+
+    def afectados(self, cambiados):
+        return [c for c in self.chequeos if c.entradas & cambiados]
+
+    def correr(self, chequeos):
+        inicio = time.perf_counter()
+        aciertos = self.cache.aciertos
+        for chequeo in chequeos:
+            ok, salida = chequeo.correr()
+            emoji = "✅" if ok else "❌"
+            print(f"   {emoji} {chequeo.nombre} ({chequeo.ultima_duracion * 1000:.0f} ms)")
+            if self.verboso or not ok:
+                for linea in salida.rstrip().splitlines()[-15:]:
+                    print(f"      {linea}")
+        print(f"   ⏱️  {len(chequeos)} chequeo(s) en {(time.perf_counter() - inicio) * 1000:.0f} ms "
+              f"| CSV servidos desde memoria: {self.cache.aciertos - aciertos}")
+        # Las corridas pueden descubrir entradas nuevas: se agregan a la vigilancia
+        self._firmas.update({r: _firma(r) for r in self.vigiladas() - self._firmas.keys()})
+
+    def revisar(self):
+        """Retorna el conjunto de entradas cuya firma cambió desde la última revisión."""
+        actuales = self._tomar_firmas()
+        cambiados = {r for r, firma in actuales.items() if self._firmas.get(r) != firma}
+        self._firmas = actuales
+        return cambiados
+
+    def vigilar(self, inicial=True):
+        os.chdir(self.raiz)  # Los scripts usan rutas relativas a la raíz
+        self._firmas = self._tomar_firmas()
+        if inicial:
+            print(f"🔄 Corrida inicial ({len(self.chequeos)} chequeos)")
+            self.correr(self.chequeos)
+        print(f"👀 Vigilando {len(self._firmas)} archivos (Ctrl+C para salir)")
+
+        pendientes = set()
+        ultimo_evento = 0.0
+        try:
+            while True:
+                time.sleep(self.intervalo)
+                cambiados = self.revisar()
+                if cambiados:
+                    pendientes |= cambiados
+                    ultimo_evento = time.monotonic()
+                    continue
+                if pendientes and time.monotonic() - ultimo_evento >= self.espera:
+                    afectados = self.afectados(pendientes)
+                    nombres = ', '.join(sorted(str(r.relative_to(self.raiz)) for r in pendientes))
+                    print(f"\n📝 Cambió: {nombres}")
+                    if afectados:
+                        self.correr(afectados)
+                    else:
+                        print("   • Ningún chequeo depende de estos archivos")
+                    pendientes.clear()
+        except KeyboardInterrupt:
+            print("\n👋 Vigilancia detenida")
+
+
+def _firma(ruta):
+    try:
+        estado = os.stat(ruta)
+    except OSError:
+        return None
+    return estado.st_mtime_ns, estado.st_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reejecuta los chequeos afectados por cada cambio')
+    parser.add_argument('--intervalo', type=float, default=INTERVALO)
+    parser.add_argument('--espera', type=float, default=ESPERA)
+    parser.add_argument('--sin-inicial', action='store_true', help='No correr todo al arrancar')
+    parser.add_argument('--una-vez', action='store_true', help='Corre todo una vez, muestra las dependencias y sale')
+    parser.add_argument('--verboso', action='store_true', help='Muestra la salida de cada chequeo')
+    args = parser.parse_args()
+
+    print("👀 MODO VIGILANCIA")
+    print("=" * 60)
+    vigilante = Vigilante(intervalo=args.intervalo, espera=args.espera, verboso=args.verboso)
+    if args.una_vez:
+        os.chdir(vigilante.raiz)
+        vigilante.correr(vigilante.chequeos)
+        print("\n📂 DEPENDENCIAS:")
+        for chequeo in vigilante.chequeos:
+            entradas = sorted(str(r.relative_to(vigilante.raiz)) for r in chequeo.entradas)
+            print(f"   • {chequeo.nombre}: {', '.join(entradas)}")
+        return
+    vigilante.vigilar(inicial=not args.sin_inicial)
+
+
+if __name__ == "__main__":
+    main()
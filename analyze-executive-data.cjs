@@ -6,7 +6,7 @@ console.log('================================================================');
 
 // Leer archivo de ejecutivos para analizar
 const executivesFile = path.join(__dirname, 'public', 'ejecutivos para analizar.csv');
-const dataFile = path.join(__dirname, 'public', 'datos.csv');
+const dataFile = path.join(__dirname, 'data', 'datos.csv');
 
 function parseCSV(content, delimiter = ';') {
   const lines = content.split('\n').filter(line => line.trim());
@@ -17,7 +17,7 @@ async function testCSVFiles() {
     
     try {
         // Test datos.csv
-        const response1 = await fetch('/Medicion-del-Servicio/datos.csv');
+        const response1 = await fetch('/Medicion-del-Servicio/datos-analitica.csv');
         console.log(`📊 datos.csv: ${response1.status} ${response1.statusText}`);
         if (response1.ok) {
             const text1 = await response1.text();
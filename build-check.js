@@ -4,7 +4,7 @@ console.log('🚀 Building Medición del Servicio for Vercel...');
 
 // Verificar que los archivos críticos existen
 const criticalFiles = [
-  'public/datos.csv',
+  'public/datos-analitica.csv',
   'public/ejecutivos para analizar.csv',
   'src/main.tsx',
   'index.html'
@@ -36,7 +36,7 @@ const fs = require("fs");
 const path = require("path");
 
 const criticalFiles = [
-  "public/datos.csv",
+  "public/datos-analitica.csv",
   "public/ejecutivos para analizar.csv",
   "src/main.tsx",
   "index.html",
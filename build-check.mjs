@@ -1,10 +1,13 @@
-import { existsSync } from "fs";
+import { createHash } from "crypto";
+import { existsSync, readFileSync } from "fs";
 
 console.log("🚀 Building Medición del Servicio for Vercel...");
 
 // Verificar que los archivos críticos existen
 const criticalFiles = [
-  "public/datos.csv",
+  "public/datos-analitica.csv",
+  "public/datos.bin",
+  "public/datos-sugerencias.bin",
   "public/ejecutivos para analizar.csv",
   "src/main.tsx",
   "index.html",
@@ -21,10 +24,38 @@ criticalFiles.forEach((file) => {
   }
 });
 
+// El CSV crudo (EMAIL, CEDULA, NOMBRE, IP_ADDRESS) vive en data/: todo lo de public/ se publica
+const forbiddenFiles = ["public/datos.csv"];
+
+forbiddenFiles.forEach((file) => {
+  if (existsSync(file)) {
+    console.error(`❌ ${file} contains personal data and must not be published`);
+    allFilesExist = false;
+  }
+});
+
+// Los artefactos binarios llevan en la cabecera (bytes 24-55) el SHA-256 del CSV de origen:
+// si data/datos.csv cambió y no se regeneraron, loadData() serviría datos viejos
+const SOURCE_CSV = "data/datos.csv";
+const artifacts = ["public/datos.bin", "public/datos-sugerencias.bin"];
+
+if (existsSync(SOURCE_CSV)) {
+  const sourceHash = createHash("sha256").update(readFileSync(SOURCE_CSV)).digest("hex");
+  artifacts.filter(existsSync).forEach((file) => {
+    const artifactHash = readFileSync(file).subarray(24, 56).toString("hex");
+    if (artifactHash === sourceHash) {
+      console.log(`✅ ${file} matches ${SOURCE_CSV}`);
+    } else {
+      console.error(`❌ ${file} is stale: run python -m analitica.artefacto`);
+      allFilesExist = false;
+    }
+  });
+}
+
 if (allFilesExist) {
   console.log("✅ All critical files are present");
   console.log("🏗️  Ready for Vite build...");
 } else {
-  console.error("❌ Some critical files are missing");
+  console.error("❌ Some critical files are missing or stale");
   process.exit(1);
 }
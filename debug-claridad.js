@@ -1,7 +1,7 @@
 import fs from 'fs';
 
 // Leer el archivo CSV
-const csvContent = fs.readFileSync('public/datos.csv', 'utf8');
+const csvContent = fs.readFileSync('data/datos.csv', 'utf8');
 const lines = csvContent.split('\n');
 const headers = lines[0].split(';');
 
@@ -37,7 +37,7 @@ function debugearValoresEjeY() {
   console.log("🔍 DEBUG: Verificando valores específicos del eje Y");
   console.log("=".repeat(60));
   
-  const datos = leerCSV('public/datos.csv');
+  const datos = leerCSV('data/datos.csv');
   if (datos.length === 0) {
     console.log("❌ No se pudieron cargar los datos");
     return false;
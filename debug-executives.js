@@ -8,7 +8,7 @@ console.log('================================');
 let dataExecutives = [];
 
 // Simular la carga de datos
-fetch('/Medicion-del-Servicio/datos.csv')
+fetch('/Medicion-del-Servicio/datos-analitica.csv')
   .then(response => response.text())
   .then(csvText => {
     const dataLines = csvText.split('\n');
@@ -6,7 +6,7 @@ async function debugFiltersIssue() {
   
   try {
     // Leer archivo de datos principal
-    const dataPath = './public/datos.csv';
+    const dataPath = './data/datos.csv';
     const dataContent = fs.readFileSync(dataPath, 'utf8');
     
     // Leer archivo de ejecutivos para analizar
@@ -3,7 +3,7 @@ import Papa from 'papaparse';
 import fs from 'fs';
 
 // Leer el archivo CSV
-const csvContent = fs.readFileSync('./public/datos.csv', 'utf-8');
+const csvContent = fs.readFileSync('./data/datos.csv', 'utf-8');
 
 // Parsear el CSV
 const parsed = Papa.parse(csvContent, {
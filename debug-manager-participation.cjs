@@ -27,7 +27,7 @@ function readCSV(filePath) {
 
 // Leer ambos archivos
 console.log('📂 Leyendo archivos CSV...');
-const datosPath = './public/datos.csv';
+const datosPath = './data/datos.csv';
 const ejecutivosPath = './public/ejecutivos para analizar.csv';
 
 const datos = readCSV(datosPath);
@@ -1,7 +1,7 @@
 import fs from 'fs';
 
 // Simular exactamente la lógica del dataService
-const csvContent = fs.readFileSync('public/datos.csv', 'utf8');
+const csvContent = fs.readFileSync('data/datos.csv', 'utf8');
 const lines = csvContent.trim().split('\n');
 const headers = lines[0].split(';');
 
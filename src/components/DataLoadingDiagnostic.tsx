@@ -34,7 +34,7 @@ const DataLoadingDiagnostic: React.FC = () => {
       let csvAccessible = false;
       let csvContent = '';
       try {
-        const csvPath = '/datos.csv';
+        const csvPath = '/datos-analitica.csv';
         const response = await fetch(csvPath);
         csvAccessible = response.ok;
         if (csvAccessible) {
@@ -317,7 +317,7 @@ const DataLoadingDiagnostic: React.FC = () => {
           <h2 className="text-xl font-semibold text-blue-800 mb-4">💡 Recomendaciones</h2>
           <div className="space-y-2 text-blue-700">
             {!diagnosticInfo.csvAccessible && (
-              <p>• Verificar que el archivo datos.csv esté en la carpeta public/</p>
+              <p>• Verificar que public/datos-analitica.csv exista (python -m analitica.seudonimos)</p>
             )}
             {!diagnosticInfo.isDataLoaded && diagnosticInfo.csvAccessible && (
               <p>• El CSV es accesible pero los datos no se han cargado. Verificar el proceso de parsing.</p>
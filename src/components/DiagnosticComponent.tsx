@@ -74,7 +74,7 @@ const DiagnosticComponent: React.FC = () => {
       try {
         const isVercel = typeof window !== 'undefined' && window.location.hostname.includes('vercel.app');
         const isDevelopment = import.meta.env.DEV;
-        const csvPath = isVercel || isDevelopment ? '/datos.csv' : '/Medicion-del-Servicio/datos.csv';
+        const csvPath = isVercel || isDevelopment ? '/datos-analitica.csv' : '/Medicion-del-Servicio/datos-analitica.csv';
         
         const response = await fetch(csvPath, { method: 'HEAD' });
         diagnostic.csvAccessStatus = {
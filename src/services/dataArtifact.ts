@@ -0,0 +1,124 @@
+// Decodificador del artefacto binario generado por `python -m analitica.artefacto`.
+// Formato (little-endian): cabecera de 56 bytes con magia 'CSAT', versión, banderas,
+// filas, columnas, CRC-32 de la carga útil y SHA-256 del CSV de origen; luego una sección
+// por columna alineada a 4 bytes.
+
+const MAGIC = 'CSAT';
+const SUPPORTED_VERSION = 2;
+const HEADER_SIZE = 56;
+const MISSING_DATE = 0xffffffff;
+
+export const FLAG_SUGGESTIONS = 1;
+
+const ColumnType = {
+  Rating: 1,
+  Category: 2,
+  Date: 3,
+  Text: 4,
+} as const;
+
+export interface DecodedArtifact {
+  flags: number;
+  source: string; // SHA-256 (hex) del CSV con el que se generó
+  rows: Record<string, string | number | null>[];
+}
+
+let crcTable: Uint32Array | null = null;
+
+function crc32(bytes: Uint8Array): number {
+  if (!crcTable) {
+    crcTable = new Uint32Array(256);
+    for (let n = 0; n < 256; n++) {
+      let c = n;
+      for (let k = 0; k < 8; k++) c = c & 1 ? 0xedb88320 ^ (c >>> 1) : c >>> 1;
+      crcTable[n] = c >>> 0;
+    }
+  }
+  let crc = 0xffffffff;
+  for (let i = 0; i < bytes.length; i++) crc = crcTable[(crc ^ bytes[i]) & 0xff] ^ (crc >>> 8);
+  return (crc ^ 0xffffffff) >>> 0;
+}
+
+const align = (offset: number) => offset + ((4 - (offset % 4)) % 4);
+const pad = (value: number) => String(value).padStart(2, '0');
+
+// Mismo formato que trae el CSV: dd/mm/yyyy HH:MM (los minutos se guardan sin zona horaria)
+function formatMinutes(minutes: number): string {
+  if (minutes === MISSING_DATE) return '';
+  const date = new Date(minutes * 60000);
+  return `${pad(date.getUTCDate())}/${pad(date.getUTCMonth() + 1)}/${date.getUTCFullYear()} ` +
+    `${pad(date.getUTCHours())}:${pad(date.getUTCMinutes())}`;
+}
+
+function readStrings(view: DataView, bytes: Uint8Array, offset: number, decoder: TextDecoder): [string[], number] {
+  const count = view.getUint32(offset, true);
+  const offsets = new Uint32Array(bytes.buffer, bytes.byteOffset + offset + 4, count + 1);
+  const start = offset + 4 + 4 * (count + 1);
+  const strings = new Array<string>(count);
+  for (let i = 0; i < count; i++) {
+    strings[i] = decoder.decode(bytes.subarray(start + offsets[i], start + offsets[i + 1]));
+  }
+  return [strings, align(start + offsets[count])];
+}
+
+/**
+ * Decodifica el artefacto a filas con los mismos campos que produce Papa.parse
+ * sobre el CSV (calificaciones numéricas o null, fechas como texto), para que
+ * pasen por la misma validación y limpieza en dataService.
+ */
+export function decodeSurveyArtifact(buffer: ArrayBuffer): DecodedArtifact {
+  const header = new DataView(buffer, 0, HEADER_SIZE);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== MAGIC) throw new Error('Invalid survey artifact');
+  const version = header.getUint16(4, true);
+  if (version !== SUPPORTED_VERSION) throw new Error(`Unsupported survey artifact version: ${version}`);
+  const flags = header.getUint16(6, true);
+  const rowCount = header.getUint32(8, true);
+  const columnCount = header.getUint16(12, true);
+  const payloadLength = header.getUint32(16, true);
+  const checksum = header.getUint32(20, true);
+  const source = Array.from(new Uint8Array(buffer, 24, 32), (b) => b.toString(16).padStart(2, '0')).join('');
+
+  const payload = new Uint8Array(buffer, HEADER_SIZE, payloadLength);
+  if (payload.length !== payloadLength || crc32(payload) !== checksum) {
+    throw new Error('Corrupted survey artifact: checksum mismatch');
+  }
+
+  const view = new DataView(buffer, HEADER_SIZE, payloadLength);
+  const decoder = new TextDecoder('utf-8');
+  const rows: Record<string, string | number | null>[] = Array.from({ length: rowCount }, () => ({}));
+  let offset = 0;
+
+  for (let c = 0; c < columnCount; c++) {
+    const nameLength = view.getUint8(offset);
+    const type = view.getUint8(offset + 1);
+    const name = decoder.decode(payload.subarray(offset + 2, offset + 2 + nameLength));
+    offset = align(offset + 2 + nameLength);
+
+    if (type === ColumnType.Rating) {
+      const ratings = new Int8Array(buffer, HEADER_SIZE + offset, rowCount);
+      for (let i = 0; i < rowCount; i++) rows[i][name] = ratings[i] === 0 ? null : ratings[i];
+      offset = align(offset + rowCount);
+    } else if (type === ColumnType.Date) {
+      const minutes = new Uint32Array(buffer, HEADER_SIZE + offset, rowCount);
+      for (let i = 0; i < rowCount; i++) rows[i][name] = formatMinutes(minutes[i]);
+      offset += 4 * rowCount;
+    } else if (type === ColumnType.Category) {
+      const [strings, next] = readStrings(view, payload, offset, decoder);
+      const width = view.getUint32(next, true);
+      const codes = width === 1
+        ? new Uint8Array(buffer, HEADER_SIZE + next + 4, rowCount)
+        : new Uint16Array(buffer, HEADER_SIZE + next + 4, rowCount);
+      for (let i = 0; i < rowCount; i++) rows[i][name] = strings[codes[i]];
+      offset = align(next + 4 + width * rowCount);
+    } else if (type === ColumnType.Text) {
+      const [strings, next] = readStrings(view, payload, offset, decoder);
+      for (let i = 0; i < rowCount; i++) rows[i][name] = strings[i];
+      offset = next;
+    } else {
+      throw new Error(`Unknown survey artifact column type: ${type}`);
+    }
+  }
+
+  return { flags, source, rows };
+}
@@ -1,10 +1,13 @@
 import Papa from 'papaparse';
 import { SatisfactionRecord, KPIData, GeographicData, SuggestionData, EnhancedSuggestionData, TechnicalInfo, NPSData, ChartDataPoint, MonthlyTrendData, DepartmentPerformanceData } from '../types';
 import { aiAnalysisService } from './aiAnalysisService';
+import { decodeSurveyArtifact, FLAG_SUGGESTIONS } from './dataArtifact';
 
 export class SatisfactionDataService {
   private data: SatisfactionRecord[] = [];
   private isLoaded = false;
+  // Resultado de getKPIData() para el dataset cargado; se invalida al recargar
+  private kpiCache: KPIData[] | null = null;
 
   // Configuración de logging basada en el entorno
   private isDev = typeof import.meta !== 'undefined' && (import.meta as any).env && (import.meta as any).env.MODE === 'development';
@@ -31,67 +34,27 @@ export class SatisfactionDataService {
       // Determinar la ruta base según el entorno
       const isVercel = typeof window !== 'undefined' && window.location.hostname.includes('vercel.app');
       const isDevelopment = import.meta.env.DEV;
-      const csvPath = isVercel || isDevelopment ? '/datos.csv' : '/Medicion-del-Servicio/datos.csv';
+      const basePath = isVercel || isDevelopment ? '/' : '/Medicion-del-Servicio/';
       
-      const response = await fetch(csvPath);
-      
-      if (!response.ok) throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-      
-      const csvText = await response.text();
-      this.log('✅ DataService: CSV file fetched. Length:', csvText.length);
-
-      // Mapeo de headers del CSV a propiedades del objeto
-      const headerMapping: Record<string, string> = {
-        'En general   ¿La información suministrada en nuestros canales de atención fue clara y fácil de comprender?': 'claridad_informacion',
-        '¿Qué tan probable es que usted le recomiende Coltefinanciera a sus colegas   familiares o amigos?': 'recomendacion',
-        'En general   ¿Qué tan satisfecho se encuentra con los servicios que le ofrece Coltefinanciera?': 'satisfaccion_general',
-        'Asumiendo que otra entidad financiera le ofreciera al mismo precio los mismos productos y servicios que usted tiene actualmente con Coltefinanciera   ¿Qué tan probable es que usted continúe siendo cliente de Coltefinanciera?': 'lealtad',
-        '¿Tiene alguna recomendación o sugerencia acerca del servicio que le ofrecemos en Coltefinanciera?': 'sugerencias',
-        'TIPO EJECUTIVO': 'TIPO_EJECUTIVO',
-      };
-
-      const parsed = Papa.parse(csvText, {
-        header: true,
-        delimiter: ';',
-        skipEmptyLines: true,
-        transformHeader: (header: string) => {
-          const trimmedHeader = header.trim();
-          const mappedHeader = headerMapping[trimmedHeader] || trimmedHeader;
-          
-          if (this.isDev && headerMapping[trimmedHeader]) {
-            this.log('🔄 Header mapped:', trimmedHeader, '->', mappedHeader);
-          }
-          
-          return mappedHeader;
-        },
-        transform: (value: string, field: string) => {
-          if (['claridad_informacion', 'recomendacion', 'satisfaccion_general', 'lealtad'].includes(field)) {
-            const num = parseFloat(value);
-            return isNaN(num) ? null : num;
-          }
-          return value;
-        }
-      });
+      // El artefacto binario (python -m analitica.artefacto) pesa una fracción del CSV y no requiere parseo
+      const rows = (await this.loadArtifactRows(basePath)) ?? (await this.loadCsvRows(basePath));
 
-      if (parsed.errors.length > 0) {
-        this.logError('❌ DataService: CSV parsing errors:', parsed.errors);
-      }
-
-      this.log('📋 DataService: Parsed headers:', Object.keys(parsed.data[0] || {}));
-      this.log('📊 DataService: Total parsed rows:', parsed.data.length);
+      this.log('📋 DataService: Parsed headers:', Object.keys(rows[0] || {}));
+      this.log('📊 DataService: Total parsed rows:', rows.length);
 
       // Filtrar registros válidos con mejor validación
-      this.data = (parsed.data as any[])
+      this.data = rows
         .filter(row => this.isValidRecord(row))
         .map(row => this.sanitizeRecord(row));
+      this.kpiCache = null;
 
       if (this.data.length > 0) {
-        this.log('✅ DataService: Loaded', this.data.length, 'valid records from', parsed.data.length, 'total rows');
+        this.log('✅ DataService: Loaded', this.data.length, 'valid records from', rows.length, 'total rows');
         this.log('📄 DataService: First record example:', this.data[0]);
         this.log('📊 DataService: Available fields:', Object.keys(this.data[0]));
         this.isLoaded = true;
       } else {
-        this.logError('⚠️ DataService: No valid records found. Sample row:', parsed.data[0]);
+        this.logError('⚠️ DataService: No valid records found. Sample row:', rows[0]);
         throw new Error('No valid data records found in CSV file');
       }
 
@@ -102,6 +65,82 @@ export class SatisfactionDataService {
     }
   }
 
+  private async loadArtifactRows(basePath: string): Promise<any[] | null> {
+    try {
+      const response = await fetch(`${basePath}datos.bin`);
+      if (!response.ok || (response.headers.get('content-type') || '').includes('text/html')) return null;
+
+      const { flags, source, rows } = decodeSurveyArtifact(await response.arrayBuffer());
+      if (flags & FLAG_SUGGESTIONS) {
+        const suggestions = await fetch(`${basePath}datos-sugerencias.bin`);
+        if (suggestions.ok) {
+          const { source: textsSource, rows: texts } = decodeSurveyArtifact(await suggestions.arrayBuffer());
+          // Las filas se emparejan por posición: solo si ambos blobs salen del mismo CSV
+          if (textsSource === source) {
+            texts.forEach((text, i) => {
+              if (rows[i]) rows[i].sugerencias = text.sugerencias;
+            });
+          } else {
+            this.logError('⚠️ DataService: datos-sugerencias.bin comes from another dataset, skipping it:', textsSource.slice(0, 12));
+          }
+        }
+      }
+      this.log('✅ DataService: Binary artifact decoded. Rows:', rows.length, 'Source:', source.slice(0, 12));
+      return rows;
+    } catch (error) {
+      this.logError('⚠️ DataService: Binary artifact unavailable, falling back to CSV:', error);
+      return null;
+    }
+  }
+
+  private async loadCsvRows(basePath: string): Promise<any[]> {
+    // Solo la copia seudonimizada (python -m analitica.seudonimos): el CSV crudo no se publica
+    const response = await fetch(`${basePath}datos-analitica.csv`);
+    if (!response.ok) throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+    
+    const csvText = await response.text();
+    this.log('✅ DataService: CSV file fetched. Length:', csvText.length);
+
+    // Mapeo de headers del CSV a propiedades del objeto
+    const headerMapping: Record<string, string> = {
+      'En general   ¿La información suministrada en nuestros canales de atención fue clara y fácil de comprender?': 'claridad_informacion',
+      '¿Qué tan probable es que usted le recomiende Coltefinanciera a sus colegas   familiares o amigos?': 'recomendacion',
+      'En general   ¿Qué tan satisfecho se encuentra con los servicios que le ofrece Coltefinanciera?': 'satisfaccion_general',
+      'Asumiendo que otra entidad financiera le ofreciera al mismo precio los mismos productos y servicios que usted tiene actualmente con Coltefinanciera   ¿Qué tan probable es que usted continúe siendo cliente de Coltefinanciera?': 'lealtad',
+      '¿Tiene alguna recomendación o sugerencia acerca del servicio que le ofrecemos en Coltefinanciera?': 'sugerencias',
+      'TIPO EJECUTIVO': 'TIPO_EJECUTIVO',
+    };
+
+    const parsed = Papa.parse(csvText, {
+      header: true,
+      delimiter: ';',
+      skipEmptyLines: true,
+      transformHeader: (header: string) => {
+        const trimmedHeader = header.trim();
+        const mappedHeader = headerMapping[trimmedHeader] || trimmedHeader;
+        
+        if (this.isDev && headerMapping[trimmedHeader]) {
+          this.log('🔄 Header mapped:', trimmedHeader, '->', mappedHeader);
+        }
+        
+        return mappedHeader;
+      },
+      transform: (value: string, field: string) => {
+        if (['claridad_informacion', 'recomendacion', 'satisfaccion_general', 'lealtad'].includes(field)) {
+          const num = parseFloat(value);
+          return isNaN(num) ? null : num;
+        }
+        return value;
+      }
+    });
+
+    if (parsed.errors.length > 0) {
+      this.logError('❌ DataService: CSV parsing errors:', parsed.errors);
+    }
+
+    return parsed.data as any[];
+  }
+
   private isValidRecord(row: any): boolean {
     if (!row || typeof row !== 'object') return false;
     
@@ -180,6 +219,11 @@ export class SatisfactionDataService {
       return [];
     }
 
+    if (this.kpiCache) {
+      this.log('📊 getKPIData: Returning memoized KPI results');
+      return this.kpiCache;
+    }
+
     const metrics = [
       { key: 'claridad_informacion', name: 'Claridad de Información' },
       { key: 'recomendacion', name: 'Recomendación (NPS)' },
@@ -246,6 +290,7 @@ export class SatisfactionDataService {
     })));
     
     this.log('📊 getKPIData: Generated KPI results:', result.map(r => r.metric));
+    this.kpiCache = result;
     return result;
   }
 
@@ -4,7 +4,7 @@ const Papa = require('papaparse');
 console.log('🧪 Testing filter functionality...\n');
 
 // Leer datos principales
-const mainDataPath = 'public/datos.csv';
+const mainDataPath = 'data/datos.csv';
 const executivesDataPath = 'public/ejecutivos para analizar.csv';
 
 if (!fs.existsSync(mainDataPath)) {
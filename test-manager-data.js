@@ -3,7 +3,7 @@ import fs from 'fs';
 import Papa from 'papaparse';
 
 // Leer el archivo CSV
-const csvContent = fs.readFileSync('public/datos.csv', 'utf8');
+const csvContent = fs.readFileSync('data/datos.csv', 'utf8');
 
 // Parsear el CSV
 const parsed = Papa.parse(csvContent, {
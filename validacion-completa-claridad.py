@@ -17,7 +17,7 @@ def main():
     print("-" * 40)
     
     # Verificar archivo CSV
-    csv_path = 'public/datos.csv'
+    csv_path = 'data/datos.csv'
     if not os.path.exists(csv_path):
         print(f"❌ ERROR: No se encontró {csv_path}")
         return False
@@ -19,7 +19,7 @@ const filesToCheck = [
   'src/components/TechnicalSpecsPage.tsx',
   'src/components/NavigationSidebar.tsx',
   'src/services/dataService.ts',
-  'public/datos.csv'
+  'data/datos.csv'
 ];
 
 console.log('\n📁 VERIFICANDO ARCHIVOS PRINCIPALES:');
@@ -101,7 +101,7 @@ if (fs.existsSync(appPath)) {
 console.log('\n📊 VERIFICANDO DATOS CSV:');
 console.log('=========================');
 
-const csvPath = path.join(__dirname, 'public', 'datos.csv');
+const csvPath = path.join(__dirname, 'data', 'datos.csv');
 if (fs.existsSync(csvPath)) {
   const csvContent = fs.readFileSync(csvPath, 'utf8');
   const lines = csvContent.split('\n').filter(line => line.trim());
@@ -169,7 +169,7 @@ function validarCSVPreguntas() {
   console.log("\n📊 VALIDANDO PREGUNTAS EN CSV:");
   
   try {
-    const csvContent = fs.readFileSync('public/datos.csv', 'utf8');
+    const csvContent = fs.readFileSync('data/datos.csv', 'utf8');
     const headers = csvContent.split('\n')[0].split(';');
     
     const expectedHeaders = [
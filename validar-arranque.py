@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+⏱️ Validación del tiempo de arranque de los chequeos ligeros
+
+Falla (código de salida 1) si algún módulo ligero de `analitica` supera su
+presupuesto de importación o carga pandas/numpy al importarse.
+"""
+
+import sys
+
+from analitica.arranque import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,7 +12,7 @@ def validar_metrica_claridad():
     
     # Leer CSV
     try:
-        df = pd.read_csv('public/datos.csv', sep=';', encoding='utf-8')
+        df = pd.read_csv('data/datos.csv', sep=';', encoding='utf-8')
         print(f"✅ CSV cargado: {len(df)} registros")
     except Exception as e:
         print(f"❌ Error cargando CSV: {e}")
@@ -37,7 +37,7 @@ function leerCSV(filePath) {
 function validarDatosPorcentajes() {
   console.log("📊 Cargando datos CSV...");
   
-  const datos = leerCSV('public/datos.csv');
+  const datos = leerCSV('data/datos.csv');
   if (datos.length === 0) {
     console.log("❌ No se pudieron cargar los datos");
     return false;
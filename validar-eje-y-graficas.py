@@ -13,7 +13,7 @@ def validar_datos_porcentajes():
     try:
         # Cargar datos
         print("📊 Cargando datos CSV...")
-        df = pd.read_csv('public/datos.csv', sep=';')
+        df = pd.read_csv('data/datos.csv', sep=';')
         print(f"✅ Datos cargados: {len(df)} registros")
         
         # Métricas a validar con nombres reales de columnas del CSV
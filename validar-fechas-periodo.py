@@ -23,7 +23,7 @@ def validar_fechas_periodo_campo():
     try:
         # Leer el archivo CSV
         print("📂 LEYENDO ARCHIVO DE DATOS...")
-        df = pd.read_csv('public/datos.csv', delimiter=';', encoding='utf-8')
+        df = pd.read_csv('data/datos.csv', delimiter=';', encoding='utf-8')
         print(f"   • Total de registros: {len(df):,}")
         print(f"   • Columnas encontradas: {list(df.columns)}")
         print()
@@ -12,7 +12,7 @@ def validar_integracion_final():
     
     try:
         # Leer y analizar CSV
-        df = pd.read_csv('public/datos.csv', sep=';', encoding='utf-8')
+        df = pd.read_csv('data/datos.csv', sep=';', encoding='utf-8')
         
         # Encontrar columna de claridad
         claridad_col = None
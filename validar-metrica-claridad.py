@@ -14,7 +14,7 @@ def validar_metrica_claridad():
     try:
         # Leer el archivo CSV
         print("📂 LEYENDO ARCHIVO DE DATOS...")
-        df = pd.read_csv('public/datos.csv', delimiter=';', encoding='utf-8')
+        df = pd.read_csv('data/datos.csv', delimiter=';', encoding='utf-8')
         print(f"   • Total de registros: {len(df):,}")
         print()
         
@@ -8,7 +8,7 @@ console.log('🔍 VERIFICACIÓN FINAL - DATOS HISTÓRICOS 2024-2025');
 console.log('=' .repeat(60));
 
 // Leer y procesar datos del CSV
-const csvPath = path.join(__dirname, 'public', 'datos.csv');
+const csvPath = path.join(__dirname, 'data', 'datos.csv');
 const csvContent = fs.readFileSync(csvPath, 'utf-8');
 const lines = csvContent.split('\n').slice(1); // Omitir header
 
@@ -16,6 +16,12 @@ export default defineConfig(({ mode }) => {
     return {
       base,
       plugins: [react()],
+      server: {
+        proxy: {
+          // API local de analítica (python -m analitica.servidor)
+          '/api': env.ANALITICA_API_URL || 'http://127.0.0.1:8787'
+        }
+      },
       define: {
         'process.env.API_KEY': JSON.stringify(env.GEMINI_API_KEY),
         'process.env.GEMINI_API_KEY': JSON.stringify(env.GEMINI_API_KEY)